@@ -0,0 +1,325 @@
+# app/batch.py
+import glob
+import json
+import os
+import time
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, as_completed, wait
+from typing import Callable, Dict, Iterable, List, NamedTuple, Optional, Tuple
+
+EXCEL_EXTS = (".xlsx", ".xlsm", ".xls")
+MANIFEST_EXTS = (".txt", ".lst", ".manifest")
+
+
+class BatchResult(NamedTuple):
+    source: str
+    output: Optional[str]
+    error: Optional[str]
+    seconds: float
+
+    @property
+    def ok(self) -> bool:
+        return self.error is None
+
+
+def is_batch_spec(spec: str) -> bool:
+    """True when `spec` names a folder, a glob pattern or a manifest rather than one workbook."""
+    if os.path.isdir(spec):
+        return True
+    if glob.has_magic(spec):
+        return True
+    return spec.lower().endswith(MANIFEST_EXTS)
+
+
+def collect_inputs(spec: str) -> List[str]:
+    """
+    Expand a folder, glob pattern or manifest file into workbook paths.
+    Manifests list one path per line (relative to the manifest); blank lines
+    and lines starting with '#' are ignored.
+    """
+    if os.path.isdir(spec):
+        paths = [
+            os.path.join(spec, n) for n in sorted(os.listdir(spec))
+            if n.lower().endswith(EXCEL_EXTS) and not n.startswith(("~$", "."))
+        ]
+    elif glob.has_magic(spec):
+        paths = sorted(p for p in glob.glob(spec, recursive=True) if os.path.isfile(p))
+    elif spec.lower().endswith(MANIFEST_EXTS):
+        base = os.path.dirname(os.path.abspath(spec))
+        with open(spec, "r", encoding="utf-8") as f:
+            lines = [ln.strip() for ln in f]
+        paths = [
+            ln if os.path.isabs(ln) else os.path.join(base, ln)
+            for ln in lines if ln and not ln.startswith("#")
+        ]
+    else:
+        paths = [spec]
+    return paths
+
+
+class OutputNames:
+    """Hands out output paths one input at a time, as output_paths() does for a whole list."""
+
+    def __init__(self, out_dir: str, extension: str = ".docx"):
+        self.out_dir = out_dir
+        self.extension = extension
+        self._seen = set()
+
+    def next(self, source: str) -> str:
+        stem = os.path.splitext(os.path.basename(source))[0] or "Health_Quote"
+        name, n = stem, 1
+        while name.lower() in self._seen:
+            n += 1
+            name = f"{stem}_{n}"
+        self._seen.add(name.lower())
+        return os.path.join(self.out_dir, name + self.extension)
+
+
+def output_paths(inputs: List[str], out_dir: str, extension: str = ".docx") -> List[str]:
+    """One output file per input, named after the workbook; clashing names get a numeric suffix."""
+    names = OutputNames(out_dir, extension)
+    return [names.next(p) for p in inputs]
+
+
+def request_source(line_no: int, data) -> str:
+    """How a streamed JSON quote request is named in results and output files: its id, else its line."""
+    from app.schema import request_id
+    rid = request_id(data) if isinstance(data, dict) else None
+    if rid is None:
+        return f"line_{line_no}"
+    return "".join(c if c.isalnum() or c in "-_ " else "_" for c in rid).strip() or f"line_{line_no}"
+
+
+# ---------- Worker side ----------
+_worker_logo_folder: Optional[str] = None
+
+
+def _import_pipeline():
+    # pandas is left out: it is only imported for .xls and workbooks the
+    # records reader hands over (app/readers.py)
+    import openpyxl  # noqa: F401
+    import app.processor  # noqa: F401
+
+
+def _load_catalogue():
+    from app.catalogue import CATALOGUE
+    CATALOGUE.current()
+
+
+def _load_rates():
+    # numpy and the rate tables, if any are configured (QUOTE_RATES)
+    from app.pricing import RATES
+    RATES.current()
+
+
+def _load_template():
+    from docx import Document
+    Document()
+
+
+def _load_logos(logo_folder: str):
+    from app.catalogue import CATALOGUE
+    from app.logos import LOGOS
+    from app.processor import find_logo, _find_incremint_logo
+    LOGOS.load(_find_incremint_logo(logo_folder))
+    for key in CATALOGUE.current().master:
+        find_logo(key, logo_folder)
+
+
+def _render_sample(logo_folder: str):
+    # Builds the skeleton for every catalogue plan (also the fallback when no
+    # plan is recognised) and runs the DOCX styling and save paths once
+    from app import ingest
+    from app.catalogue import CATALOGUE
+    from app.processor import _docx_bytes, assemble_quote
+    from app.readers import Table
+    quote = assemble_quote(Table.from_rows(ingest.CLIENT_COLUMNS, []), [], list(CATALOGUE.current().master), logo_folder)
+    _docx_bytes(quote)
+
+
+def warm_steps(logo_folder: str) -> List[Tuple[str, Callable[[], None]]]:
+    """The one-off costs of a first quote, as named steps in dependency order."""
+    return [
+        ("imports", _import_pipeline),
+        ("catalogue", _load_catalogue),
+        ("rates", _load_rates),
+        ("template", _load_template),
+        ("logos", lambda: _load_logos(logo_folder)),
+        ("sample", lambda: _render_sample(logo_folder)),
+    ]
+
+
+def warm_worker(logo_folder: str):
+    """
+    Process-pool initializer: pay imports and logo/catalogue setup once per worker.
+    """
+    global _worker_logo_folder
+    _worker_logo_folder = logo_folder
+    for _, step in warm_steps(logo_folder):
+        step()
+
+
+def _render_one(source: str, output: str, logo_folder: Optional[str] = None, fmt: str = "docx") -> BatchResult:
+    from app.processor import generate_file
+    t0 = time.perf_counter()
+    try:
+        out = generate_file(source, output, logo_folder or _worker_logo_folder or "logos",
+                            filename_hint=os.path.basename(source), fmt=fmt)
+        return BatchResult(source, out, None, time.perf_counter() - t0)
+    except Exception as e:
+        # One bad workbook must not abort the batch
+        return BatchResult(source, None, f"{type(e).__name__}: {e}", time.perf_counter() - t0)
+
+
+def _render_request(source: str, output: str, data, logo_folder: Optional[str] = None,
+                    fmt: str = "docx") -> BatchResult:
+    from app.processor import generate_request_bytes
+    t0 = time.perf_counter()
+    try:
+        content = generate_request_bytes(data, fmt, logo_folder or _worker_logo_folder or "logos")
+        with open(output, "wb") as f:
+            f.write(content)
+        return BatchResult(source, output, None, time.perf_counter() - t0)
+    except Exception as e:
+        return BatchResult(source, None, f"{type(e).__name__}: {e}", time.perf_counter() - t0)
+
+
+# ---------- Driver ----------
+def run_batch(
+    inputs: List[str],
+    out_dir: str,
+    logo_folder: str = "logos",
+    workers: Optional[int] = None,
+    on_result: Optional[Callable[[BatchResult], None]] = None,
+    fmt: str = "docx",
+) -> List[BatchResult]:
+    """
+    Render every workbook in `inputs` into `out_dir` across a process pool.
+    Results come back in input order; `on_result` is called as each finishes.
+    `fmt` is any output format of app.processor.RENDERERS.
+    """
+    from app.processor import renderer_for
+    extension = renderer_for(fmt).extension
+    os.makedirs(out_dir, exist_ok=True)
+    outputs = output_paths(inputs, out_dir, extension)
+    workers = max(1, workers or os.cpu_count() or 1)
+    results: List[Optional[BatchResult]] = [None] * len(inputs)
+
+    if workers == 1 or len(inputs) <= 1:
+        warm_worker(logo_folder)
+        for i, (src, out) in enumerate(zip(inputs, outputs)):
+            results[i] = _render_one(src, out, logo_folder, fmt)
+            if on_result:
+                on_result(results[i])
+        return results  # type: ignore[return-value]
+
+    with ProcessPoolExecutor(
+        max_workers=min(workers, len(inputs)),
+        initializer=warm_worker,
+        initargs=(logo_folder,),
+    ) as pool:
+        futures = {
+            pool.submit(_render_one, src, out, None, fmt): i for i, (src, out) in enumerate(zip(inputs, outputs))
+        }
+        for fut in as_completed(futures):
+            i = futures[fut]
+            try:
+                res = fut.result()
+            except Exception as e:
+                # Worker crashed (e.g. killed) rather than raising inside generate_docx
+                res = BatchResult(inputs[i], None, f"{type(e).__name__}: {e}", 0.0)
+            results[i] = res
+            if on_result:
+                on_result(res)
+    return results  # type: ignore[return-value]
+
+
+def _percentile(values: List[float], q: float) -> float:
+    if not values:
+        return 0.0
+    vals = sorted(values)
+    k = min(len(vals) - 1, max(0, int(round(q * (len(vals) - 1)))))
+    return vals[k]
+
+
+def summarize(results: Iterable[BatchResult], wall_seconds: float) -> str:
+    results = list(results)
+    ok = [r for r in results if r.ok]
+    failed = [r for r in results if not r.ok]
+    times = [r.seconds for r in ok]
+    rate = len(results) / wall_seconds if wall_seconds > 0 else 0.0
+    lines = [
+        f"{len(ok)} succeeded, {len(failed)} failed, {len(results)} total in {wall_seconds:.2f}s "
+        f"({rate:.1f} quotes/s)",
+    ]
+    if times:
+        lines.append(
+            f"per-quote: p50 {_percentile(times, 0.5) * 1000:.0f} ms, "
+            f"p95 {_percentile(times, 0.95) * 1000:.0f} ms, max {max(times) * 1000:.0f} ms"
+        )
+    for r in failed:
+        lines.append(f"  ❌ {r.source}: {r.error}")
+    return "\n".join(lines)
+
+
+def run_stream(
+    lines: Iterable[str],
+    out_dir: str,
+    logo_folder: str = "logos",
+    workers: Optional[int] = None,
+    on_result: Optional[Callable[[BatchResult], None]] = None,
+    fmt: str = "docx",
+) -> List[BatchResult]:
+    """
+    Render NDJSON quote requests (app/schema.py, one per line) into `out_dir`.
+    Each line is handed to the process pool as soon as it is read, with at
+    most two per worker outstanding, so a long stdin pipe is rendered while
+    it is still being written. Results come back in line order.
+    """
+    from app.processor import renderer_for
+    from app.schema import iter_ndjson
+
+    names = OutputNames(out_dir, renderer_for(fmt).extension)
+    os.makedirs(out_dir, exist_ok=True)
+    workers = max(1, workers or os.cpu_count() or 1)
+    results: Dict[int, BatchResult] = {}
+
+    def done(n: int, res: BatchResult):
+        results[n] = res
+        if on_result:
+            on_result(res)
+
+    def requests():
+        # (line, source, output, parsed request); lines that are not JSON fail on their own
+        for n, line in iter_ndjson(lines):
+            try:
+                data = json.loads(line)
+                source = request_source(n, data)
+            except ValueError as e:
+                done(n, BatchResult(f"line_{n}", None, f"ValueError: {e}", 0.0))
+                continue
+            yield n, source, names.next(source), data
+
+    if workers == 1:
+        warm_worker(logo_folder)
+        for n, source, out, data in requests():
+            done(n, _render_request(source, out, data, logo_folder, fmt))
+    else:
+        with ProcessPoolExecutor(max_workers=workers, initializer=warm_worker, initargs=(logo_folder,)) as pool:
+            pending = {}
+
+            def collect(futures):
+                for fut in futures:
+                    n, source = pending.pop(fut)
+                    try:
+                        done(n, fut.result())
+                    except Exception as e:
+                        # Worker crashed rather than raising inside the render
+                        done(n, BatchResult(source, None, f"{type(e).__name__}: {e}", 0.0))
+
+            for n, source, out, data in requests():
+                if len(pending) >= 2 * workers:
+                    collect(wait(pending, return_when=FIRST_COMPLETED).done)
+                pending[pool.submit(_render_request, source, out, data, None, fmt)] = (n, source)
+            collect(list(pending))
+    return [results[n] for n in sorted(results)]
+
@@ -0,0 +1,277 @@
+# app/catalogue.py
+import hashlib
+import json
+import os
+import sys
+import threading
+import time
+from types import MappingProxyType
+from typing import Dict, Iterable, List, Mapping, Optional, Sequence, Tuple
+
+from app.matrix import FeatureMatrix
+from app.resolver import Alias, PlanResolver
+
+SCHEMA = 1
+DEFAULT_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "data", "catalogue.json")
+
+_intern = sys.intern
+
+
+def _alias(value) -> Alias:
+    if isinstance(value, str):
+        return _intern(value)
+    return tuple(_intern(str(t)) for t in value)
+
+
+class Catalogue:
+    """
+    Plans, feature labels, logos, highlights and name aliases compiled into
+    one immutable snapshot.
+
+    Strings are interned and every container is a tuple or a read-only
+    mapping, so a snapshot can be shared by all threads without locking;
+    the plan resolver and feature matrix are built once per snapshot.
+    Changes produce a new Catalogue (see with_plan and CatalogueStore).
+    """
+    __slots__ = ("version", "source", "features", "master", "logo_map", "highlights",
+                 "aliases", "resolver", "matrix", "digest")
+
+    def __init__(
+        self,
+        version: str,
+        features: Sequence[str],
+        master: Mapping[str, Mapping[str, str]],
+        logo_map: Mapping[str, str],
+        highlights: Mapping[str, Sequence[str]],
+        aliases: Iterable[Tuple[str, Alias]],
+        source: Optional[str] = None,
+    ):
+        s = object.__setattr__
+        s(self, "version", _intern(str(version)))
+        s(self, "source", source)
+        s(self, "features", tuple(_intern(f) for f in features))
+        s(self, "master", MappingProxyType({
+            _intern(k): MappingProxyType({_intern(f): _intern(v) for f, v in values.items()})
+            for k, values in master.items()
+        }))
+        s(self, "logo_map", MappingProxyType({_intern(k): _intern(v) for k, v in logo_map.items()}))
+        s(self, "highlights", MappingProxyType({
+            _intern(k): tuple(_intern(h) for h in hs) for k, hs in highlights.items()
+        }))
+        s(self, "aliases", tuple((_intern(k), _alias(a)) for k, a in aliases))
+        s(self, "resolver", PlanResolver(self.master.keys(), self.aliases))
+        s(self, "matrix", FeatureMatrix(self.master, self.features))
+        payload = json.dumps(
+            [{k: dict(v) for k, v in self.master.items()}, list(self.features), dict(self.logo_map),
+             self.resolver.rules, dict(self.highlights)],
+            sort_keys=True, ensure_ascii=False, default=list,
+        )
+        s(self, "digest", hashlib.sha256(payload.encode("utf-8")).hexdigest())
+
+    def __setattr__(self, name, value):
+        raise AttributeError("Catalogue is immutable")
+
+    __delattr__ = __setattr__
+
+    @classmethod
+    def from_dict(cls, data: Mapping, source: Optional[str] = None) -> "Catalogue":
+        """Validate the data-file layout (see app/data/catalogue.json) and compile it."""
+        if not isinstance(data, Mapping):
+            raise ValueError("Catalogue must be a JSON object")
+        if data.get("schema") != SCHEMA:
+            raise ValueError(f"Unsupported catalogue schema {data.get('schema')!r} (expected {SCHEMA})")
+        features = data.get("features")
+        plans = data.get("plans")
+        if not isinstance(features, list) or not all(isinstance(f, str) for f in features):
+            raise ValueError("'features' must be a list of labels")
+        if not isinstance(plans, Mapping) or not plans:
+            raise ValueError("'plans' must be a non-empty object keyed by plan name")
+
+        master: Dict[str, Dict[str, str]] = {}
+        logo_map: Dict[str, str] = {}
+        highlights: Dict[str, List[str]] = {}
+        for key, plan in plans.items():
+            if not isinstance(plan, Mapping):
+                raise ValueError(f"Plan {key!r} must be an object")
+            if "features" in plan:
+                values = plan["features"]
+                if not isinstance(values, Mapping) or not all(isinstance(v, str) for v in values.values()):
+                    raise ValueError(f"Plan {key!r}: 'features' must map feature names to text")
+                master[key] = dict(values)
+            if plan.get("logo"):
+                logo_map[key] = str(plan["logo"])
+            if "highlights" in plan:
+                if not isinstance(plan["highlights"], list):
+                    raise ValueError(f"Plan {key!r}: 'highlights' must be a list")
+                highlights[key] = [str(h) for h in plan["highlights"]]
+
+        aliases: List[Tuple[str, Alias]] = []
+        for entry in data.get("aliases", []):
+            if not (isinstance(entry, list) and len(entry) == 2 and entry[0] in plans):
+                raise ValueError(f"Bad alias entry {entry!r}: expected [plan name, term or [terms]]")
+            aliases.append((entry[0], entry[1]))
+
+        return cls(data.get("version", "0"), features, master, logo_map, highlights, aliases, source)
+
+    def with_plan(
+        self,
+        key: str,
+        features: Mapping[str, str],
+        aliases: Iterable[Alias] = (),
+        logo_base: Optional[str] = None,
+    ) -> "Catalogue":
+        """A copy with one plan added or replaced; its aliases rank after the existing ones."""
+        master = dict(self.master)
+        master[key] = dict(features)
+        logo_map = dict(self.logo_map)
+        if logo_base:
+            logo_map[key] = logo_base
+        rules = list(self.aliases) + [(key, a) for a in aliases]
+        return Catalogue(self.version, self.features, master, logo_map, self.highlights, rules, self.source)
+
+
+def load_catalogue(path: str = DEFAULT_PATH) -> Catalogue:
+    try:
+        with open(path, "r", encoding="utf-8") as f:
+            data = json.load(f)
+    except json.JSONDecodeError as e:
+        raise ValueError(f"Invalid catalogue file {path}: {e}")
+    try:
+        return Catalogue.from_dict(data, source=os.path.abspath(path))
+    except ValueError as e:
+        raise ValueError(f"Invalid catalogue file {path}: {e}")
+
+
+def save_plan(
+    path: str,
+    key: str,
+    features: Mapping[str, str],
+    aliases: Iterable[Alias] = (),
+    logo_base: Optional[str] = None,
+) -> Catalogue:
+    """
+    Add (or replace) a plan in the catalogue file at `path`: its feature
+    values, logo and any new aliases. The result is validated before the
+    file is replaced in one rename, so readers never see half a file.
+    """
+    with open(path, "r", encoding="utf-8") as f:
+        data = json.load(f)
+    plan = dict(data.get("plans", {}).get(key) or {})
+    plan["features"] = dict(features)
+    if logo_base:
+        plan["logo"] = logo_base
+    data.setdefault("plans", {})[key] = plan
+    entries = data.setdefault("aliases", [])
+    for alias in aliases:
+        entry = [key, alias if isinstance(alias, str) else list(alias)]
+        if entry not in entries:
+            entries.append(entry)
+    cat = Catalogue.from_dict(data, source=os.path.abspath(path))
+    tmp = f"{path}.{os.getpid()}.tmp"
+    with open(tmp, "w", encoding="utf-8") as f:
+        json.dump(data, f, ensure_ascii=False, indent=2)
+        f.write("\n")
+    os.replace(tmp, path)
+    return cat
+
+
+class CatalogueStore:
+    """
+    The process-wide current Catalogue, reloaded when its file changes.
+
+    current() re-checks the file's mtime/size at most every `check_interval`
+    seconds. A changed file is compiled off to the side and swapped in with
+    one reference assignment, so a quote that already holds the previous
+    snapshot finishes with it. A file that fails to load is reported and
+    the previous snapshot stays in service. Plans added with save() go into
+    the file, so every process that reads it (render pool workers too) picks
+    them up; plans added with register() live in this process only and are
+    re-applied on top of every reload.
+    """
+
+    def __init__(self, path: str = DEFAULT_PATH, check_interval: float = 1.0):
+        self.path = path
+        self.check_interval = check_interval
+        self._lock = threading.Lock()
+        self._write_lock = threading.Lock()
+        self._catalogue: Optional[Catalogue] = None
+        self._stat: Optional[Tuple[int, int]] = None
+        self._checked_at = 0.0
+        self._extra: List[Tuple[str, Dict[str, str], Tuple[Alias, ...], Optional[str]]] = []
+
+    def current(self) -> Catalogue:
+        cat = self._catalogue
+        if cat is not None and time.monotonic() - self._checked_at < self.check_interval:
+            return cat
+        return self._refresh()
+
+    def _refresh(self, force: bool = False) -> Catalogue:
+        with self._lock:
+            now = time.monotonic()
+            if not force and self._catalogue is not None and now - self._checked_at < self.check_interval:
+                return self._catalogue
+            self._checked_at = now
+            try:
+                st = os.stat(self.path)
+                stat = (st.st_mtime_ns, st.st_size)
+            except OSError:
+                if self._catalogue is None:
+                    raise
+                stat = None
+            if force or stat != self._stat or self._catalogue is None:
+                # Remembered even if loading fails, so a bad file is reported once
+                self._stat = stat
+                try:
+                    cat = load_catalogue(self.path)
+                    for key, features, aliases, logo_base in self._extra:
+                        cat = cat.with_plan(key, features, aliases, logo_base)
+                    self._catalogue = cat
+                except (OSError, ValueError) as e:
+                    if self._catalogue is None:
+                        raise
+                    print(f"Warning: keeping catalogue {self._catalogue.version}: {e}")
+            return self._catalogue
+
+    def reload(self) -> Catalogue:
+        """Re-read the file now, regardless of mtime."""
+        return self._refresh(force=True)
+
+    def save(
+        self,
+        key: str,
+        features: Mapping[str, str],
+        aliases: Iterable[Alias] = (),
+        logo_base: Optional[str] = None,
+    ) -> Catalogue:
+        with self._write_lock:
+            save_plan(self.path, key, features, aliases, logo_base)
+        return self.reload()
+
+    def register(
+        self,
+        key: str,
+        features: Mapping[str, str],
+        aliases: Iterable[Alias] = (),
+        logo_base: Optional[str] = None,
+    ) -> Catalogue:
+        entry = (key, dict(features), tuple(aliases), logo_base)
+        self.current()
+        with self._lock:
+            self._extra.append(entry)
+            cat = self._catalogue = self._catalogue.with_plan(*entry)
+        return cat
+
+
+CATALOGUE = CatalogueStore(os.environ.get("QUOTE_CATALOGUE") or DEFAULT_PATH)
+
+
+if __name__ == "__main__":
+    # python -m app.catalogue [path]: validate a catalogue file before deploying it
+    target = sys.argv[1] if len(sys.argv) > 1 else CATALOGUE.path
+    try:
+        cat = load_catalogue(target)
+    except (OSError, ValueError) as e:
+        print(f"❌ {e}")
+        sys.exit(1)
+    print(f"✅ {target}: version {cat.version}, {len(cat.master)} plans, "
+          f"{len(cat.features)} features, {len(cat.aliases)} aliases ({cat.digest[:12]})")
@@ -1,15 +1,69 @@
 import argparse
-from app.processor import generate_docx
+import os
+import sys
+import time
+
+from app.processor import RENDERERS, generate_file
+from app.batch import collect_inputs, is_batch_spec, run_batch, run_stream, summarize
+
+DEFAULT_OUTPUT = "output/Health_Quote.docx"
+NDJSON_EXTS = (".ndjson", ".jsonl")
 
 def main():
-    p = argparse.ArgumentParser(description="Generate Health Quote DOCX from Excel")
-    p.add_argument("excel", help="Path to input Excel with sheets 'Client Details' and 'Premiums'")
-    p.add_argument("-o", "--output", default="output/Health_Quote.docx", help="Output DOCX path")
+    p = argparse.ArgumentParser(description="Generate Health Quote DOCX from Excel or JSON quote requests")
+    p.add_argument("excel", help="Path to input Excel with sheets 'Client Details' and 'Premiums' "
+                                 "(or a folder, glob pattern or manifest .txt for batch mode; "
+                                 "'-' or an .ndjson file for JSON quote requests, one per line)")
+    p.add_argument("-o", "--output", default=DEFAULT_OUTPUT, help="Output file path")
+    p.add_argument("-f", "--format", default="docx", choices=sorted(RENDERERS),
+                   help="Output format: docx (default), pdf, or html (quick preview)")
     p.add_argument("-l", "--logos", default="logos", help="Folder containing insurer logos")
+    p.add_argument("-d", "--out-dir", default=None,
+                   help="Batch mode: folder for generated files (default: folder of --output)")
+    p.add_argument("-w", "--workers", type=int, default=None,
+                   help="Batch mode: number of worker processes (default: CPU count)")
     args = p.parse_args()
 
-    out = generate_docx(args.excel, args.output, args.logos)
-    print(f"✅ Generated: {out}")
+    def report(r):
+        if r.ok:
+            print(f"✅ {r.source} -> {r.output} ({r.seconds * 1000:.0f} ms)")
+        else:
+            print(f"❌ {r.source}: {r.error}")
+
+    out_dir = args.out_dir or os.path.dirname(args.output) or "."
+    if args.excel == "-" or args.excel.lower().endswith(NDJSON_EXTS):
+        # JSON quote requests: no workbook involved; each line is rendered as it is read
+        t0 = time.perf_counter()
+        if args.excel == "-":
+            results = run_stream(sys.stdin, out_dir, args.logos, args.workers, report, args.format)
+        else:
+            with open(args.excel, "r", encoding="utf-8") as f:
+                results = run_stream(f, out_dir, args.logos, args.workers, report, args.format)
+        if not results:
+            print("❌ No quote requests read")
+            sys.exit(1)
+        print(summarize(results, time.perf_counter() - t0))
+        if any(not r.ok for r in results):
+            sys.exit(1)
+        return
+
+    if not is_batch_spec(args.excel):
+        output = args.output
+        if output == DEFAULT_OUTPUT:
+            output = os.path.splitext(output)[0] + RENDERERS[args.format].extension
+        out = generate_file(args.excel, output, args.logos, fmt=args.format)
+        print(f"✅ Generated: {out}")
+        return
+
+    inputs = collect_inputs(args.excel)
+    if not inputs:
+        print(f"❌ No workbooks found for: {args.excel}")
+        sys.exit(1)
+    t0 = time.perf_counter()
+    results = run_batch(inputs, out_dir, args.logos, workers=args.workers, on_result=report, fmt=args.format)
+    print(summarize(results, time.perf_counter() - t0))
+    if any(not r.ok for r in results):
+        sys.exit(1)
 
 if __name__ == "__main__":
     main()
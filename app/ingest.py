@@ -0,0 +1,198 @@
+# app/ingest.py
+import html
+import io
+import os
+import re
+import zipfile
+from typing import Callable, Iterable, List, Optional, Tuple
+
+REQUIRED_SHEETS = ["Client Details", "Premiums"]
+CLIENT_COLUMNS = ["Client Name", "Relation", "DOB", "Age", "City", "Sum Assured"]
+PLAN_NAME_COLUMNS = ["Plan Name", "Plan", "Insurance Company", "Insurer", "Company", "Product"]
+PREMIUM_COLUMNS = ["1 Yr Premium", "2 Yr Premium", "3 Yr Premium"]
+
+# Stop reading a sheet after this many consecutive fully blank rows
+# (broker workbooks often carry thousands of formatted but empty rows)
+BLANK_RUN_LIMIT = 50
+
+# File signatures: .xlsx/.xlsm are zip packages, .xls is an OLE2 compound file
+ZIP_MAGIC = b"PK\x03\x04"
+OLE_MAGIC = b"\xd0\xcf\x11\xe0\xa1\xb1\x1a\xe1"
+# The workbook part (sheet index) is a few KB; refuse to inflate more than this
+_INDEX_MAX_BYTES = 4 * 1024 * 1024
+_OFFICE_DOCUMENT = re.compile(rb'<Relationship\b[^>]*\bType="[^"]*/officeDocument"[^>]*>')
+_TARGET = re.compile(rb'\bTarget="([^"]*)"')
+_SHEET_NAME = re.compile(rb'<(?:\w+:)?sheet\b[^>]*?\bname="([^"]*)"')
+
+
+def check_sheets(sheet_names: Iterable[str]):
+    sheet_names = list(sheet_names)
+    missing = [s for s in REQUIRED_SHEETS if s not in sheet_names]
+    if missing:
+        raise ValueError(f"Missing sheet(s): {', '.join(missing)}. Found sheets: {', '.join(sheet_names)}")
+
+
+def _workbook_part(zf: zipfile.ZipFile) -> str:
+    # The package relationships name the workbook part; xl/workbook.xml by convention
+    try:
+        rels = zf.read("_rels/.rels")
+    except KeyError:
+        return "xl/workbook.xml"
+    m = _OFFICE_DOCUMENT.search(rels)
+    target = _TARGET.search(m.group(0)) if m else None
+    return target.group(1).decode("utf-8", "replace").lstrip("/") if target else "xl/workbook.xml"
+
+
+def zip_sheet_names(source) -> List[str]:
+    """Sheet names from an .xlsx/.xlsm's workbook index, without reading any sheet."""
+    src = io.BytesIO(source) if isinstance(source, (bytes, bytearray)) else source
+    try:
+        with zipfile.ZipFile(src) as zf:
+            info = zf.getinfo(_workbook_part(zf))
+            if info.file_size > _INDEX_MAX_BYTES:
+                raise ValueError("The workbook index is implausibly large.")
+            index = zf.read(info)
+    except (zipfile.BadZipFile, KeyError, EOFError) as e:
+        raise ValueError(f"Failed to read Excel file: {e}")
+    return [html.unescape(m.decode("utf-8", "replace")) for m in _SHEET_NAME.findall(index)]
+
+
+def sniff(source, filename_hint: Optional[str] = None):
+    """
+    Reject what is plainly not a usable workbook before it is parsed: the
+    first bytes must carry the signature the extension promises (zip for
+    .xlsx/.xlsm, OLE2 for .xls), and a zip package's sheet index must list
+    the required sheets. `source` is bytes or a seekable binary file, left
+    at position 0. Raises ValueError.
+    """
+    src = io.BytesIO(source) if isinstance(source, (bytes, bytearray)) else source
+    src.seek(0)
+    head = src.read(len(OLE_MAGIC))
+    src.seek(0)
+    ext = os.path.splitext(filename_hint or "")[1].lower()
+    if head.startswith(ZIP_MAGIC) and ext in ("", ".xlsx", ".xlsm"):
+        check_sheets(zip_sheet_names(src))
+        src.seek(0)
+    elif not (head == OLE_MAGIC and ext in ("", ".xls")):
+        expected = ".xls" if ext == ".xls" else ".xlsx/.xlsm"
+        raise ValueError(f"The file is not a real Excel workbook ({expected}). Please re-save it from Excel and try again.")
+
+
+def supports(excel_input, filename_hint: Optional[str] = None) -> bool:
+    """True when the streaming reader can handle this input (.xlsx/.xlsm, i.e. a zip package)."""
+    name = filename_hint or (excel_input if isinstance(excel_input, str) else "")
+    ext = os.path.splitext(name or "")[1].lower()
+    if ext:
+        return ext in (".xlsx", ".xlsm")
+    if isinstance(excel_input, (bytes, bytearray)):
+        return bytes(excel_input[:4]) == b"PK\x03\x04"
+    return False
+
+
+def _client_column(name: str) -> bool:
+    return name in CLIENT_COLUMNS
+
+
+def _premium_column(name: str) -> bool:
+    # has_premium() looks at every column whose name contains "prem"
+    return name in PLAN_NAME_COLUMNS or "prem" in name.lower()
+
+
+def _convert(cell):
+    # Same conversions as pandas' openpyxl reader so dtypes come out identical
+    value = cell.value
+    if value is None:
+        return ""
+    if cell.data_type == "e":
+        return float("nan")
+    if cell.data_type == "n" and isinstance(value, float):
+        ival = int(value)
+        return ival if ival == value else value
+    return value
+
+
+def _header_names(values: List) -> List[str]:
+    # pandas names blank headers "Unnamed: i" and de-duplicates repeats as "X.1", "X.2"
+    names, seen = [], {}
+    for i, v in enumerate(values):
+        name = f"Unnamed: {i}" if v is None or v == "" else str(v)
+        if name in seen:
+            seen[name] += 1
+            name = f"{name}.{seen[name]}"
+        else:
+            seen[name] = 0
+        names.append(name)
+    return names
+
+
+def stream_projected(ws, want: Callable[[str], bool]) -> Tuple[List[str], List[List]]:
+    """
+    Stream one worksheet, keeping only header-selected columns and stopping
+    after BLANK_RUN_LIMIT consecutive blank rows. Returns (column names, rows)
+    with "" for blank cells; interior blank rows are kept, trailing ones are not.
+    """
+    ws.reset_dimensions()
+    header = next(ws.iter_rows(min_row=1, max_row=1), None)
+    if header is None:
+        return [], []
+    names = _header_names([_convert(c) for c in header])
+    keep = [i for i, n in enumerate(names) if want(n)]
+    if not keep:
+        return [], []
+
+    data = []
+    blank_run = 0
+    for row in ws.iter_rows(min_row=2, max_col=keep[-1] + 1):
+        cells = [_convert(row[i]) if i < len(row) else "" for i in keep]
+        if all(v == "" for v in cells):
+            # Interior blank rows are kept (as pandas does); a long run ends the sheet
+            blank_run += 1
+            if blank_run >= BLANK_RUN_LIMIT:
+                break
+            continue
+        data.extend([[""] * len(keep)] * blank_run)
+        blank_run = 0
+        data.append(cells)
+    return [names[i] for i in keep], data
+
+
+def _read_projected(ws, want: Callable[[str], bool]):
+    import pandas as pd
+    from pandas.errors import EmptyDataError
+    from pandas.io.parsers import TextParser
+
+    names, rows = stream_projected(ws, want)
+    if not names:
+        return pd.DataFrame()
+    try:
+        return TextParser([names] + rows, header=0, skip_blank_lines=False).read()
+    except EmptyDataError:
+        return pd.DataFrame()
+
+
+def read_projected(excel_input, read: Callable) -> Tuple:
+    """
+    Open an .xlsx/.xlsm in read-only streaming mode and return
+    (read(client sheet, _client_column), read(premium sheet, _premium_column)).
+    """
+    from openpyxl import load_workbook
+
+    src = io.BytesIO(excel_input) if isinstance(excel_input, (bytes, bytearray)) else excel_input
+    try:
+        wb = load_workbook(src, read_only=True, data_only=True, keep_links=False)
+    except Exception as e:
+        raise ValueError(f"Failed to read Excel file: {e}")
+    try:
+        check_sheets(wb.sheetnames)
+        return read(wb["Client Details"], _client_column), read(wb["Premiums"], _premium_column)
+    finally:
+        wb.close()
+
+
+def read_sheets(excel_input):
+    """
+    Read 'Client Details' and 'Premiums' from an .xlsx/.xlsm, projected to the
+    columns the quote uses. Returns (client_df, premium_df) shaped like
+    pd.read_excel's output.
+    """
+    return read_projected(excel_input, _read_projected)
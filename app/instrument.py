@@ -0,0 +1,104 @@
+# app/instrument.py
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Dict, Optional, Tuple
+
+# Stage names used by app.processor, in pipeline order
+STAGES = (
+    "read", "validate", "premiums", "model", "template",
+    "client_table", "premium_table", "feature_table", "advisor_table", "save", "render",
+)
+
+
+class _NullSpan:
+    __slots__ = ()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+
+_NULL_SPAN = _NullSpan()
+
+
+class NullTrace:
+    """Recorder used when tracing is off: every call is a no-op."""
+    __slots__ = ()
+    enabled = False
+
+    def span(self, name: str):
+        return _NULL_SPAN
+
+    def count(self, name: str, n: int = 1):
+        pass
+
+
+class _Span:
+    __slots__ = ("trace", "name", "t0")
+
+    def __init__(self, trace: "Trace", name: str):
+        self.trace = trace
+        self.name = name
+
+    def __enter__(self):
+        self.t0 = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc):
+        spans = self.trace.spans
+        spans[self.name] = spans.get(self.name, 0.0) + time.perf_counter() - self.t0
+        return False
+
+
+class Trace:
+    """
+    Per-quote stage timings (seconds) and counters.
+
+    Spans with the same name accumulate. snapshot() returns plain dicts so a
+    trace recorded in a worker process can be sent back to the caller.
+    """
+    __slots__ = ("spans", "counters")
+    enabled = True
+
+    def __init__(self):
+        self.spans: Dict[str, float] = {}
+        self.counters: Dict[str, int] = {}
+
+    def span(self, name: str) -> _Span:
+        return _Span(self, name)
+
+    def count(self, name: str, n: int = 1):
+        self.counters[name] = self.counters.get(name, 0) + n
+
+    def snapshot(self) -> Dict[str, Dict]:
+        return {"spans": dict(self.spans), "counters": dict(self.counters)}
+
+
+NULL_TRACE = NullTrace()
+_current: ContextVar = ContextVar("quote_trace", default=NULL_TRACE)
+
+
+def current():
+    """The active Trace, or NULL_TRACE when nothing is recording."""
+    return _current.get()
+
+
+@contextmanager
+def tracing(trace: Optional[Trace] = None):
+    """Record spans/counters of everything run inside the block into `trace`."""
+    trace = trace if trace is not None else Trace()
+    token = _current.set(trace)
+    try:
+        yield trace
+    finally:
+        _current.reset(token)
+
+
+def traced(fn, *args, **kwargs) -> Tuple[object, Dict[str, Dict]]:
+    """Call fn under a fresh Trace; returns (result, trace snapshot). Picklable for pools."""
+    with tracing() as trace:
+        result = fn(*args, **kwargs)
+    return result, trace.snapshot()
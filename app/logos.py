@@ -0,0 +1,246 @@
+# app/logos.py
+import hashlib
+import io
+import os
+import threading
+import time
+import weakref
+from typing import Dict, List, Optional, Tuple
+
+from docx.image.image import Image
+from docx.oxml.shape import CT_Inline
+from docx.shape import InlineShape
+from docx.shared import Inches, Length
+
+LOGO_EXTS = (".png", ".jpg", ".jpeg", ".webp")
+
+# Display widths used by the quote template (header logo / table logos)
+LOGO_WIDTHS = (Inches(1.0), Inches(1.8))
+
+# Logos wider than the largest display width at this resolution are
+# downscaled once when loaded (needs Pillow; otherwise embedded as they are)
+LOGO_DPI = int(os.environ.get("LOGO_DPI", "200"))
+
+
+def fit_to_display(blob: bytes, dpi: int = LOGO_DPI) -> bytes:
+    """
+    Re-encode an image at most max(LOGO_WIDTHS) wide at `dpi`, keeping
+    JPEG as JPEG and everything else (transparency, WebP) as PNG. Returns
+    the original bytes when Pillow is missing, the image is already small
+    enough, or re-encoding would not make it smaller.
+    """
+    try:
+        from PIL import Image as PILImage
+    except ImportError:
+        return blob
+    try:
+        im = PILImage.open(io.BytesIO(blob))
+        im.load()
+    except Exception:
+        return blob
+    max_px = max(1, int(max(LOGO_WIDTHS) / Inches(1) * dpi))
+    fmt = im.format
+    embeddable = fmt in ("JPEG", "PNG", "GIF", "BMP", "TIFF")
+    if im.width <= max_px and embeddable:
+        return blob
+    if im.width > max_px:
+        im = im.resize((max_px, max(1, round(im.height * max_px / im.width))), PILImage.LANCZOS)
+    out = io.BytesIO()
+    if fmt == "JPEG":
+        im.convert("RGB").save(out, "JPEG", quality=85, optimize=True, dpi=(dpi, dpi))
+    else:
+        if im.mode not in ("RGB", "RGBA", "L", "LA", "P"):
+            im = im.convert("RGBA")
+        im.save(out, "PNG", optimize=True, dpi=(dpi, dpi))
+    data = out.getvalue()
+    return data if len(data) < len(blob) or not embeddable else blob
+
+
+class LogoAsset:
+    """
+    One decoded logo file: raw bytes, MIME type, pixel size and the EMU
+    extents it is drawn at for each of LOGO_WIDTHS.
+    """
+    __slots__ = ("path", "mtime", "blob", "sha1", "content_type", "px_width", "px_height", "sizes")
+
+    def __init__(self, path: str, mtime: float, blob: bytes, image: Image):
+        self.path = path
+        self.mtime = mtime
+        self.blob = blob
+        self.sha1 = hashlib.sha1(blob).hexdigest()
+        self.content_type = image.content_type
+        self.px_width = image.px_width
+        self.px_height = image.px_height
+        self.sizes: Dict[int, Tuple[Length, Length]] = {
+            int(w): image.scaled_dimensions(w, None) for w in LOGO_WIDTHS
+        }
+
+    def stream(self) -> io.BytesIO:
+        return io.BytesIO(self.blob)
+
+    def size_at(self, width: Length) -> Tuple[Length, Length]:
+        size = self.sizes.get(int(width))
+        if size is None:
+            size = (width, Length(int(round(width * self.px_height / float(self.px_width)))))
+        return size
+
+    def add_to(self, run, width: Length):
+        """Insert this logo into a python-docx run from memory at the given width."""
+        cx, cy = self.size_at(width)
+        return DocImages.of(run.part).add(run, self, cx, cy)
+
+
+class DocImages:
+    """
+    Pictures of one document part: exactly one image part and relationship
+    per distinct image (by SHA-1), however often it is drawn.
+
+    run.add_picture() re-parses the image and rescans the whole XML for the
+    next shape id on every call; here an image is added to the package once
+    and shape ids come from a counter. All pictures of the part must then go
+    through add() (LogoAsset.add_to does).
+    """
+    _by_part: "weakref.WeakKeyDictionary" = weakref.WeakKeyDictionary()
+
+    def __init__(self, part):
+        # No reference back to the part: it is the weak key of _by_part
+        self._refs: Dict[str, Tuple[str, str]] = {}  # sha1 -> (rId, filename)
+        self._next_id = part.next_id
+
+    @classmethod
+    def of(cls, part) -> "DocImages":
+        images = cls._by_part.get(part)
+        if images is None:
+            images = cls._by_part[part] = cls(part)
+        return images
+
+    def add(self, run, asset: LogoAsset, cx: Length, cy: Length) -> InlineShape:
+        ref = self._refs.get(asset.sha1)
+        if ref is None:
+            rId, image = run.part.get_or_add_image(asset.stream())
+            ref = self._refs[asset.sha1] = (rId, image.filename)
+        inline = CT_Inline.new_pic_inline(self._next_id, ref[0], ref[1], cx, cy)
+        self._next_id += 1
+        run._r.add_drawing(inline)
+        return InlineShape(inline)
+
+
+class LogoRegistry:
+    """
+    Process-wide cache of logo files and logo folder listings.
+
+    Each file is read and parsed once; entries are re-validated against the
+    file's mtime at most every `check_interval` seconds so the common path
+    costs no disk access at all.
+    """
+
+    def __init__(self, check_interval: float = 1.0):
+        self.check_interval = check_interval
+        self._lock = threading.Lock()
+        # abs path -> (checked_at, mtime, asset or None when unreadable)
+        self._assets: Dict[str, Tuple[float, float, Optional[LogoAsset]]] = {}
+        # abs folder -> (checked_at, mtime, sorted file names)
+        self._folders: Dict[str, Tuple[float, float, List[str]]] = {}
+        # abs folder -> (checked_at, ((name, size, mtime), ...))
+        self._signatures: Dict[str, Tuple[float, Tuple]] = {}
+
+    def clear(self):
+        with self._lock:
+            self._assets.clear()
+            self._folders.clear()
+            self._signatures.clear()
+
+    def signature(self, folder: str) -> Tuple:
+        """(name, size, mtime) of every logo in `folder`; changes whenever a logo is added, removed or replaced."""
+        folder = os.path.abspath(folder)
+        now = time.monotonic()
+        entry = self._signatures.get(folder)
+        if entry is not None and now - entry[0] < self.check_interval:
+            return entry[1]
+        sig = []
+        for n in self._listing(folder):
+            try:
+                st = os.stat(os.path.join(folder, n))
+            except OSError:
+                continue
+            sig.append((n, st.st_size, st.st_mtime))
+        sig = tuple(sig)
+        with self._lock:
+            self._signatures[folder] = (now, sig)
+        return sig
+
+    def _listing(self, folder: str) -> List[str]:
+        folder = os.path.abspath(folder)
+        now = time.monotonic()
+        entry = self._folders.get(folder)
+        if entry is not None and now - entry[0] < self.check_interval:
+            return entry[2]
+        try:
+            mtime = os.stat(folder).st_mtime
+        except OSError:
+            with self._lock:
+                self._folders.pop(folder, None)
+            return []
+        if entry is not None and entry[1] == mtime:
+            names = entry[2]
+        else:
+            names = sorted(
+                n for n in os.listdir(folder)
+                if not n.startswith(".") and n.endswith(LOGO_EXTS)
+                and os.path.isfile(os.path.join(folder, n))
+            )
+        with self._lock:
+            self._folders[folder] = (now, mtime, names)
+        return names
+
+    def load(self, path: Optional[str]) -> Optional[LogoAsset]:
+        """Return the cached asset for an image path, reloading it if the file changed."""
+        if not path:
+            return None
+        path = os.path.abspath(path)
+        now = time.monotonic()
+        entry = self._assets.get(path)
+        if entry is not None and now - entry[0] < self.check_interval:
+            return entry[2]
+        try:
+            mtime = os.stat(path).st_mtime
+        except OSError:
+            with self._lock:
+                self._assets.pop(path, None)
+            return None
+        if entry is not None and entry[1] == mtime:
+            asset = entry[2]
+        else:
+            try:
+                with open(path, "rb") as f:
+                    blob = fit_to_display(f.read())
+                asset = LogoAsset(path, mtime, blob, Image.from_blob(blob))
+            except Exception as e:
+                print(f"Warning: unusable logo {path}: {e}")
+                asset = None
+        with self._lock:
+            self._assets[path] = (now, mtime, asset)
+        return asset
+
+    def find_path(self, base: str, logo_folder: str) -> Optional[str]:
+        names = self._listing(logo_folder)
+        for ext in LOGO_EXTS:
+            if base + ext in names:
+                return os.path.join(logo_folder, base + ext)
+        return None
+
+    def header_path(self, logo_folder: str) -> Optional[str]:
+        """Prefer a file containing 'incremint'; otherwise the first image (by extension order)."""
+        names = self._listing(logo_folder)
+        for n in names:
+            if "incremint" in n.lower():
+                return os.path.join(os.path.abspath(logo_folder), n)
+        for ext in LOGO_EXTS:
+            for n in names:
+                if n.endswith(ext):
+                    return os.path.join(os.path.abspath(logo_folder), n)
+        return None
+
+
+# Shared across requests (and threads) in one process
+LOGOS = LogoRegistry()
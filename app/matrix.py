@@ -0,0 +1,60 @@
+# app/matrix.py
+from operator import itemgetter
+from typing import Dict, Iterable, Iterator, List, Mapping, Optional, Sequence, Tuple
+
+MAPPING_REQUIRED = "<Mapping required>"
+HIGHLIGHT_FEATURE = "Unique Features"
+
+
+def feature_key(label: str) -> str:
+    """'🛠️ Non-Consumables' -> 'Non-Consumables' (drops the emoji and a stray variation selector)."""
+    key = label.split(" ", 1)[1] if " " in label else label
+    if key.startswith("️"):
+        key = key[1:]
+    return key.strip()
+
+
+class FeatureMatrix:
+    """
+    MASTER x FEATURES compiled into a dense table of display strings.
+
+    Rows follow FEATURES, columns follow the plan order of MASTER, plus one
+    trailing column holding MAPPING_REQUIRED for names that resolve to no
+    plan. Picking plans for a quote is a list of column indexes; rendering
+    is one itemgetter slice per row.
+    """
+    __slots__ = ("labels", "keys", "highlight", "plans", "_index", "_rows", "_missing")
+
+    def __init__(self, master: Mapping[str, Mapping[str, str]], features: Sequence[str]):
+        self.labels: Tuple[str, ...] = tuple(features)
+        self.keys: Tuple[str, ...] = tuple(feature_key(f) for f in self.labels)
+        self.highlight: Tuple[bool, ...] = tuple(k == HIGHLIGHT_FEATURE for k in self.keys)
+        self.plans: Tuple[str, ...] = tuple(master)
+        self._index: Dict[str, int] = {p: i for i, p in enumerate(self.plans)}
+        self._missing = len(self.plans)
+        self._rows: Tuple[Tuple[str, ...], ...] = tuple(
+            tuple(master[p].get(k, "") for p in self.plans) + (MAPPING_REQUIRED,)
+            for k in self.keys
+        )
+
+    def column(self, master_key: Optional[str]) -> int:
+        """Column index of a MASTER key (the MAPPING_REQUIRED column if unknown)."""
+        return self._index.get(master_key, self._missing) if master_key else self._missing
+
+    def columns(self, master_keys: Iterable[Optional[str]]) -> List[int]:
+        return [self.column(k) for k in master_keys]
+
+    def rows(self, cols: Sequence[int]) -> Iterator[Tuple[str, bool, Tuple[str, ...]]]:
+        """Yield (label, highlight, values for `cols`) for every feature, in order."""
+        if not cols:
+            pick = lambda row: ()  # noqa: E731
+        elif len(cols) == 1:
+            c = cols[0]
+            pick = lambda row: (row[c],)  # noqa: E731
+        else:
+            pick = itemgetter(*cols)
+        for label, hl, row in zip(self.labels, self.highlight, self._rows):
+            yield label, hl, pick(row)
+
+    def value(self, feature: str, master_key: Optional[str]) -> str:
+        return self._rows[self.keys.index(feature)][self.column(master_key)]
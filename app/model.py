@@ -0,0 +1,73 @@
+# app/model.py
+from typing import NamedTuple, Optional, Tuple
+
+# Fixed text shared by every output format
+TITLE = "🏥 Health Insurance Quote"
+PREPARED_BY = "Prepared by your trusted advisor – "
+CLIENT_HEADING = "👤 Client Details"
+PREMIUM_HEADING = "💰 Premium Summary"
+FEATURE_HEADING = "🩺 Feature Comparison (Selected Insurers)"
+ADVISOR_HEADING = "💬 Advisor’s Recommendation"
+CLIENT_HEADERS = ("Member No.", "Name", "Relation", "DOB", "Age", "City", "Sum Assured")
+PREMIUM_HEADERS = ("Insurer / Plan Name", "1 Year Premium", "2 Year Premium", "3 Year Premium")
+ADVISOR_HEADERS = ("Plan", "Why choose this plan (quick points)")
+NO_HIGHLIGHTS = "See feature table above."
+NOTE_LABEL = "\nAdvisor Note: "
+NOTE_TEXT = ("Choose the plan matching your family's long-term protection, maternity and travel needs. "
+             "Discuss OPD and worldwide rider options before purchase.")
+
+
+class ClientRow(NamedTuple):
+    member_no: str
+    name: str
+    relation: str
+    dob: str
+    age: str
+    city: str
+    sum_assured: str
+
+
+class PricedPlan(NamedTuple):
+    """One row of the premium summary."""
+    label: Optional[str]            # plan name as typed in the sheet
+    master_key: Optional[str]       # resolved MASTER key, if any
+    premiums: Tuple[str, str, str]  # display text for 1/2/3 Yr Premium
+    logo: Optional[str]             # logo file path, if one exists
+
+    @property
+    def display_name(self) -> str:
+        return self.master_key or self.label or ""
+
+
+class PlanColumn(NamedTuple):
+    """One compared plan: a feature-table column and an advisor-table row."""
+    name: str                       # MASTER key, or the raw name of an unmapped plan
+    master_key: Optional[str]
+    logo: Optional[str]
+    highlights: Optional[Tuple[str, ...]]
+
+
+class FeatureRow(NamedTuple):
+    label: str
+    highlight: bool
+    values: Tuple[str, ...]         # one per PlanColumn
+
+
+class Quote(NamedTuple):
+    """
+    Everything a quote shows, independent of output format. Built by
+    app.processor.build_quote(); rendered to DOCX, HTML or PDF.
+    """
+    prepared_on: str
+    logo_folder: str
+    header_logo: Optional[str]
+    client_name: str
+    clients: Tuple[ClientRow, ...]
+    premiums: Tuple[PricedPlan, ...]
+    plans: Tuple[PlanColumn, ...]
+    features: Tuple[FeatureRow, ...]
+    catalogue: str = ""             # digest of the catalogue snapshot the quote was built from
+
+    @property
+    def prepared_by(self) -> str:
+        return PREPARED_BY + self.prepared_on
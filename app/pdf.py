@@ -0,0 +1,545 @@
+# app/pdf.py
+import struct
+import threading
+import unicodedata
+import zlib
+from typing import Dict, List, NamedTuple, Optional, Sequence, Tuple
+
+from app.logos import LOGOS
+from app.model import (
+    ADVISOR_HEADERS, ADVISOR_HEADING, CLIENT_HEADERS, CLIENT_HEADING, FEATURE_HEADING, NO_HIGHLIGHTS,
+    NOTE_LABEL, NOTE_TEXT, PREMIUM_HEADERS, PREMIUM_HEADING, TITLE, Quote,
+)
+
+# A4 portrait, in points
+PAGE_W, PAGE_H = 595.28, 841.89
+MARGIN = 40.0
+CONTENT_W = PAGE_W - 2 * MARGIN
+CELL_PAD = 4.0
+LINE = 1.25  # line height as a multiple of the font size
+
+Color = Tuple[float, float, float]
+BLACK: Color = (0, 0, 0)
+WHITE: Color = (1, 1, 1)
+HEADER_BG: Color = (0x00 / 255, 0xA3 / 255, 0x6C / 255)
+LABEL_BG: Color = (0xEA / 255, 0xF6 / 255, 0xEA / 255)
+HIGHLIGHT_BG: Color = (0xFF / 255, 0xF6 / 255, 0x8F / 255)
+
+# ---------- Fonts ----------
+# Advance widths (1/1000 em) of the standard 14 Helvetica faces for ASCII 32..126
+_HELVETICA = (
+    278, 278, 355, 556, 556, 889, 667, 191, 333, 333, 389, 584, 278, 333, 278, 278,
+    556, 556, 556, 556, 556, 556, 556, 556, 556, 556, 278, 278, 584, 584, 584, 556,
+    1015, 667, 667, 722, 722, 667, 611, 778, 722, 278, 500, 667, 556, 833, 722, 778,
+    667, 778, 722, 667, 611, 722, 667, 944, 667, 667, 611, 278, 278, 278, 469, 556,
+    333, 556, 556, 500, 556, 556, 278, 556, 556, 222, 222, 500, 222, 833, 556, 556,
+    556, 556, 333, 500, 278, 556, 500, 722, 500, 500, 500, 334, 260, 334, 584,
+)
+_HELVETICA_BOLD = (
+    278, 333, 474, 556, 556, 889, 722, 238, 333, 333, 389, 584, 278, 333, 278, 278,
+    556, 556, 556, 556, 556, 556, 556, 556, 556, 556, 333, 333, 584, 584, 584, 611,
+    975, 722, 722, 722, 722, 667, 611, 778, 722, 278, 556, 722, 611, 833, 722, 778,
+    667, 778, 722, 667, 611, 722, 667, 944, 667, 667, 611, 333, 278, 333, 584, 556,
+    333, 556, 611, 556, 611, 556, 333, 611, 611, 278, 278, 556, 278, 889, 611, 611,
+    611, 611, 389, 556, 333, 611, 556, 778, 556, 556, 500, 389, 280, 389, 584,
+)
+# WinAnsi punctuation above 127 that the quote text uses
+_HIGH = {0x85: 1000, 0x91: 222, 0x92: 222, 0x93: 333, 0x94: 333, 0x95: 350, 0x96: 556, 0x97: 1000}
+_HIGH_BOLD = {0x85: 1000, 0x91: 278, 0x92: 278, 0x93: 500, 0x94: 500, 0x95: 350, 0x96: 556, 0x97: 1000}
+
+
+class _Font(NamedTuple):
+    key: str          # resource name, e.g. /F1
+    base: str
+    ascii: Tuple[int, ...]
+    high: Dict[int, int]
+
+    def width(self, data: bytes, size: float) -> float:
+        total = 0
+        for b in data:
+            total += self.ascii[b - 32] if 32 <= b <= 126 else self.high.get(b, 556)
+        return total * size / 1000.0
+
+
+REGULAR = _Font("F1", "Helvetica", _HELVETICA, _HIGH)
+BOLD = _Font("F2", "Helvetica-Bold", _HELVETICA_BOLD, _HIGH_BOLD)
+ITALIC = _Font("F3", "Helvetica-Oblique", _HELVETICA, _HIGH)
+FONTS = (REGULAR, BOLD, ITALIC)
+
+
+# Symbols outside WinAnsi that have a plain-text spelling
+_SPELLED = str.maketrans({"₹": "Rs.", "−": "-", "✓": "v", "✔": "v", "≤": "<=", "≥": ">="})
+
+
+def _winansi_char(c: str) -> str:
+    if c.encode("cp1252", errors="ignore"):
+        return c
+    # Pictographs (the emoji before feature labels) and their joiners/selectors are
+    # decoration and are left out; anything else the base fonts lack shows as "?"
+    return "" if unicodedata.category(c) in ("So", "Mn", "Cf") else "?"
+
+
+def _encode(text: str) -> bytes:
+    """WinAnsi bytes for `text`: ₹ is spelled "Rs.", emoji are left out and other characters the base fonts lack become "?"."""
+    text = str(text)
+    try:
+        data = text.encode("cp1252")
+    except UnicodeEncodeError:
+        text = unicodedata.normalize("NFC", text).translate(_SPELLED)
+        data = "".join(map(_winansi_char, text)).encode("cp1252")
+    return b" ".join(data.split())
+
+
+def _wrap(text: str, font: _Font, size: float, width: float) -> List[bytes]:
+    lines: List[bytes] = []
+    for para in str(text).split("\n"):
+        words = _encode(para).split(b" ")
+        cur = b""
+        for word in words:
+            cand = cur + b" " + word if cur else word
+            if font.width(cand, size) <= width or not cur:
+                cur = cand
+            else:
+                lines.append(cur)
+                cur = word
+            # A single word wider than the cell is broken by characters
+            while font.width(cur, size) > width and len(cur) > 1:
+                cut = len(cur) - 1
+                while cut > 1 and font.width(cur[:cut], size) > width:
+                    cut -= 1
+                lines.append(cur[:cut])
+                cur = cur[cut:]
+        lines.append(cur)
+    return lines
+
+
+def _pdf_string(data: bytes) -> str:
+    out = []
+    for b in data:
+        if b in (0x28, 0x29, 0x5C):
+            out.append("\\" + chr(b))
+        elif 32 <= b <= 126:
+            out.append(chr(b))
+        else:
+            out.append(f"\\{b:03o}")
+    return "(" + "".join(out) + ")"
+
+
+def _num(v: float) -> str:
+    return "%.2f" % v
+
+
+def _rgb(color: Color) -> str:
+    return "%.3f %.3f %.3f rg" % color
+
+
+# ---------- Images ----------
+class _Image(NamedTuple):
+    """A logo converted to PDF image XObject data (independent of any document)."""
+    width: int
+    height: int
+    entries: str                # dictionary entries besides /Width, /Height, /Length
+    data: bytes
+    smask: Optional[bytes]      # Flate-compressed 8-bit alpha channel
+
+
+_SOF = {0xC0, 0xC1, 0xC2, 0xC3, 0xC5, 0xC6, 0xC7, 0xC9, 0xCA, 0xCB, 0xCD, 0xCE, 0xCF}
+
+
+def _jpeg(blob: bytes) -> Optional[_Image]:
+    i = 2
+    while i + 9 < len(blob):
+        if blob[i] != 0xFF:
+            i += 1
+            continue
+        marker = blob[i + 1]
+        if marker == 0xFF:
+            i += 1
+            continue
+        if marker in (0x01, 0xD8) or 0xD0 <= marker <= 0xD7:
+            i += 2
+            continue
+        length = struct.unpack(">H", blob[i + 2:i + 4])[0]
+        if marker in _SOF:
+            bpc = blob[i + 4]
+            h, w = struct.unpack(">HH", blob[i + 5:i + 9])
+            comps = blob[i + 9]
+            space = {1: "/DeviceGray", 3: "/DeviceRGB", 4: "/DeviceCMYK"}.get(comps)
+            if space is None:
+                return None
+            extra = " /Decode [1 0 1 0 1 0 1 0]" if comps == 4 else ""
+            return _Image(w, h, f"/ColorSpace {space} /BitsPerComponent {bpc} /Filter /DCTDecode{extra}", blob, None)
+        i += 2 + length
+    return None
+
+
+def _paeth(a: int, b: int, c: int) -> int:
+    p = a + b - c
+    pa, pb, pc = abs(p - a), abs(p - b), abs(p - c)
+    if pa <= pb and pa <= pc:
+        return a
+    return b if pb <= pc else c
+
+
+def _unfilter(raw: bytes, width: int, height: int, bpp: int) -> bytearray:
+    stride = width * bpp
+    out = bytearray()
+    prev = bytearray(stride)
+    pos = 0
+    for _ in range(height):
+        ftype = raw[pos]
+        line = bytearray(raw[pos + 1:pos + 1 + stride])
+        pos += 1 + stride
+        if ftype == 1:
+            for i in range(bpp, stride):
+                line[i] = (line[i] + line[i - bpp]) & 0xFF
+        elif ftype == 2:
+            for i in range(stride):
+                line[i] = (line[i] + prev[i]) & 0xFF
+        elif ftype == 3:
+            for i in range(stride):
+                left = line[i - bpp] if i >= bpp else 0
+                line[i] = (line[i] + ((left + prev[i]) >> 1)) & 0xFF
+        elif ftype == 4:
+            for i in range(stride):
+                left = line[i - bpp] if i >= bpp else 0
+                upleft = prev[i - bpp] if i >= bpp else 0
+                line[i] = (line[i] + _paeth(left, prev[i], upleft)) & 0xFF
+        out += line
+        prev = line
+    return out
+
+
+def _png(blob: bytes) -> Optional[_Image]:
+    pos, idat, palette = 8, [], b""
+    width = height = depth = ctype = interlace = 0
+    while pos + 8 <= len(blob):
+        length, kind = struct.unpack(">I4s", blob[pos:pos + 8])
+        body = blob[pos + 8:pos + 8 + length]
+        if kind == b"IHDR":
+            width, height, depth, ctype, _, _, interlace = struct.unpack(">IIBBBBB", body)
+        elif kind == b"PLTE":
+            palette = body
+        elif kind == b"IDAT":
+            idat.append(body)
+        elif kind == b"IEND":
+            break
+        pos += 12 + length
+    if depth != 8 or interlace or not idat:
+        return None
+    data = b"".join(idat)
+    if ctype in (0, 2, 3):
+        # Still PNG-predicted: let the viewer undo the filters
+        colors = 3 if ctype == 2 else 1
+        if ctype == 3:
+            space = f"[/Indexed /DeviceRGB {len(palette) // 3 - 1} <{palette.hex()}>]"
+        else:
+            space = "/DeviceRGB" if ctype == 2 else "/DeviceGray"
+        parms = f"/DecodeParms << /Predictor 15 /Colors {colors} /BitsPerComponent 8 /Columns {width} >>"
+        return _Image(width, height, f"/ColorSpace {space} /BitsPerComponent 8 /Filter /FlateDecode {parms}", data, None)
+    if ctype in (4, 6):
+        # Alpha has to become a separate soft mask, so decode the pixels once
+        bpp = 2 if ctype == 4 else 4
+        px = _unfilter(zlib.decompress(data), width, height, bpp)
+        alpha = bytes(px[bpp - 1::bpp])
+        if ctype == 4:
+            color, space = bytes(px[0::2]), "/DeviceGray"
+        else:
+            color = bytearray(len(px) // 4 * 3)
+            color[0::3], color[1::3], color[2::3] = px[0::4], px[1::4], px[2::4]
+            color, space = bytes(color), "/DeviceRGB"
+        return _Image(width, height, f"/ColorSpace {space} /BitsPerComponent 8 /Filter /FlateDecode",
+                      zlib.compress(color), zlib.compress(alpha))
+    return None
+
+
+_image_lock = threading.Lock()
+# abs path -> (mtime, converted image or None if the format is unsupported)
+_images: Dict[str, Tuple[float, Optional[_Image]]] = {}
+
+
+def _image(path: Optional[str]) -> Optional[Tuple[str, _Image]]:
+    """(path, PDF image) for a logo, converted once per file version."""
+    asset = LOGOS.load(path)
+    if asset is None:
+        return None
+    entry = _images.get(asset.path)
+    if entry is None or entry[0] != asset.mtime:
+        blob = asset.blob
+        try:
+            img = _jpeg(blob) if blob[:2] == b"\xff\xd8" else _png(blob) if blob[:8] == b"\x89PNG\r\n\x1a\n" else None
+        except Exception:
+            img = None
+        entry = (asset.mtime, img)
+        with _image_lock:
+            _images[asset.path] = entry
+    return (asset.path, entry[1]) if entry[1] is not None else None
+
+
+# ---------- Document ----------
+class _Text(NamedTuple):
+    text: str
+    font: _Font = REGULAR
+    size: float = 9.0
+    color: Color = BLACK
+    align: str = "left"
+
+
+class _Logo(NamedTuple):
+    path: Optional[str]
+    width: float
+    align: str = "center"
+
+
+class _Cell(NamedTuple):
+    items: Tuple
+    fill: Optional[Color] = None
+
+
+class _Writer:
+    """Flows paragraphs, images and tables top-to-bottom over A4 pages."""
+
+    def __init__(self):
+        self.pages: List[List[str]] = []
+        self.images: Dict[str, Tuple[str, _Image]] = {}   # path -> (resource name, image)
+        self.y = 0.0
+        self._new_page()
+
+    def _new_page(self):
+        self.ops: List[str] = []
+        self.pages.append(self.ops)
+        self.y = PAGE_H - MARGIN
+
+    def _room(self, height: float):
+        if self.y - height < MARGIN and self.y < PAGE_H - MARGIN:
+            self._new_page()
+
+    # -- primitives --
+    def _text_line(self, data: bytes, font: _Font, size: float, x: float, baseline: float, color: Color):
+        if not data:
+            return
+        op = "BT /%s %.1f Tf %.2f %.2f Td %s Tj ET" % (font.key, size, x, baseline, _pdf_string(data))
+        self.ops.append(op if color == BLACK else f"{_rgb(color)} {op} 0 g")
+
+    def _fill(self, x: float, y: float, w: float, h: float, color: Color):
+        self.ops.append(f"{_rgb(color)} %.2f %.2f %.2f %.2f re f 0 g" % (x, y, w, h))
+
+    def _image_ref(self, path: Optional[str]) -> Optional[Tuple[str, _Image]]:
+        found = _image(path)
+        if found is None:
+            return None
+        key, img = found
+        if key not in self.images:
+            self.images[key] = (f"Im{len(self.images) + 1}", img)
+        return self.images[key]
+
+    def _logo_size(self, logo: _Logo, max_w: float) -> Optional[Tuple[str, float, float]]:
+        ref = self._image_ref(logo.path)
+        if ref is None:
+            return None
+        name, img = ref
+        w = min(logo.width, max_w)
+        return name, w, w * img.height / float(img.width)
+
+    # -- flow content --
+    def paragraph(self, text: str, font: _Font = REGULAR, size: float = 10.0, align: str = "left",
+                  before: float = 0.0, after: float = 4.0):
+        lines = _wrap(text, font, size, CONTENT_W)
+        self.y -= before
+        for data in lines:
+            self._room(size * LINE)
+            self.y -= size * LINE
+            x = MARGIN
+            if align == "center":
+                x = MARGIN + (CONTENT_W - font.width(data, size)) / 2
+            self._text_line(data, font, size, x, self.y + size * 0.25, BLACK)
+        self.y -= after
+
+    def logo(self, path: Optional[str], width: float, after: float = 6.0):
+        size = self._logo_size(_Logo(path, width), CONTENT_W)
+        if size is None:
+            return
+        name, w, h = size
+        self._room(h)
+        self.y -= h
+        self.ops.append(f"q {_num(w)} 0 0 {_num(h)} {_num(MARGIN + (CONTENT_W - w) / 2)} {_num(self.y)} cm /{name} Do Q")
+        self.y -= after
+
+    def _layout_cell(self, cell: _Cell, width: float):
+        inner = width - 2 * CELL_PAD
+        blocks, height = [], 0.0
+        for item in cell.items:
+            if isinstance(item, _Logo):
+                size = self._logo_size(item, inner)
+                if size is not None:
+                    blocks.append((item, size))
+                    height += size[2] + 2
+            else:
+                lines = _wrap(item.text, item.font, item.size, inner)
+                blocks.append((item, lines))
+                height += len(lines) * item.size * LINE
+        return blocks, height + 2 * CELL_PAD
+
+    def _draw_row(self, widths: Sequence[float], row: Sequence[_Cell], laid, height: float):
+        top = self.y
+        x = MARGIN
+        for w, cell in zip(widths, row):
+            if cell.fill is not None:
+                self._fill(x, top - height, w, height, cell.fill)
+            x += w
+        x = MARGIN
+        for w, (blocks, _) in zip(widths, laid):
+            y = top - CELL_PAD
+            inner = w - 2 * CELL_PAD
+            for item, payload in blocks:
+                if isinstance(item, _Logo):
+                    name, iw, ih = payload
+                    ix = x + CELL_PAD + ((inner - iw) / 2 if item.align == "center" else 0)
+                    y -= ih
+                    self.ops.append(f"q {_num(iw)} 0 0 {_num(ih)} {_num(ix)} {_num(y)} cm /{name} Do Q")
+                    y -= 2
+                else:
+                    for data in payload:
+                        y -= item.size * LINE
+                        tx = x + CELL_PAD
+                        if item.align == "center":
+                            tx += (inner - item.font.width(data, item.size)) / 2
+                        self._text_line(data, item.font, item.size, tx, y + item.size * 0.3, item.color)
+            x += w
+        # Borders last so fills never cover them
+        x = MARGIN
+        cells = []
+        for w in widths:
+            cells.append(f"{_num(x)} {_num(top - height)} {_num(w)} {_num(height)} re")
+            x += w
+        self.ops.append("0.75 w 0 G " + " ".join(cells) + " S")
+        self.y = top - height
+
+    def table(self, widths: Sequence[float], header: Sequence[Sequence[_Cell]], body: Sequence[Sequence[_Cell]]):
+        """Draw a bordered table; header rows are repeated at the top of each new page."""
+        head = [(row, [self._layout_cell(c, w) for c, w in zip(row, widths)]) for row in header]
+        head_h = [max(h for _, h in laid) for _, laid in head]
+
+        def draw_header():
+            for (row, laid), h in zip(head, head_h):
+                self._draw_row(widths, row, laid, h)
+
+        self._room(sum(head_h) + 20)
+        draw_header()
+        for row in body:
+            laid = [self._layout_cell(c, w) for c, w in zip(row, widths)]
+            h = max(hh for _, hh in laid)
+            if self.y - h < MARGIN:
+                self._new_page()
+                draw_header()
+            self._draw_row(widths, row, laid, h)
+        self.y -= 4
+
+    # -- output --
+    def tobytes(self, title: str) -> bytes:
+        objects: List[bytes] = []
+
+        def add(body: bytes) -> int:
+            objects.append(body)
+            return len(objects)
+
+        def stream(entries: str, data: bytes) -> bytes:
+            return f"<< {entries} /Length {len(data)} >>\nstream\n".encode("latin-1") + data + b"\nendstream"
+
+        catalog = add(b"")
+        pages_id = add(b"")
+        font_ids = {f.key: add(f"<< /Type /Font /Subtype /Type1 /BaseFont /{f.base} /Encoding /WinAnsiEncoding >>".encode())
+                    for f in FONTS}
+        xobjects = []
+        for name, img in self.images.values():
+            extra = ""
+            if img.smask is not None:
+                mask_id = add(stream(f"/Type /XObject /Subtype /Image /Width {img.width} /Height {img.height} "
+                                     f"/ColorSpace /DeviceGray /BitsPerComponent 8 /Filter /FlateDecode", img.smask))
+                extra = f" /SMask {mask_id} 0 R"
+            img_id = add(stream(f"/Type /XObject /Subtype /Image /Width {img.width} /Height {img.height} "
+                                f"{img.entries}{extra}", img.data))
+            xobjects.append(f"/{name} {img_id} 0 R")
+        fonts = " ".join(f"/{k} {v} 0 R" for k, v in font_ids.items())
+        resources = add(f"<< /Font << {fonts} >> /XObject << {' '.join(xobjects)} >> >>".encode())
+
+        kids = []
+        for ops in self.pages:
+            content = add(stream("/Filter /FlateDecode", zlib.compress("\n".join(ops).encode("latin-1"))))
+            kids.append(add(
+                f"<< /Type /Page /Parent {pages_id} 0 R /MediaBox [0 0 {_num(PAGE_W)} {_num(PAGE_H)}] "
+                f"/Resources {resources} 0 R /Contents {content} 0 R >>".encode()
+            ))
+        objects[pages_id - 1] = f"<< /Type /Pages /Kids [{' '.join(f'{k} 0 R' for k in kids)}] /Count {len(kids)} >>".encode()
+        objects[catalog - 1] = f"<< /Type /Catalog /Pages {pages_id} 0 R >>".encode()
+        info = add(f"<< /Title {_pdf_string(_encode(title))} /Producer (Health Quote Generator) >>".encode("latin-1"))
+
+        out = bytearray(b"%PDF-1.4\n%\xe2\xe3\xcf\xd3\n")
+        offsets = []
+        for i, body in enumerate(objects, start=1):
+            offsets.append(len(out))
+            out += f"{i} 0 obj\n".encode() + body + b"\nendobj\n"
+        xref = len(out)
+        out += f"xref\n0 {len(objects) + 1}\n0000000000 65535 f \n".encode()
+        out += "".join(f"{o:010d} 00000 n \n" for o in offsets).encode()
+        out += f"trailer\n<< /Size {len(objects) + 1} /Root {catalog} 0 R /Info {info} 0 R >>\nstartxref\n{xref}\n%%EOF\n".encode()
+        return bytes(out)
+
+
+def _header_row(texts: Sequence[str], size: float = 9.0) -> List[_Cell]:
+    return [_Cell((_Text(t, BOLD, size, WHITE),), HEADER_BG) for t in texts]
+
+
+def render_pdf(quote: Quote) -> bytes:
+    """Render a Quote as a PDF using only the standard library (base-14 fonts, embedded logos)."""
+    w = _Writer()
+    if quote.header_logo:
+        w.logo(quote.header_logo, 1.8 * 72)
+    w.paragraph(TITLE, BOLD, 14, align="center", after=2)
+    w.paragraph(quote.prepared_by, REGULAR, 10, after=6)
+
+    w.paragraph(CLIENT_HEADING, BOLD, 11, before=8)
+    widths = [CONTENT_W * f for f in (0.09, 0.19, 0.13, 0.13, 0.07, 0.17, 0.22)]
+    body = [[_Cell((_Text(v),)) for v in client] for client in quote.clients] or [[_Cell(())] * 7]
+    w.table(widths, [_header_row(CLIENT_HEADERS)], body)
+
+    w.paragraph(PREMIUM_HEADING, BOLD, 11, before=8)
+    widths = [CONTENT_W * f for f in (0.37, 0.21, 0.21, 0.21)]
+    body = []
+    for line in quote.premiums:
+        name = _Cell((_Logo(line.logo, 72), _Text(line.display_name, BOLD, 10, align="center")))
+        body.append([name] + [_Cell((_Text(p),)) for p in line.premiums])
+    w.table(widths, [_header_row(PREMIUM_HEADERS)], body)
+
+    w.paragraph(FEATURE_HEADING, BOLD, 11, before=8)
+    n = max(1, len(quote.plans))
+    size = 8.0 if n <= 4 else 7.0 if n <= 6 else 6.0
+    label_w = min(2.2 * 72, CONTENT_W * 0.3)
+    widths = [label_w] + [(CONTENT_W - label_w) / n] * len(quote.plans)
+    header = [
+        [_Cell((), HEADER_BG)] + [_Cell((_Logo(p.logo, 72),), HEADER_BG) for p in quote.plans],
+        _header_row(["Feature"] + [p.name for p in quote.plans], size),
+    ]
+    body = []
+    for row in quote.features:
+        fill = HIGHLIGHT_BG if row.highlight else None
+        cells = [_Cell((_Text(row.label, BOLD, size),), fill or LABEL_BG)]
+        cells += [_Cell((_Text(v, REGULAR, size),), fill) for v in row.values]
+        body.append(cells)
+    w.table(widths, header, body)
+
+    w.paragraph(ADVISOR_HEADING, BOLD, 11, before=8)
+    widths = [2.0 * 72, CONTENT_W - 2.0 * 72]
+    body = []
+    for plan in quote.plans:
+        left = _Cell((_Logo(plan.logo, 72, align="left"), _Text(plan.name, BOLD, 11)))
+        if plan.highlights is not None:
+            right = _Cell(tuple(_Text(f"• {h}", REGULAR, 9) for h in plan.highlights))
+        else:
+            right = _Cell((_Text(NO_HIGHLIGHTS),))
+        body.append([left, right])
+    w.table(widths, [_header_row(ADVISOR_HEADERS)], body)
+
+    w.paragraph(NOTE_LABEL.strip(), BOLD, 10, before=6, after=1)
+    w.paragraph(NOTE_TEXT, ITALIC, 10)
+    return w.tobytes(TITLE)
@@ -0,0 +1,140 @@
+# app/preview.py
+import base64
+import threading
+from html import escape
+from typing import Dict, List, Optional, Tuple
+
+from app.logos import LOGOS
+from app.model import (
+    ADVISOR_HEADERS, ADVISOR_HEADING, CLIENT_HEADERS, CLIENT_HEADING, FEATURE_HEADING, NO_HIGHLIGHTS,
+    NOTE_LABEL, NOTE_TEXT, PREMIUM_HEADERS, PREMIUM_HEADING, TITLE, Quote,
+)
+
+# Same palette as the DOCX
+HEADER_BG = "#00A36C"
+LABEL_BG = "#EAF6EA"
+HIGHLIGHT_BG = "#FFF68F"
+
+_CSS = f"""
+body{{font-family:Calibri,Carlito,system-ui,-apple-system,Segoe UI,Roboto,sans-serif;font-size:11pt;max-width:960px;margin:1.5rem auto;padding:0 1rem;color:#000}}
+.center{{text-align:center}}
+h1{{font-size:1.3em;margin:.4em 0}}
+h2{{font-size:1.05em;margin:1.4em 0 .4em}}
+table{{border-collapse:collapse;width:100%;margin-bottom:.5em}}
+th,td{{border:1px solid #000;padding:4px 6px;vertical-align:top}}
+th{{background:{HEADER_BG};color:#fff;font-size:10.5pt;text-align:left}}
+td.label{{background:{LABEL_BG};font-weight:bold;font-size:10.5pt}}
+tr.highlight td{{background:{HIGHLIGHT_BG}}}
+td.plan{{text-align:center;font-weight:bold}}
+svg.logo{{display:block}}
+td.plan svg.logo{{margin:0 auto 2px}}
+div.header svg.logo{{margin:0 auto}}
+ul{{margin:0;padding-left:1.1em;font-size:10pt}}
+.note{{margin-top:1em}}
+"""
+
+_uri_lock = threading.Lock()
+# abs path -> (mtime, data URI)
+_uris: Dict[str, Tuple[float, str]] = {}
+
+
+def _logo_uri(path: Optional[str]) -> Optional[str]:
+    asset = LOGOS.load(path)
+    if asset is None:
+        return None
+    entry = _uris.get(asset.path)
+    if entry is not None and entry[0] == asset.mtime:
+        return entry[1]
+    uri = f"data:{asset.content_type};base64,{base64.b64encode(asset.blob).decode('ascii')}"
+    with _uri_lock:
+        _uris[asset.path] = (asset.mtime, uri)
+    return uri
+
+
+class _Logos:
+    """
+    Logos used by one page. Each image is inlined once in a hidden <svg>
+    and referenced with <use>, so a 500-row premium table stays small.
+    """
+
+    def __init__(self):
+        self.ids: Dict[str, str] = {}
+        self.defs: List[str] = []
+
+    def img(self, path: Optional[str], width_px: int = 96) -> str:
+        asset = LOGOS.load(path)
+        if asset is None or not asset.px_width:
+            return ""
+        ratio = asset.px_height / float(asset.px_width)
+        ref = self.ids.get(asset.path)
+        if ref is None:
+            ref = self.ids[asset.path] = f"logo{len(self.ids) + 1}"
+            self.defs.append(
+                f'<symbol id="{ref}" viewBox="0 0 {asset.px_width} {asset.px_height}">'
+                f'<image href="{_logo_uri(path)}" width="{asset.px_width}" height="{asset.px_height}"/></symbol>'
+            )
+        return (f'<svg class="logo" width="{width_px}" height="{round(width_px * ratio)}">'
+                f'<use href="#{ref}"/></svg>')
+
+    def sprite(self) -> str:
+        if not self.defs:
+            return ""
+        return '<svg style="position:absolute;width:0;height:0" aria-hidden="true">' + "".join(self.defs) + "</svg>"
+
+
+def _row(cells: List[str], tag: str = "td") -> str:
+    return "<tr>" + "".join(f"<{tag}>{c}</{tag}>" for c in cells) + "</tr>"
+
+
+def render_html(quote: Quote) -> bytes:
+    """Self-contained HTML page (logos inlined) mirroring the DOCX layout."""
+    e = escape
+    logos = _Logos()
+    _img = logos.img
+    out: List[str] = []
+    if quote.header_logo:
+        out.append(f'<div class="header">{_img(quote.header_logo, 173)}</div>')
+    out.append(f'<h1 class="center">{e(TITLE)}</h1><p>{e(quote.prepared_by)}</p>')
+
+    out.append(f"<h2>{e(CLIENT_HEADING)}</h2><table>")
+    out.append(_row([e(h) for h in CLIENT_HEADERS], "th"))
+    if quote.clients:
+        for client in quote.clients:
+            out.append(_row([e(v) for v in client]))
+    else:
+        out.append(_row([""] * len(CLIENT_HEADERS)))
+    out.append("</table>")
+
+    out.append(f"<h2>{e(PREMIUM_HEADING)}</h2><table>")
+    out.append(_row([e(h) for h in PREMIUM_HEADERS], "th"))
+    for line in quote.premiums:
+        name = f'<td class="plan">{_img(line.logo)}{e(line.display_name)}</td>'
+        out.append("<tr>" + name + "".join(f"<td>{e(p)}</td>" for p in line.premiums) + "</tr>")
+    out.append("</table>")
+
+    out.append(f"<h2>{e(FEATURE_HEADING)}</h2><table>")
+    out.append(_row([""] + [_img(p.logo) for p in quote.plans], "th"))
+    out.append(_row(["Feature"] + [e(p.name) for p in quote.plans], "th"))
+    for row in quote.features:
+        cls = ' class="highlight"' if row.highlight else ""
+        out.append(
+            f"<tr{cls}><td class=\"label\">{e(row.label)}</td>"
+            + "".join(f"<td>{e(v)}</td>" for v in row.values) + "</tr>"
+        )
+    out.append("</table>")
+
+    out.append(f"<h2>{e(ADVISOR_HEADING)}</h2><table>")
+    out.append(_row([e(h) for h in ADVISOR_HEADERS], "th"))
+    for plan in quote.plans:
+        left = f"{_img(plan.logo)}<b style=\"font-size:12pt\">{e(plan.name)}</b>"
+        if plan.highlights is not None:
+            right = "<ul>" + "".join(f"<li>{e(h)}</li>" for h in plan.highlights) + "</ul>"
+        else:
+            right = e(NO_HIGHLIGHTS)
+        out.append(_row([left, right]))
+    out.append("</table>")
+
+    out.append(f'<p class="note"><b>{e(NOTE_LABEL.strip())}</b> <i>{e(NOTE_TEXT)}</i></p>')
+    head = ("<!doctype html><html><head><meta charset='utf-8'>"
+            f"<title>{e(TITLE)}</title><style>{_CSS}</style></head><body>")
+    return (head + logos.sprite() + "".join(out) + "</body></html>").encode("utf-8")
@@ -0,0 +1,405 @@
+# app/pricing.py
+import hashlib
+import json
+import os
+import re
+import sys
+import threading
+import time
+from typing import Dict, Iterable, List, Mapping, Optional, Sequence, Tuple
+
+SCHEMA = 1
+TENURES = (1, 2, 3)
+DEFAULT_FOLDER = os.path.join(os.path.dirname(os.path.abspath(__file__)), "data", "rates")
+
+# Amount words advisors type in 'Sum Assured' ("50 Lakh", "1 Cr", "5L", "750k")
+_UNITS = {
+    "k": 1e3, "thousand": 1e3,
+    "l": 1e5, "lac": 1e5, "lacs": 1e5, "lakh": 1e5, "lakhs": 1e5,
+    "cr": 1e7, "crore": 1e7, "crores": 1e7,
+}
+_AMOUNT = re.compile(r"^(\d+(?:\.\d+)?)\s*([a-z]*)\.?$")
+
+
+def parse_amount(value) -> Optional[float]:
+    """Rupees from a number or text like '50 Lakh', '1 Cr', '5,00,000' or '₹10L'; None if unreadable."""
+    if value is None or isinstance(value, bool):
+        return None
+    if isinstance(value, (int, float)):
+        return float(value) if value == value and value > 0 else None
+    s = str(value).strip().lower().replace(",", "").replace("₹", "")
+    s = re.sub(r"^(rs\.?|inr)\s*", "", s)
+    m = _AMOUNT.match(s)
+    if not m:
+        return None
+    unit = m.group(2)
+    if unit and unit not in _UNITS:
+        return None
+    amount = float(m.group(1)) * _UNITS.get(unit, 1.0)
+    return amount if amount > 0 else None
+
+
+def parse_age(value) -> float:
+    """Age in whole years, NaN if unreadable."""
+    if value is None or isinstance(value, bool):
+        return float("nan")
+    try:
+        age = float(str(value).strip()) if isinstance(value, str) else float(value)
+    except (TypeError, ValueError):
+        return float("nan")
+    return float(int(age)) if 0 <= age < float("inf") else float("nan")
+
+
+def format_inr(amount: float) -> str:
+    """12345678 -> '1,23,45,678' (Indian digit grouping, whole rupees)."""
+    digits = str(int(round(amount)))
+    sign = "-" if digits.startswith("-") else ""
+    digits = digits.lstrip("-")
+    if len(digits) <= 3:
+        return sign + digits
+    head, groups = digits[:-3], [digits[-3:]]
+    while len(head) > 2:
+        groups.insert(0, head[-2:])
+        head = head[:-2]
+    return sign + ",".join([head] + groups)
+
+
+class RateTable:
+    """
+    One plan's premium grid, validated from its JSON file:
+
+        {"schema": 1, "plan": "<catalogue plan key>", "version": "...",
+         "age_bands": [lower bound, ...],          ascending, last band open
+         "max_age": 99,                            optional
+         "zones": {"<zone>": ["City", ...] | "*"}, "*" = every other city
+         "sum_assured": [rupees, ...],
+         "rates": [[[annual premium per member, ...] per sum assured] per zone] per age band,
+         "tenure_discounts": [d1, d2, d3],         N-year premium = N x annual x (1 - dN)
+         "floater_discounts": {"2": d, "3": d}}    family total x (1 - d) by family size
+
+    A null rate means the combination is not offered.
+    """
+    __slots__ = ("plan", "version", "age_bands", "max_age", "zones", "cities", "default_zone",
+                 "sum_assured", "rates", "tenure_discounts", "floater_discounts", "source")
+
+    def __init__(self, plan, version, age_bands, max_age, zones, cities, default_zone,
+                 sum_assured, rates, tenure_discounts, floater_discounts, source=None):
+        self.plan = sys.intern(plan)
+        self.version = version
+        self.age_bands = age_bands
+        self.max_age = max_age
+        self.zones = zones
+        self.cities = cities
+        self.default_zone = default_zone
+        self.sum_assured = sum_assured
+        self.rates = rates
+        self.tenure_discounts = tenure_discounts
+        self.floater_discounts = floater_discounts
+        self.source = source
+
+    @classmethod
+    def from_dict(cls, data: Mapping, source: Optional[str] = None) -> "RateTable":
+        if not isinstance(data, Mapping):
+            raise ValueError("Rate table must be a JSON object")
+        if data.get("schema") != SCHEMA:
+            raise ValueError(f"Unsupported rate table schema {data.get('schema')!r} (expected {SCHEMA})")
+        plan = data.get("plan")
+        if not isinstance(plan, str) or not plan:
+            raise ValueError("'plan' must name a catalogue plan")
+
+        bands = data.get("age_bands")
+        if not (isinstance(bands, list) and bands and all(_is_number(b) for b in bands)
+                and all(a < b for a, b in zip(bands, bands[1:]))):
+            raise ValueError("'age_bands' must be ascending lower bounds")
+        max_age = data.get("max_age", float("inf"))
+        if not _is_number(max_age):
+            raise ValueError("'max_age' must be a number")
+
+        zones_in = data.get("zones")
+        if not isinstance(zones_in, Mapping) or not zones_in:
+            raise ValueError("'zones' must map zone names to city lists (or \"*\")")
+        zones, cities, default_zone = [], {}, -1
+        for zi, (zone, members) in enumerate(zones_in.items()):
+            zones.append(str(zone))
+            if members == "*":
+                if default_zone >= 0:
+                    raise ValueError("Only one zone may be \"*\"")
+                default_zone = zi
+            elif isinstance(members, list) and all(isinstance(c, str) for c in members):
+                for c in members:
+                    cities.setdefault(c.strip().casefold(), zi)
+            else:
+                raise ValueError(f"Zone {zone!r}: expected a list of cities or \"*\"")
+
+        sums = data.get("sum_assured")
+        if not (isinstance(sums, list) and sums and all(_is_number(s) and s > 0 for s in sums)):
+            raise ValueError("'sum_assured' must list positive amounts")
+
+        rates = data.get("rates")
+        shape = (len(bands), len(zones), len(sums))
+        if not _has_shape(rates, shape):
+            raise ValueError(f"'rates' must be nested lists of shape age_bands x zones x sum_assured {shape}")
+
+        tenure = data.get("tenure_discounts", [0.0] * len(TENURES))
+        if not (isinstance(tenure, list) and len(tenure) == len(TENURES)
+                and all(_is_number(d) and 0 <= d < 1 for d in tenure)):
+            raise ValueError(f"'tenure_discounts' must be {len(TENURES)} fractions in [0, 1)")
+        floater = data.get("floater_discounts", {})
+        if not (isinstance(floater, Mapping) and all(
+                str(k).isdigit() and int(k) >= 2 and _is_number(d) and 0 <= d < 1 for k, d in floater.items())):
+            raise ValueError("'floater_discounts' must map family sizes (2, 3, ...) to fractions in [0, 1)")
+
+        return cls(
+            plan, str(data.get("version", "0")), [float(b) for b in bands], float(max_age),
+            zones, cities, default_zone, [float(s) for s in sums], rates,
+            [float(d) for d in tenure], {int(k): float(d) for k, d in floater.items()}, source,
+        )
+
+    def floater_factor(self, size: int) -> float:
+        """Multiplier on the family total: the discount of the largest listed size <= `size`."""
+        keys = [k for k in self.floater_discounts if k <= size]
+        return 1.0 - self.floater_discounts[max(keys)] if keys else 1.0
+
+
+def _is_number(v) -> bool:
+    return isinstance(v, (int, float)) and not isinstance(v, bool) and v == v
+
+
+def _has_shape(value, shape: Tuple[int, ...]) -> bool:
+    if not shape:
+        return value is None or (_is_number(value) and value >= 0)
+    return (isinstance(value, list) and len(value) == shape[0]
+            and all(_has_shape(v, shape[1:]) for v in value))
+
+
+class RateBook:
+    """
+    Every plan's rate table stacked into dense NumPy arrays, padded with NaN
+    to a common shape:
+
+        rates[plan, age band, zone, sum assured, tenure]   N-year premium per member
+        bands[plan, band]                                  band lower bounds (+inf padding)
+        floater[plan, family size]                         multiplier on the family total
+
+    price() looks up every member against every plan with one gather and
+    sums families with np.add.reduceat, so thousands of families cost a few
+    array operations rather than a Python loop per member and plan.
+    """
+
+    def __init__(self, tables: Sequence[RateTable]):
+        import numpy as np
+
+        tables = sorted(tables, key=lambda t: t.plan)
+        self.tables = {t.plan: t for t in tables}
+        if len(self.tables) != len(tables):
+            raise ValueError("More than one rate table for the same plan")
+        self.plans: Tuple[str, ...] = tuple(t.plan for t in tables)
+        self.index = {p: i for i, p in enumerate(self.plans)}
+        n = len(tables)
+        na = max(len(t.age_bands) for t in tables)
+        nz = max(len(t.zones) for t in tables)
+        ns = max(len(t.sum_assured) for t in tables)
+        self.max_family = max([1] + [k for t in tables for k in t.floater_discounts])
+
+        self.bands = np.full((n, na), np.inf)
+        self.max_age = np.array([t.max_age for t in tables])
+        self.rates = np.full((n, na, nz, ns, len(TENURES)), np.nan)
+        self.floater = np.ones((n, self.max_family + 1))
+        years = np.array(TENURES, dtype=float)
+        for p, t in enumerate(tables):
+            self.bands[p, :len(t.age_bands)] = t.age_bands
+            annual = np.array(t.rates, dtype=float)  # null -> nan
+            tenure = years * (1.0 - np.array(t.tenure_discounts))
+            self.rates[p, :annual.shape[0], :annual.shape[1], :annual.shape[2]] = annual[..., None] * tenure
+            for size in range(self.max_family + 1):
+                self.floater[p, size] = t.floater_factor(size)
+        # amount -> sum assured index, per plan
+        self._sums = [{s: i for i, s in enumerate(t.sum_assured)} for t in tables]
+
+        payload = json.dumps(
+            [[t.plan, t.version, t.age_bands, t.max_age if t.max_age != float("inf") else None, t.zones,
+              sorted(t.cities.items()), t.default_zone, t.sum_assured, t.rates, t.tenure_discounts,
+              sorted(t.floater_discounts.items())] for t in tables],
+            sort_keys=True,
+        )
+        self.digest = hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+    def __contains__(self, plan) -> bool:
+        return plan in self.index
+
+    def versions(self) -> Dict[str, str]:
+        return {p: self.tables[p].version for p in self.plans}
+
+    def price(self, ages, cities: Sequence, sums: Sequence, sizes: Sequence[int],
+              plans: Optional[Sequence[str]] = None):
+        """
+        Premiums of families against plans.
+
+        Members are given column-wise (ages, cities, sums assured, one entry
+        per member, families one after another) and `sizes` says how many
+        members each family has. Returns an array [family, plan, tenure] of
+        whole-rupee premiums for 1/2/3 years, NaN where any member of the
+        family falls outside the plan's table (age, city zone or sum assured).
+        """
+        import numpy as np
+
+        missing = [p for p in plans or () if p not in self.index]
+        if missing:
+            raise ValueError(f"No rate table for {', '.join(map(repr, missing))}")
+        sel = np.arange(len(self.plans)) if plans is None else np.array([self.index[p] for p in plans], dtype=int)
+        ages = np.array([parse_age(a) for a in ages], dtype=float) if not isinstance(ages, np.ndarray) \
+            else ages.astype(float)
+        sizes = np.asarray(sizes, dtype=int)
+        m = len(ages)
+        if len(cities) != m or len(sums) != m or int(sizes.sum()) != m:
+            raise ValueError("ages, cities and sums must have one entry per member, and sizes must add up to them")
+        if len(sizes) and sizes.min() < 1:
+            raise ValueError("Every family needs at least one member")
+        if not len(sizes) or not len(sel):
+            return np.full((len(sizes), len(sel), len(TENURES)), np.nan)
+
+        # Age band per plan and member: count of lower bounds <= age
+        a_idx = (ages[None, None, :] >= self.bands[sel][:, :, None]).sum(axis=1) - 1
+        a_idx[ages[None, :] > self.max_age[sel][:, None]] = -1
+
+        # Cities and sums are factorised once; lookups then run per distinct value
+        z_codes, z_values = _factorize(c.strip().casefold() if isinstance(c, str) else "" for c in cities)
+        zone_of = np.array([
+            [self.tables[self.plans[p]].cities.get(c, self.tables[self.plans[p]].default_zone) for c in z_values]
+            for p in sel
+        ], dtype=int).reshape(len(sel), len(z_values))
+        z_idx = zone_of[:, z_codes]
+
+        s_codes, s_values = _factorize(parse_amount(s) for s in sums)
+        sum_of = np.array([[self._sums[p].get(s, -1) for s in s_values] for p in sel],
+                          dtype=int).reshape(len(sel), len(s_values))
+        s_idx = sum_of[:, s_codes]
+
+        valid = (a_idx >= 0) & (z_idx >= 0) & (s_idx >= 0)
+        per_member = self.rates[
+            sel[:, None], np.where(valid, a_idx, 0), np.where(valid, z_idx, 0), np.where(valid, s_idx, 0)
+        ]  # [plan, member, tenure]
+        per_member[~valid] = np.nan
+
+        starts = np.concatenate(([0], np.cumsum(sizes)[:-1]))
+        family = np.add.reduceat(per_member, starts, axis=1)  # [plan, family, tenure]
+        family *= self.floater[sel][:, np.minimum(sizes, self.max_family)][:, :, None]
+        return np.rint(family).transpose(1, 0, 2)
+
+    def price_families(self, families: Iterable[Sequence], plans: Optional[Sequence[str]] = None):
+        """
+        price() for families given as lists of members, each a mapping with
+        'age', 'city' and 'sum_assured' or an (age, city, sum_assured) tuple.
+        """
+        ages, cities, sums, sizes = [], [], [], []
+        for members in families:
+            sizes.append(len(members))
+            for member in members:
+                if type(member) is dict or isinstance(member, Mapping):
+                    member = (member.get("age"), member.get("city"), member.get("sum_assured"))
+                age, city, amount = member
+                ages.append(age)
+                cities.append(city)
+                sums.append(amount)
+        return self.price(ages, cities, sums, sizes, plans)
+
+
+def _factorize(values: Iterable) -> Tuple[List[int], List]:
+    codes, index = [], {}
+    for v in values:
+        code = index.get(v)
+        if code is None:
+            code = index[v] = len(index)
+        codes.append(code)
+    return codes, list(index)
+
+
+def load_rate_book(folder: str = DEFAULT_FOLDER) -> Optional[RateBook]:
+    """All *.json rate tables in `folder` as one RateBook; None if there are none."""
+    tables = []
+    for name in sorted(_table_files(folder)):
+        path = os.path.join(folder, name)
+        try:
+            with open(path, "r", encoding="utf-8") as f:
+                tables.append(RateTable.from_dict(json.load(f), source=os.path.abspath(path)))
+        except json.JSONDecodeError as e:
+            raise ValueError(f"Invalid rate table {path}: {e}")
+        except ValueError as e:
+            raise ValueError(f"Invalid rate table {path}: {e}")
+    return RateBook(tables) if tables else None
+
+
+def _table_files(folder: str) -> List[str]:
+    try:
+        return [n for n in os.listdir(folder) if n.endswith(".json") and not n.startswith(".")]
+    except OSError:
+        return []
+
+
+class RateBookStore:
+    """
+    The process-wide current RateBook, reloaded when any table file in the
+    folder is added, removed or changed (checked at most every
+    `check_interval` seconds). A folder that fails to load is reported and
+    the previous book stays in service; no folder or no files means no
+    pricing (current() is None).
+    """
+
+    def __init__(self, folder: str = DEFAULT_FOLDER, check_interval: float = 1.0):
+        self.folder = folder
+        self.check_interval = check_interval
+        self._lock = threading.Lock()
+        self._book: Optional[RateBook] = None
+        self._signature: Optional[Tuple] = None
+        self._loaded: Optional[Tuple] = None
+        self._checked_at = -float("inf")
+
+    def signature(self) -> Tuple:
+        """(name, mtime, size) of every table file; part of any cache key for a priced quote."""
+        now = time.monotonic()
+        if self._signature is not None and now - self._checked_at < self.check_interval:
+            return self._signature
+        sig = []
+        for name in sorted(_table_files(self.folder)):
+            try:
+                st = os.stat(os.path.join(self.folder, name))
+            except OSError:
+                continue
+            sig.append((name, st.st_mtime_ns, st.st_size))
+        self._signature, self._checked_at = tuple(sig), now
+        return self._signature
+
+    def current(self) -> Optional[RateBook]:
+        sig = self.signature()
+        if sig == self._loaded:
+            return self._book
+        with self._lock:
+            if sig != self._loaded:
+                # Remembered even if loading fails, so a bad file is reported once
+                self._loaded = sig
+                try:
+                    self._book = load_rate_book(self.folder) if sig else None
+                except (OSError, ValueError) as e:
+                    print(f"Warning: keeping previous rate tables: {e}")
+        return self._book
+
+
+RATES = RateBookStore(os.environ.get("QUOTE_RATES") or DEFAULT_FOLDER)
+
+
+if __name__ == "__main__":
+    # python -m app.pricing [folder]: validate rate tables before deploying them
+    target = sys.argv[1] if len(sys.argv) > 1 else RATES.folder
+    try:
+        book = load_rate_book(target)
+    except (OSError, ValueError) as e:
+        print(f"❌ {e}")
+        sys.exit(1)
+    if book is None:
+        print(f"❌ No rate tables (*.json) in {target}")
+        sys.exit(1)
+    from app.catalogue import CATALOGUE
+    unknown = [p for p in book.plans if p not in CATALOGUE.current().master]
+    for p in unknown:
+        print(f"Warning: {p!r} is not a catalogue plan; its rates will not be used in quotes")
+    print(f"✅ {target}: {len(book.plans)} plans, rates array {book.rates.shape} ({book.digest[:12]})")
@@ -1,197 +1,144 @@
 # app/processor.py
 import os
-import re
 import io
-import glob
+import hashlib
 from datetime import datetime
-from typing import Dict, List, Optional
+from typing import IO, TYPE_CHECKING, Callable, Dict, Iterable, List, NamedTuple, Optional, Tuple, Union
 
-import pandas as pd
 from docx import Document
 from docx.shared import Pt, RGBColor, Inches
-from docx.oxml import OxmlElement, parse_xml
-from docx.oxml.ns import nsdecls, qn
 from docx.enum.text import WD_PARAGRAPH_ALIGNMENT
 
+from app import ingest
+from app.readers import DATETIME, FLOAT, INT, Table, read_tables
+from app.schema import parse_request
+from app.catalogue import CATALOGUE, Catalogue
+from app.instrument import current as current_trace
+from app.logos import LOGOS, LogoAsset
+from app.model import (
+    ADVISOR_HEADERS, ADVISOR_HEADING, CLIENT_HEADERS, CLIENT_HEADING, FEATURE_HEADING, NO_HIGHLIGHTS,
+    NOTE_LABEL, NOTE_TEXT, PREMIUM_HEADERS, PREMIUM_HEADING, PREPARED_BY, TITLE,
+    ClientRow, FeatureRow, PlanColumn, PricedPlan, Quote,
+)
+from app.pdf import render_pdf
+from app.pricing import RATES, RateBook, format_inr
+from app.preview import render_html
+from app.resolver import Alias
+from app.styling import ParagraphSpacing, RunStyle, replace_table_borders, shade_cell
+from app.template import TEMPLATES
+
+if TYPE_CHECKING:
+    import pandas as pd
+
+DOCX_MEDIA_TYPE = "application/vnd.openxmlformats-officedocument.wordprocessingml.document"
+
 # ---------- Styling helpers ----------
+# Formatting is compiled once into shared w:shd / w:rPr / w:tblBorders
+# prototypes (app/styling.py); styling a cell or run inserts a deep copy.
+HEADER_TEXT = RunStyle(bold=True, color=RGBColor(255, 255, 255), size=Pt(10.5))
+FEATURE_LABEL = RunStyle(bold=True, size=Pt(10.5))
+PLAN_LABEL = RunStyle(bold=True, size=Pt(11))
+ADVISOR_PLAN = RunStyle(bold=True, size=Pt(12))
+BULLET_TEXT = RunStyle(size=Pt(10))
+BULLET_SPACING = ParagraphSpacing(before=Pt(1), after=Pt(1))
+
 def set_cell_bg(cell, color="00A36C"):
-    cell._tc.get_or_add_tcPr().append(parse_xml(f'<w:shd {nsdecls("w")} w:fill="{color}"/>'))
+    shade_cell(cell, color)
 
 def set_white_text(cell):
-    for p in cell.paragraphs:
-        for r in p.runs:
-            r.font.color.rgb = RGBColor(255, 255, 255)
-            r.font.bold = True
-            r.font.size = Pt(10.5)
+    HEADER_TEXT.apply_all(cell)
 
 def set_table_borders(table):
-    tbl = table._tbl
-    tbl_pr = tbl.find(qn('w:tblPr'))
-    if tbl_pr is None:
-        tbl_pr = OxmlElement('w:tblPr')
-        tbl.insert(0, tbl_pr)
-    old = tbl_pr.find(qn('w:tblBorders'))
-    if old is not None:
-        tbl_pr.remove(old)
-    borders = OxmlElement('w:tblBorders')
-    def make(tag):
-        e = OxmlElement(f'w:{tag}')
-        e.set(qn('w:val'), 'single')
-        e.set(qn('w:sz'), '8')
-        e.set(qn('w:color'), '000000')
-        return e
-    for tag in ['top', 'left', 'bottom', 'right', 'insideH', 'insideV']:
-        borders.append(make(tag))
-    tbl_pr.append(borders)
-
-# ---------- MASTER DATA (unchanged) ----------
-MASTER: Dict[str, Dict[str, str]] = {
-    "ICICI Lombard – Elevate": {
-        "Restoration Benefit":"Unlimited (including for same illness)",
-        "NCB Benefit":"Unlimited 100% yearly (No Cap)",
-        "Room Rent":"Single Private AC",
-        "Pre-Hospitalization":"90 Days","Post-Hospitalization":"180 Days",
-        "Day Care Treatments":"All covered","Non-Consumables":"All covered",
-        "Hospitalization @ Home":"Up to Sum Assured","Ambulance":"Up to Sum Assured",
-        "Air Ambulance":"Up to Sum Assured","AYUSH":"Up to Sum Assured","Organ Donor":"Up to Sum Assured",
-        "Modern Treatments":"Up to Sum Assured","2-Hour Hospitalization":"Covered","E-Consultation":"Unlimited",
-        "Preventive Health Check-up":"All covered (But Optional)",
-        "Maternity":"Optional Rider – 10% Of SA & Max 1 Lakh allowed; waiting period 2 yrs (reducible to 1 yr with rider). Newborn Day 1 (10% SA).",
-        "New Born Cover":"Day 1 (10% SA)","Worldwide Cover":"Not Available","Lock-the-Clock Premium Freeze":"Not Applicable",
-        "OPD Cover":"Optional Rider – can be added","Priority Claim Desk":"Not Available","Cash+ Wallet":"—",
-        "Unique Features":"Unlimited NCB (100% SA increase yearly, no cap), 2-hr hospitalization, child cover till 30 yrs, newborn Day-1 (10% SA)"
-    },
-    "Niva Bupa – ReAssure 3.0": {
-        "Restoration Benefit":"Unlimited Sum Reinstatement — Same illness covered multiple times; cover never ends.",
-        "NCB Benefit":"Not Applicable – This is an Unlimited Cover Plan.","Room Rent":"Any Room including Suite – No Limit.",
-        "Pre-Hospitalization":"60 Days","Post-Hospitalization":"180 Days","Day Care Treatments":"All Day-Care Procedures covered (no limit).",
-        "Non-Consumables":"Yes – All Covered.","Hospitalization @ Home":"Covered up to Sum Insured — if medically advised.",
-        "Ambulance":"Covered up to Sum Insured — no per-event cap.","Air Ambulance":"Covered up to ₹5 Lakh.",
-        "AYUSH":"Covered up to Sum Assured.","Organ Donor":"Covered up to Sum Assured.","Modern Treatments":"Covered up to Sum Assured.",
-        "2-Hour Hospitalization":"Covered — short-stay admission eligible.","E-Consultation":"Unlimited online doctor consultations.",
-        "Preventive Health Check-up":"Annual health check-up available.","Maternity":"Not Available","New Born Cover":"Not Available",
-        "Worldwide Cover":"Worldwide cover with rider; no India-diagnosis rule when opted.",
-        "Lock-the-Clock Premium Freeze":"Premium will not increase until a claim occurs — premium stays locked.",
-        "OPD Cover":"Optional Rider – ₹1 Lakh annual OPD (Dental, tests, visits, medicines, gym & physio sessions).",
-        "Priority Claim Desk":"Optional Rider – Priority claim handling (HNI/Prime).",
-        "Cash+ Wallet":"Cashback reward every claim-free year — usable for renewal, co-pay, OPD.",
-        "Unique Features":"Unlimited Sum Insured, Worldwide Cover (no India rule), Prime Member service, No-Claim Discounts added to wallet."
-    },
-    "Niva Bupa – Aspire Platinum": {
-        "Restoration Benefit":"Unlimited (including for same illness)","NCB Benefit":"Up to 5X (300%)","Room Rent":"Single Private AC",
-        "Pre-Hospitalization":"60 Days","Post-Hospitalization":"90 Days","Day Care Treatments":"All covered",
-        "Non-Consumables":"All covered","Hospitalization @ Home":"Up to Sum Assured","Ambulance":"Up to Sum Assured","Air Ambulance":"Up to Sum Assured",
-        "AYUSH":"Up to Sum Assured","Organ Donor":"Up to Sum Assured","Modern Treatments":"Up to Sum Assured",
-        "2-Hour Hospitalization":"—","E-Consultation":"Unlimited","Preventive Health Check-up":"Standard Available",
-        "Maternity":"Standard ₹12k yearly","New Born Cover":"Available","Worldwide Cover":"Not Available",
-        "Lock-the-Clock Premium Freeze":"Premium will not increase until a claim occurs — your premium stays locked.",
-        "OPD Cover":"Optional Rider – can be added","Priority Claim Desk":"—","Cash+ Wallet":"—",
-        "Unique Features":"Premium lock, child cover up to 60 yrs, NCB up to 5X"
-    },
-    "Tata AIG – Medicare Select": {
-        "Restoration Benefit":"Unlimited (including for same illness)","NCB Benefit":"Sum Assured will increase 100% every year, up to 500% (Super NCB).",
-        "Room Rent":"Single Private AC","Pre-Hospitalization":"60 Days","Post-Hospitalization":"90 Days","Day Care Treatments":"All covered",
-        "Non-Consumables":"All covered","Hospitalization @ Home":"Up to Sum Assured","Ambulance":"Up to Sum Assured","Air Ambulance":"Up to Sum Assured",
-        "AYUSH":"Up to Sum Assured","Organ Donor":"Up to Sum Assured","Modern Treatments":"Up to Sum Assured","2-Hour Hospitalization":"—",
-        "E-Consultation":"Unlimited","Preventive Health Check-up":"All covered",
-        "Maternity":"Optional Rider – 10% of SA and Max Up to 1 Lakh; waiting period 2 yrs (reducible to 1 yr with rider).",
-        "New Born Cover":"Available with rider","Worldwide Cover":"Not Available","Lock-the-Clock Premium Freeze":"Not Applicable",
-        "OPD Cover":"Optional Rider – can be added","Priority Claim Desk":"—","Cash+ Wallet":"—",
-        "Unique Features":"Salary-linked discounts for salaried persons (7.5%), Super NCB up to 500%"
-    },
-    "HDFC ERGO – Optima Secure": {
-        "Restoration Benefit":"Unlimited (including for same illness)","NCB Benefit":"2X Day 1 (e.g., 10 Lakh SA becomes 20 Lakh from day 1)",
-        "Room Rent":"Single Private AC","Pre-Hospitalization":"60 Days","Post-Hospitalization":"180 Days","Day Care Treatments":"All covered",
-        "Non-Consumables":"All covered","Hospitalization @ Home":"Up to Sum Assured","Ambulance":"Up to Sum Assured","Air Ambulance":"Up to Sum Assured",
-        "AYUSH":"Up to Sum Assured","Organ Donor":"Up to Sum Assured","Modern Treatments":"Up to Sum Assured",
-        "2-Hour Hospitalization":"—","E-Consultation":"Unlimited","Preventive Health Check-up":"Standard Available",
-        "Maternity":"Not Available","New Born Cover":"Not Available","Worldwide Cover":"Not Available",
-        "Lock-the-Clock Premium Freeze":"Not Applicable","OPD Cover":"Optional Rider – can be added","Priority Claim Desk":"—",
-        "Cash+ Wallet":"—","Unique Features":"2X Cover from Day 1, deductible on 1st claim, health check-up included"
-    },
-    "Care Health – Supreme": {
-        "Restoration Benefit":"Unlimited (including for same illness)","NCB Benefit":"yearly 100% SA increase up to 600% (6X)","Room Rent":"Single Private AC",
-        "Pre-Hospitalization":"60 Days","Post-Hospitalization":"180 Days","Day Care Treatments":"All covered","Non-Consumables":"All covered",
-        "Hospitalization @ Home":"Up to Sum Assured","Ambulance":"Up to Sum Assured","Air Ambulance":"Up to Sum Assured",
-        "AYUSH":"Up to Sum Assured","Organ Donor":"Up to Sum Assured","Modern Treatments":"Up to Sum Assured",
-        "2-Hour Hospitalization":"—","E-Consultation":"Unlimited","Preventive Health Check-up":"All covered",
-        "Maternity":"Not Available","New Born Cover":"Not Available","Worldwide Cover":"Not Available",
-        "Lock-the-Clock Premium Freeze":"Not Applicable","OPD Cover":"Optional Rider – can be added","Priority Claim Desk":"—",
-        "Cash+ Wallet":"—","Unique Features":"NCB up to 600% (6X), all non-consumables covered, health check-up rider"
-    }
+    replace_table_borders(table)
+
+def _header_cell(cell, text: str, color: str = "00A36C"):
+    cell.text = text; set_cell_bg(cell, color); set_white_text(cell)
+
+# ---------- Catalogue ----------
+# Plans, features, logos, highlights and aliases live in app/data/catalogue.json
+# (see app.catalogue). A quote reads one snapshot from start to finish, so a
+# reload of the file never mixes two catalogue versions in one document.
+_CATALOGUE_NAMES = {
+    "MASTER": "master",
+    "FEATURES": "features",
+    "LOGO_MAP": "logo_map",
+    "QUICK_HIGHLIGHTS": "highlights",
+    "PLAN_ALIASES": "aliases",
+    "RESOLVER": "resolver",
+    "FEATURE_MATRIX": "matrix",
 }
 
-FEATURES: List[str] = [
- "🔄 Restoration Benefit","💰 NCB Benefit","🏠 Room Rent","🏥 Pre-Hospitalization","🩹 Post-Hospitalization",
- "🌞 Day Care Treatments","🛠️ Non-Consumables","🏡 Hospitalization @ Home","🚑 Ambulance","✈️ Air Ambulance",
- "🌿 AYUSH","❤️ Organ Donor","🔬 Modern Treatments","⏰ 2-Hour Hospitalization","📱 E-Consultation",
- "✅ Preventive Health Check-up","🤰 Maternity","👶 New Born Cover","🌍 Worldwide Cover",
- "🔒 Lock-the-Clock Premium Freeze","💊 OPD Cover","🤝 Priority Claim Desk","💳 Cash+ Wallet","✨ Unique Features"
-]
-
-LOGO_MAP = {
-    "ICICI Lombard – Elevate":"icici_lombard",
-    "Niva Bupa – ReAssure 3.0":"niva_reassure3",
-    "Niva Bupa – Aspire Platinum":"niva_aspire",
-    "Tata AIG – Medicare Select":"tata_aig",
-    "HDFC ERGO – Optima Secure":"hdfc_ergo",
-    "Care Health – Supreme":"care_health"
-}
+def __getattr__(name: str):
+    # Read-only views of the current snapshot under the old module-level names
+    if name in _CATALOGUE_NAMES:
+        return getattr(CATALOGUE.current(), _CATALOGUE_NAMES[name])
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
 
 # ---------- Helpers ----------
-def map_master(name_text: Optional[str]) -> Optional[str]:
-    if not name_text:
-        return None
-    n = str(name_text).lower().strip()
-    if ("black" in n and "variant" in n) or "reassure" in n or "v3.0" in n or "v 3.0" in n or ("3.0" in n and "niva" in n):
-        return "Niva Bupa – ReAssure 3.0"
-    if "aspire" in n:
-        return "Niva Bupa – Aspire Platinum"
-    if "icici" in n or "lombard" in n or "elevate" in n:
-        return "ICICI Lombard – Elevate"
-    if "tata" in n or "aig" in n or "medicare" in n:
-        return "Tata AIG – Medicare Select"
-    if "hdfc" in n or "ergo" in n or "optima" in n:
-        return "HDFC ERGO – Optima Secure"
-    if "care" in n or "supreme" in n:
-        return "Care Health – Supreme"
-    for key in MASTER.keys():
-        k = key.lower()
-        for token in re.split(r'\W+', n):
-            if token and token in k:
-                return key
-    return None
+def map_master(name_text: Optional[str], catalogue: Optional[Catalogue] = None) -> Optional[str]:
+    return (catalogue or CATALOGUE.current()).resolver.resolve(name_text)
 
-def find_logo_file(master_key: Optional[str], logo_folder: str) -> Optional[str]:
+def catalogue_fingerprint(logo_folder: str = "logos") -> str:
+    """
+    Hash of everything besides the workbook that shapes a quote: MASTER,
+    FEATURES, LOGO_MAP, aliases, highlights, the logo files themselves and
+    the rate tables.
+    """
+    h = hashlib.sha256(CATALOGUE.current().digest.encode("ascii"))
+    h.update(repr(LOGOS.signature(logo_folder)).encode("utf-8"))
+    h.update(repr(RATES.signature()).encode("utf-8"))
+    return h.hexdigest()
+
+def _master_key(name: Optional[str], catalogue: Catalogue) -> Optional[str]:
+    # included_master holds MASTER keys and raw names of unmapped plans
+    return name if name in catalogue.master else catalogue.resolver.resolve(name)
+
+def register_insurer(
+    master_key: str,
+    features: Dict[str, str],
+    aliases: Iterable[Alias] = (),
+    logo_base: Optional[str] = None,
+    persist: bool = True,
+):
+    """
+    Add (or replace) a plan at runtime: its feature values, the name
+    fragments that identify it and, optionally, its logo file base name.
+
+    By default the plan is written into the catalogue file, which every
+    process re-reads within a second (render pool workers included), so
+    quotes and the result cache key agree on it. persist=False registers it
+    in this process only, leaving the file alone: fine for the CLI or a
+    thread render pool, but process pool workers never see such a plan.
+    """
+    if persist:
+        CATALOGUE.save(master_key, features, aliases, logo_base)
+    else:
+        CATALOGUE.register(master_key, features, aliases, logo_base)
+    TEMPLATES.clear()
+
+def find_logo_file(master_key: Optional[str], logo_folder: str, catalogue: Optional[Catalogue] = None) -> Optional[str]:
     if not master_key:
         return None
-    base = LOGO_MAP.get(master_key)
+    base = (catalogue or CATALOGUE.current()).logo_map.get(master_key)
     if not base:
         base = "".join(ch if ch.isalnum() else "_" for ch in master_key).lower()
-    for ext in (".png", ".jpg", ".jpeg", ".webp"):
-        p = os.path.join(logo_folder, base + ext)
-        if os.path.exists(p):
-            return p
-    return None
+    return LOGOS.find_path(base, logo_folder)
 
-def has_premium(row: pd.Series) -> bool:
-    for c in row.index:
-        if "prem" in str(c).lower():
-            try:
-                if float(row[c]) > 0:
-                    return True
-            except Exception:
-                if str(row[c]).strip().upper() not in ("", "0", "NA"):
-                    return True
-    return False
-
-def _safe_engine_for(filename_hint: Optional[str]) -> Optional[str]:
-    ext = (os.path.splitext(filename_hint or "")[1] or "").lower()
-    if ext in (".xlsx", ".xlsm"):
-        return "openpyxl"
-    if ext == ".xls":
-        return "xlrd"
-    return None
+def find_logo(master_key: Optional[str], logo_folder: str) -> Optional[LogoAsset]:
+    """Cached, pre-decoded logo for a MASTER key (see app.logos)."""
+    return LOGOS.load(find_logo_file(master_key, logo_folder))
+
+def _cell_has_premium(value) -> bool:
+    # value is None for a blank cell (Table); NaN/NaT/NA when it comes from pandas
+    if value is None or value != value or type(value).__name__ in ("NaTType", "NAType"):
+        return False
+    try:
+        return float(value) > 0
+    except Exception:
+        return str(value).strip().upper() not in ("", "0", "NA")
+
+def has_premium(row: "pd.Series") -> bool:
+    return any(_cell_has_premium(row[c]) for c in row.index if "prem" in str(c).lower())
 
 def _find_incremint_logo(logo_folder: Optional[str]) -> Optional[str]:
     """
@@ -200,224 +147,389 @@ def _find_incremint_logo(logo_folder: Optional[str]) -> Optional[str]:
     """
     if not logo_folder:
         return None
-    logo_folder = os.path.abspath(logo_folder)
-    if not os.path.isdir(logo_folder):
-        return None
-
-    # Prefer 'incremint' named file
-    for pattern in ("*.png", "*.jpg", "*.jpeg", "*.webp"):
-        for p in glob.glob(os.path.join(logo_folder, pattern)):
-            if "incremint" in os.path.basename(p).lower() and os.path.isfile(p):
-                return p
-
-    # Fallback: first available image (sorted for determinism)
-    for pattern in ("*.png", "*.jpg", "*.jpeg", "*.webp"):
-        files = sorted(glob.glob(os.path.join(logo_folder, pattern)))
-        for f in files:
-            if os.path.isfile(f):
-                return f
-
-    return None
+    # Folder listing is cached by LOGOS and refreshed when the folder changes
+    return LOGOS.header_path(logo_folder)
 
-# ---------- Core generation ----------
-def generate_docx(
-    excel_input,                 # bytes or str path
-    output_path: str,
-    logo_folder: str = "logos",
-    filename_hint: Optional[str] = None,
-) -> str:
+# ---------- Excel input ----------
+def _read_workbook(excel_input, filename_hint: Optional[str] = None) -> Tuple[Table, Table]:
     """
-    Generate the Health Quote DOCX and return the output path.
-    excel_input: bytes (uploaded file) or a file path (string)
-    output_path: full path where DOCX will be saved
-    logo_folder: folder containing logos
-    filename_hint: original filename (helps pick Excel engine)
+    Read and validate the 'Client Details' and 'Premiums' sheets.
+    Returns (clients, premiums) as app.readers Tables; .xlsx/.xlsm with plain
+    cell values are read without pandas.
     """
-    # --- Read Excel safely ---
-    engine = _safe_engine_for(filename_hint or "")
-    try:
-        if isinstance(excel_input, (bytes, bytearray)):
-            xls = pd.ExcelFile(io.BytesIO(excel_input), engine=engine)
+    trace = current_trace()
+    with trace.span("read"):
+        clients, premiums, reader = read_tables(excel_input, filename_hint)
+    trace.count("reader_" + reader)
+
+    with trace.span("validate"):
+        # Validate client columns
+        miss_client = [c for c in ingest.CLIENT_COLUMNS if c not in clients]
+        if miss_client:
+            raise ValueError(f"'Client Details' is missing columns: {', '.join(miss_client)}")
+
+        # Validate premium name column presence
+        prem_any = ingest.PLAN_NAME_COLUMNS
+        if not any(c in premiums for c in prem_any):
+            raise ValueError(f"'Premiums' must have at least one plan-name-like column: {', '.join(prem_any)}")
+
+    trace.count("client_rows", len(clients))
+    trace.count("premium_rows", len(premiums))
+    return clients, premiums
+
+class PremiumLine(NamedTuple):
+    label: Optional[str]          # plan name as typed in the sheet
+    master_key: Optional[str]     # resolved MASTER key, if any
+    premiums: Tuple[str, str, str]  # display text for 1/2/3 Yr Premium
+
+def _premium_flags(kind: str, col: List) -> List[bool]:
+    """_cell_has_premium for a whole column: a compare for numeric columns, one parse per distinct text."""
+    if kind in (INT, FLOAT):
+        return [v is not None and v > 0 for v in col]
+    seen = {}
+    flags = []
+    for v in col:
+        if v is None:
+            flags.append(False)
+        elif type(v) is int or type(v) is float:
+            flags.append(v > 0)
+        elif type(v) is str:
+            if v not in seen:
+                seen[v] = _cell_has_premium(v)
+            flags.append(seen[v])
         else:
-            xls = pd.ExcelFile(excel_input, engine=engine)
-    except Exception as e:
-        raise ValueError(f"Failed to read Excel file: {e}")
-
-    # Validate sheets
-    required_sheets = ["Client Details", "Premiums"]
-    missing = [s for s in required_sheets if s not in xls.sheet_names]
-    if missing:
-        raise ValueError(f"Missing sheet(s): {', '.join(missing)}. Found sheets: {', '.join(xls.sheet_names)}")
-
-    client_df = pd.read_excel(xls, sheet_name="Client Details")
-    premium_df = pd.read_excel(xls, sheet_name="Premiums")
-
-    # Validate client columns
-    client_required = ["Client Name", "Relation", "DOB", "Age", "City", "Sum Assured"]
-    miss_client = [c for c in client_required if c not in client_df.columns]
-    if miss_client:
-        raise ValueError(f"'Client Details' is missing columns: {', '.join(miss_client)}")
-
-    # Validate premium name column presence
-    prem_any = ["Plan Name","Plan","Insurance Company","Insurer","Company","Product"]
-    if not any(c in premium_df.columns for c in prem_any):
-        raise ValueError(f"'Premiums' must have at least one plan-name-like column: {', '.join(prem_any)}")
-
-    # Process premiums
-    premium_df["HasPremium"] = premium_df.apply(has_premium, axis=1)
-    valid_premiums = premium_df[premium_df["HasPremium"]].copy().reset_index(drop=True)
+            flags.append(_cell_has_premium(v))
+    return flags
+
+def _premium_rows(premiums: Table) -> List[int]:
+    """Indexes of rows with a premium in any column whose name contains "prem" (has_premium)."""
+    hit = [False] * len(premiums)
+    for j, name in enumerate(premiums.names):
+        if "prem" in str(name).lower():
+            hit = [a or b for a, b in zip(hit, _premium_flags(premiums.kinds[j], premiums.columns[j]))]
+    return [i for i, h in enumerate(hit) if h]
+
+def _plan_label(premiums: Table, i: int) -> Optional[str]:
+    """First non-blank plan-name-like cell of row i (None if all are blank)."""
+    for c in ingest.PLAN_NAME_COLUMNS:
+        if c in premiums:
+            txt = premiums.text(c, i)
+            if txt is not None and txt.strip():
+                return txt.strip()
+    return None
 
+def _premium_text(premiums: Table, col_name: str, i: int) -> str:
+    """
+    Display text of a premium cell, the same whichever front end filled the
+    Table: numbers in Indian digit grouping like priced premiums, text as typed.
+    """
+    if col_name not in premiums:
+        return ""
+    value = premiums.value(col_name, i)
+    if type(value) is int or type(value) is float:
+        return format_inr(value) if value else ""
+    txt = premiums.text(col_name, i)
+    return "" if txt is None or txt.strip() in ("", "0") else txt
+
+def _select_plans(premiums: Table, catalogue: Catalogue, book: Optional[RateBook] = None):
+    """
+    Keep premium rows that carry a premium and work out which plans to compare.
+    With a rate book, rows naming a plan it can price are kept too, even with
+    blank premiums, so _price_lines can fill them in.
+    One resolver call per distinct name.
+    Returns (premium_lines, included_master).
+    """
+    resolve = catalogue.resolver.resolve
+    resolved: Dict[str, Optional[str]] = {}
+    lines: List[PremiumLine] = []
     included_master: List[str] = []
-    for _, r in valid_premiums.iterrows():
-        raw = None
-        for c in ["Plan Name", "Plan", "Insurance Company", "Insurer", "Company", "Product"]:
-            if c in r and pd.notna(r[c]) and str(r[c]).strip():
-                raw = str(r[c]).strip(); break
-        if not raw:
-            for v in r:
-                try:
-                    if pd.notna(v) and str(v).strip():
-                        raw = str(v).strip(); break
-                except Exception:
-                    pass
-        mapped = map_master(raw)
-        if mapped and mapped not in included_master:
-            included_master.append(mapped)
+    rows = _premium_rows(premiums)
+    if book is not None:
+        typed = set(rows)
+        for i in range(len(premiums)):
+            label = None if i in typed else _plan_label(premiums, i)
+            if label is not None:
+                if label not in resolved:
+                    resolved[label] = resolve(label)
+                if resolved[label] in book:
+                    rows.append(i)
+        rows.sort()
+    for i in rows:
+        label = _plan_label(premiums, i)
+        raw = label
+        if raw is None:
+            # Rows without any plan name fall back to their first non-blank cell
+            raw = next((t.strip() for t in premiums.row_texts(i) if t is not None and t.strip()), None)
+        for n in (label, raw):
+            if n is not None and n not in resolved:
+                resolved[n] = resolve(n)
+
+        m = resolved.get(raw) if raw is not None else None
+        if m and m not in included_master:
+            included_master.append(m)
         elif raw and raw not in included_master:
             included_master.append(raw)
 
-    if not included_master:
-        included_master = list(MASTER.keys())
+        lines.append(PremiumLine(
+            label,
+            resolved.get(label) if label is not None else None,
+            tuple(_premium_text(premiums, c, i) for c in ingest.PREMIUM_COLUMNS),
+        ))
 
-    # ---------- Build DOCX ----------
-    doc = Document()
+    if not included_master:
+        included_master = list(catalogue.master)
+    return lines, included_master
 
+def _price_lines(clients: Table, lines: List[PremiumLine], included_master: List[str],
+                 catalogue: Catalogue, book: Optional[RateBook]) -> List[PremiumLine]:
+    """
+    Fill premiums from the rate tables (app/pricing.py), pricing the client
+    sheet's members as one family. Premiums typed in the sheet win: only
+    lines with all three premiums blank are priced, and when the sheet lists
+    no premium rows at all, every compared plan that has a rate table gets
+    a priced line. Unpriceable combinations stay blank.
+    """
+    if book is None or not len(clients):
+        return lines
+    if lines:
+        wanted = [ln.master_key for ln in lines if ln.master_key in book and not any(ln.premiums)]
+    else:
+        wanted = [k for k in (_master_key(n, catalogue) for n in included_master) if k in book]
+        lines = [PremiumLine(None, k, ("", "", "")) for k in wanted]
+    wanted = list(dict.fromkeys(wanted))
+    if not wanted:
+        return lines
+
+    def column(name):
+        return [clients.value(name, i) for i in range(len(clients))] if name in clients else [None] * len(clients)
+
+    trace = current_trace()
+    with trace.span("pricing"):
+        prices = book.price(column("Age"), column("City"), column("Sum Assured"), [len(clients)], wanted)[0]
+    priced = {
+        key: tuple("" if v != v else format_inr(v) for v in row.tolist())
+        for key, row in zip(wanted, prices)
+    }
+    trace.count("priced_plans", sum(1 for t in priced.values() if any(t)))
+    return [
+        ln._replace(premiums=priced[ln.master_key]) if ln.master_key in priced and not any(ln.premiums) else ln
+        for ln in lines
+    ]
+
+# ---------- Quote model ----------
+def prepared_date() -> str:
+    """Date printed in the prepared-by line (part of any cache key for a quote)."""
+    return datetime.now().strftime('%d-%m-%Y')
+
+def _format_dob(dob) -> str:
+    if dob is None:
+        return ""
+    if isinstance(dob, datetime) and 1678 <= dob.year <= 2261:
+        return dob.strftime("%d-%m-%Y")
+    # Text and serial numbers go through pandas' parser, as they always have
+    import pandas as pd
+    try:
+        return pd.to_datetime(dob, errors="coerce").strftime("%d-%m-%Y") if pd.notna(dob) else ""
+    except Exception:
+        return str(dob)
+
+def _client_rows(clients: Table) -> Tuple[ClientRow, ...]:
+    text = clients.row_text
+    return tuple(
+        ClientRow(
+            str(i + 1),
+            text("Client Name", i),
+            text("Relation", i),
+            _format_dob(clients.row_value("DOB", i)),
+            text("Age", i),
+            text("City", i),
+            text("Sum Assured", i),
+        )
+        for i in range(len(clients))
+    )
+
+def _client_name(clients: Table) -> str:
+    if "Client Name" not in clients or not len(clients):
+        return "Client"
+    name = clients.text("Client Name", 0)
+    if name is None:
+        return "NaT" if clients.kind("Client Name") == DATETIME else "nan"
+    return name
+
+def assemble_quote(
+    clients: Table,
+    premium_lines: List[PremiumLine],
+    included_master: List[str],
+    logo_folder: str = "logos",
+    catalogue: Optional[Catalogue] = None,
+) -> Quote:
+    """Resolve logos, feature values and highlights for the selected plans into a Quote."""
+    cat = catalogue or CATALOGUE.current()
+    keys = [_master_key(name, cat) for name in included_master]
+    plans = tuple(
+        PlanColumn(
+            name,
+            key,
+            find_logo_file(key, logo_folder, cat),
+            cat.highlights.get(key),
+        )
+        for name, key in zip(included_master, keys)
+    )
+    premiums = tuple(
+        PricedPlan(line.label, line.master_key, line.premiums,
+                   find_logo_file(line.master_key, logo_folder, cat) if line.master_key else None)
+        for line in premium_lines
+    )
+    matrix = cat.matrix
+    features = tuple(FeatureRow(*row) for row in matrix.rows(matrix.columns(keys)))
+    return Quote(
+        prepared_on=prepared_date(),
+        logo_folder=os.path.abspath(logo_folder or ""),
+        header_logo=_find_incremint_logo(logo_folder),
+        client_name=_client_name(clients),
+        clients=_client_rows(clients),
+        premiums=premiums,
+        plans=plans,
+        features=features,
+        catalogue=cat.digest,
+    )
+
+def quote_from_tables(clients: Table, premiums: Table, logo_folder: str = "logos") -> Quote:
+    """
+    The quote builder shared by every front end: client and premium Tables
+    (from a workbook or a JSON request) to a format-neutral Quote.
+    """
+    trace = current_trace()
+    catalogue = CATALOGUE.current()
+    book = RATES.current()
+    with trace.span("premiums"):
+        premium_lines, included_master = _select_plans(premiums, catalogue, book)
+    premium_lines = _price_lines(clients, premium_lines, included_master, catalogue, book)
+    trace.count("plans", len(included_master))
+    with trace.span("model"):
+        return assemble_quote(clients, premium_lines, included_master, logo_folder, catalogue)
+
+def build_quote(excel_input, logo_folder: str = "logos", filename_hint: Optional[str] = None) -> Quote:
+    """Read a workbook and assemble its format-neutral Quote."""
+    clients, premiums = _read_workbook(excel_input, filename_hint)
+    return quote_from_tables(clients, premiums, logo_folder)
+
+def build_request_quote(data, logo_folder: str = "logos") -> Quote:
+    """Assemble the Quote for a JSON quote request (app/schema.py); no workbook is read."""
+    trace = current_trace()
+    with trace.span("read"):
+        request = parse_request(data)
+    trace.count("reader_json")
+    trace.count("client_rows", len(request.clients))
+    trace.count("premium_rows", len(request.premiums))
+    return quote_from_tables(request.clients, request.premiums, logo_folder)
+
+# ---------- Document sections ----------
+def _add_title(doc, header_logo: Optional[str]):
+    """Header logo, title and prepared-by line. Returns the prepared-by paragraph."""
     # --- Insert logo (prefer incremint, otherwise first found) ---
-    logo_path = _find_incremint_logo(logo_folder)
-    if isinstance(logo_path, str) and logo_path and os.path.isfile(logo_path):
+    logo = LOGOS.load(header_logo)
+    if logo is not None:
         try:
             p_logo = doc.add_paragraph()
             r_logo = p_logo.add_run()
-            r_logo.add_picture(logo_path, width=Inches(1.8))
+            logo.add_to(r_logo, Inches(1.8))
             p_logo.alignment = WD_PARAGRAPH_ALIGNMENT.CENTER
         except Exception as e:
             print("Warning: failed to add logo:", e)
     else:
         # no fatal error — continue without logo
-        print("Info: no logo found or invalid path, continuing without logo:", logo_path)
+        print("Info: no logo found or invalid path, continuing without logo:", header_logo)
 
     # main title and prepared-by line
-    title_p = doc.add_paragraph("🏥 Health Insurance Quote")
+    title_p = doc.add_paragraph(TITLE)
     title_p.runs[0].bold = True
     title_p.alignment = WD_PARAGRAPH_ALIGNMENT.CENTER
 
-    doc.add_paragraph(f"Prepared by your trusted advisor – {datetime.now().strftime('%d-%m-%Y')}")
+    return doc.add_paragraph(PREPARED_BY)
 
-    # Client Details
-    doc.add_paragraph("\n👤 Client Details").runs[0].bold = True
+def _set_prepared_date(par, quote: Quote):
+    par.runs[0].text = quote.prepared_by
+
+def _add_client_table(doc):
+    doc.add_paragraph(f"\n{CLIENT_HEADING}").runs[0].bold = True
     ct = doc.add_table(rows=1, cols=7)
-    for i, h in enumerate(["Member No.","Name","Relation","DOB","Age","City","Sum Assured"]):
-        c = ct.rows[0].cells[i]; c.text = h; set_cell_bg(c,"00A36C"); set_white_text(c)
+    for i, h in enumerate(CLIENT_HEADERS):
+        _header_cell(ct.rows[0].cells[i], h)
     set_table_borders(ct)
+    return ct
 
-    if client_df.empty:
+def _fill_client_rows(ct, clients: Tuple[ClientRow, ...]):
+    if not clients:
         ct.add_row()
-    else:
-        for idx, r in client_df.iterrows():
-            row = ct.add_row().cells
-            row[0].text = str(idx+1)
-            row[1].text = str(r.get("Client Name",""))
-            row[2].text = str(r.get("Relation",""))
-            # format DOB if datetime
-            dob = r.get("DOB","")
-            try:
-                dob = pd.to_datetime(dob, errors="coerce").strftime("%d-%m-%Y") if pd.notna(dob) else ""
-            except Exception:
-                dob = str(dob)
-            row[3].text = dob
-            row[4].text = str(r.get("Age",""))
-            row[5].text = str(r.get("City",""))
-            row[6].text = str(r.get("Sum Assured",""))
-
-    # Premium Summary
-    doc.add_paragraph("\n💰 Premium Summary").runs[0].bold = True
+        return
+    for client in clients:
+        row = ct.add_row().cells
+        for cell, text in zip(row, client):
+            cell.text = text
+
+def _add_premium_table(doc):
+    doc.add_paragraph(f"\n{PREMIUM_HEADING}").runs[0].bold = True
     pt = doc.add_table(rows=1, cols=4)
-    for i, h in enumerate(["Insurer / Plan Name","1 Year Premium","2 Year Premium","3 Year Premium"]):
-        c = pt.rows[0].cells[i]; c.text = h; set_cell_bg(c,"00A36C"); set_white_text(c)
+    for i, h in enumerate(PREMIUM_HEADERS):
+        _header_cell(pt.rows[0].cells[i], h)
     set_table_borders(pt)
+    return pt
 
-    for _, r in valid_premiums.iterrows():
+def _fill_premium_rows(pt, premiums: Tuple[PricedPlan, ...]):
+    for line in premiums:
         prow = pt.add_row().cells
-        raw_label = None
-        for c in ["Plan Name","Plan","Insurance Company","Insurer","Company","Product"]:
-            if c in r and pd.notna(r[c]) and str(r[c]).strip():
-                raw_label = str(r[c]).strip(); break
-        master_key = map_master(raw_label)
-        logo_path = find_logo_file(master_key, logo_folder) if master_key else None
+        logo = LOGOS.load(line.logo)
 
         cell = prow[0]
         cell.text = ""
         par = cell.paragraphs[0]
-        if logo_path and os.path.isfile(logo_path):
+        if logo is not None:
             try:
                 rn = par.add_run()
-                rn.add_picture(logo_path, width=Inches(1.0))
+                logo.add_to(rn, Inches(1.0))
                 par.alignment = WD_PARAGRAPH_ALIGNMENT.CENTER
             except Exception:
                 pass
         p2 = cell.add_paragraph()
-        display_name = master_key or raw_label or ""
-        run = p2.add_run(display_name)
-        run.bold = True; run.font.size = Pt(11)
+        PLAN_LABEL.apply(p2.add_run(line.display_name))
         p2.alignment = WD_PARAGRAPH_ALIGNMENT.CENTER
 
-        for i,col in enumerate(["1 Yr Premium","2 Yr Premium","3 Yr Premium"], start=1):
-            val = r.get(col,"")
-            prow[i].text = "" if (pd.isna(val) or str(val).strip() in ("","0")) else str(val)
+        for i, text in enumerate(line.premiums, start=1):
+            prow[i].text = text
 
-    # Feature Comparison
-    doc.add_paragraph("\n🩺 Feature Comparison (Selected Insurers)").runs[0].bold = True
-    ncols = 1 + len(included_master)
+def _add_feature_table(doc, quote: Quote):
+    doc.add_paragraph(f"\n{FEATURE_HEADING}").runs[0].bold = True
+    ncols = 1 + len(quote.plans)
     ft = doc.add_table(rows=2, cols=ncols)
 
     first_row = ft.rows[0].cells
-    first_row[0].text = ""; set_cell_bg(first_row[0],"00A36C"); set_white_text(first_row[0])
+    _header_cell(first_row[0], "")
     hdr_row = ft.rows[1].cells
-    hdr_row[0].text = "Feature"; set_cell_bg(hdr_row[0],"00A36C"); set_white_text(hdr_row[0])
+    _header_cell(hdr_row[0], "Feature")
 
-    for i, name in enumerate(included_master, start=1):
-        hdr_row[i].text = name; set_cell_bg(hdr_row[i],"00A36C"); set_white_text(hdr_row[i])
+    for i, plan in enumerate(quote.plans, start=1):
+        _header_cell(hdr_row[i], plan.name)
         logo_cell = first_row[i]; logo_cell.text = ""
-        logo_path = find_logo_file(name if name in MASTER else map_master(name), logo_folder)
-        if logo_path and os.path.isfile(logo_path):
+        logo = LOGOS.load(plan.logo)
+        if logo is not None:
             try:
                 rrun = logo_cell.paragraphs[0].add_run()
-                rrun.add_picture(logo_path, width=Inches(1.0))
+                logo.add_to(rrun, Inches(1.0))
                 logo_cell.paragraphs[0].alignment = WD_PARAGRAPH_ALIGNMENT.CENTER
             except Exception:
                 logo_cell.text = ""
 
-    set_table_borders(ft)
-
-    for feat_with_emoji in FEATURES:
+    for feat_with_emoji, highlight, values in quote.features:
         frow = ft.add_row().cells
         frow[0].text = feat_with_emoji
         set_cell_bg(frow[0],"EAF6EA")
-        for p in frow[0].paragraphs:
-            for r in p.runs: r.font.bold = True; r.font.size = Pt(10.5)
+        FEATURE_LABEL.apply_all(frow[0])
 
-        feat_key = feat_with_emoji.split(" ",1)[1] if " " in feat_with_emoji else feat_with_emoji
-        if feat_key.startswith("️"): feat_key = feat_key[1:]
-        feat_key = feat_key.strip()
+        for j, value in enumerate(values, start=1):
+            frow[j].text = value
 
-        for j, name in enumerate(included_master, start=1):
-            master_key = name if name in MASTER else map_master(name)
-            if master_key and master_key in MASTER:
-                frow[j].text = MASTER[master_key].get(feat_key,"")
-            else:
-                frow[j].text = "<Mapping required>"
-
-        if feat_key == "Unique Features":
+        if highlight:
             for c in frow: set_cell_bg(c,"FFF68F")
 
     ft.autofit = False
@@ -427,47 +539,38 @@ def generate_docx(
     except Exception:
         pass
     set_table_borders(ft)
+    return ft
 
-    # Advisory
-    doc.add_paragraph("\n💬 Advisor’s Recommendation").runs[0].bold = True
+def _add_advisor_section(doc, quote: Quote):
+    doc.add_paragraph(f"\n{ADVISOR_HEADING}").runs[0].bold = True
     adv = doc.add_table(rows=1, cols=2)
-    for i,h in enumerate(["Plan","Why choose this plan (quick points)"]):
-        c = adv.rows[0].cells[i]; c.text = h; set_cell_bg(c,"00A36C"); set_white_text(c)
+    for i,h in enumerate(ADVISOR_HEADERS):
+        _header_cell(adv.rows[0].cells[i], h)
     set_table_borders(adv)
 
-    quick_highlights = {
-        "ICICI Lombard – Elevate":["Unlimited NCB growth (no cap)","Newborn Day-1 cover (10% SA)","2-hour hospitalization covered"],
-        "Niva Bupa – ReAssure 3.0":["Truly Unlimited Sum Insured","Worldwide cover (rider)","Lock-the-Clock premium freeze"],
-        "Niva Bupa – Aspire Platinum":["Premium lock","Child cover up to 60 yrs","NCB up to 5X"],
-        "Tata AIG – Medicare Select":["Salary-linked discount (7.5%)","Super NCB up to 500%","Optional maternity/newborn rider"],
-        "HDFC ERGO – Optima Secure":["2X cover from Day 1","Health check-up included"],
-        "Care Health – Supreme":["NCB up to 600% (6X)","Non-consumables covered","Health check-up rider"]
-    }
-
-    for plan in included_master:
+    for plan in quote.plans:
         row = adv.add_row().cells
         left = row[0]; left.text = ""
         lp = left.paragraphs[0]
-        logo_path = find_logo_file(plan if plan in MASTER else map_master(plan), logo_folder)
-        if logo_path and os.path.isfile(logo_path):
+        logo = LOGOS.load(plan.logo)
+        if logo is not None:
             try:
                 rrun = lp.add_run()
-                rrun.add_picture(logo_path, width=Inches(1.0))
+                logo.add_to(rrun, Inches(1.0))
                 lp.alignment = WD_PARAGRAPH_ALIGNMENT.LEFT
             except Exception:
                 pass
         p_name = left.add_paragraph()
-        rn = p_name.add_run(plan); rn.bold = True; rn.font.size = Pt(12)
+        ADVISOR_PLAN.apply(p_name.add_run(plan.name))
 
         right = row[1]; right.text = ""
-        pm = plan if plan in MASTER else map_master(plan)
-        if pm in quick_highlights:
-            for pt in quick_highlights[pm]:
+        if plan.highlights is not None:
+            for pt in plan.highlights:
                 p = right.add_paragraph(f"• {pt}")
-                p.paragraph_format.space_before = Pt(1); p.paragraph_format.space_after = Pt(1)
-                for run in p.runs: run.font.size = Pt(10)
+                BULLET_SPACING.apply(p)
+                BULLET_TEXT.apply_all(p)
         else:
-            right.text = "See feature table above."
+            right.text = NO_HIGHLIGHTS
 
     adv.autofit = False
     try:
@@ -477,18 +580,201 @@ def generate_docx(
     set_table_borders(adv)
 
     note = doc.add_paragraph()
-    note.add_run("\nAdvisor Note: ").bold = True
-    note.add_run("Choose the plan matching your family's long-term protection, maternity and travel needs. "
-                 "Discuss OPD and worldwide rider options before purchase.").italic = True
+    note.add_run(NOTE_LABEL).bold = True
+    note.add_run(NOTE_TEXT).italic = True
+    return adv
 
-    # file name and save
+# ---------- Templates ----------
+def _build_skeleton(quote: Quote):
+    """
+    Everything that does not depend on client or premium values: title block,
+    styled headers of all four tables, the feature table body and advisor section.
+    Returns (doc, {section name: index}) for app.template.
+    """
+    trace = current_trace()
+    trace.count("template_builds")
+    doc = Document()
+    date_p = _add_title(doc, quote.header_logo)
+    _add_client_table(doc)
+    _add_premium_table(doc)
+    with trace.span("feature_table"):
+        _add_feature_table(doc, quote)
+    with trace.span("advisor_table"):
+        _add_advisor_section(doc, quote)
+    slots = {
+        "prepared_by": [p._p for p in doc.paragraphs].index(date_p._p),
+        "client_table": 0,
+        "premium_table": 1,
+    }
+    return doc, slots
+
+def _skeleton_key(quote: Quote):
+    # Logo mtimes are part of the key so a replaced logo yields a fresh skeleton
+    logos = [LOGOS.load(quote.header_logo)] + [LOGOS.load(p.logo) for p in quote.plans]
+    return (
+        tuple(p.name for p in quote.plans),
+        quote.catalogue,
+        quote.logo_folder,
+        tuple((a.path, a.mtime) if a is not None else None for a in logos),
+    )
+
+# ---------- Renderers ----------
+def render_docx(quote: Quote, use_template: bool = True):
+    """Build the python-docx Document for a Quote."""
+    trace = current_trace()
+    if use_template:
+        with trace.span("template"):
+            doc, slots = TEMPLATES.clone(_skeleton_key(quote), lambda: _build_skeleton(quote))
+            _set_prepared_date(doc.paragraphs[slots["prepared_by"]], quote)
+        with trace.span("client_table"):
+            _fill_client_rows(doc.tables[slots["client_table"]], quote.clients)
+        with trace.span("premium_table"):
+            _fill_premium_rows(doc.tables[slots["premium_table"]], quote.premiums)
+    else:
+        doc = Document()
+        _set_prepared_date(_add_title(doc, quote.header_logo), quote)
+        with trace.span("client_table"):
+            _fill_client_rows(_add_client_table(doc), quote.clients)
+        with trace.span("premium_table"):
+            _fill_premium_rows(_add_premium_table(doc), quote.premiums)
+        with trace.span("feature_table"):
+            _add_feature_table(doc, quote)
+        with trace.span("advisor_table"):
+            _add_advisor_section(doc, quote)
+
+    if trace.enabled:
+        trace.count("images", len(doc.inline_shapes))
+        trace.count("image_parts", len(doc.part.package.image_parts))
+    return doc
+
+def _docx_bytes(quote: Quote) -> bytes:
+    buf = io.BytesIO()
+    render_docx(quote).save(buf)
+    return buf.getvalue()
+
+class Renderer(NamedTuple):
+    media_type: str
+    extension: str
+    render: Callable[[Quote], bytes]
+
+# Output formats: name -> renderer (all fed by the same Quote)
+RENDERERS: Dict[str, Renderer] = {
+    "docx": Renderer(DOCX_MEDIA_TYPE, ".docx", _docx_bytes),
+    "html": Renderer("text/html; charset=utf-8", ".html", render_html),
+    "pdf": Renderer("application/pdf", ".pdf", render_pdf),
+}
+
+def renderer_for(fmt: str) -> Renderer:
     try:
-        client_name = client_df.loc[0,"Client Name"] if "Client Name" in client_df.columns and not client_df.empty else "Client"
-    except Exception:
-        client_name = "Client"
-    safe_name = "".join(c for c in str(client_name) if c.isalnum() or c in (" ", "_")).strip().replace(" ", "_")
-    out_name = output_path or f"Health_Quote_{safe_name}_WithLogos.docx"
+        return RENDERERS[(fmt or "docx").lower()]
+    except KeyError:
+        raise ValueError(f"Unknown output format {fmt!r}; choose one of: {', '.join(RENDERERS)}")
 
+# ---------- Core generation ----------
+def _default_output_name(quote: Quote, extension: str) -> str:
+    safe_name = "".join(c for c in quote.client_name if c.isalnum() or c in (" ", "_")).strip().replace(" ", "_")
+    return f"Health_Quote_{safe_name}_WithLogos{extension}"
+
+def generate_docx(
+    excel_input,                 # bytes or str path
+    output_path: Union[str, IO[bytes], None],
+    logo_folder: str = "logos",
+    filename_hint: Optional[str] = None,
+    use_template: bool = True,
+) -> Union[str, IO[bytes]]:
+    """
+    Generate the Health Quote DOCX and return the output path.
+    excel_input: bytes (uploaded file) or a file path (string)
+    output_path: full path where DOCX will be saved, or a writable binary
+                 buffer (returned as-is after saving; nothing touches disk)
+    logo_folder: folder containing logos
+    filename_hint: original filename (helps pick Excel engine)
+    use_template: clone a cached skeleton for this plan combination instead of
+                  building every section from a blank Document()
+
+    Stage timings and counters go to the active app.instrument trace, if any.
+    """
+    trace = current_trace()
+    quote = build_quote(excel_input, logo_folder, filename_hint)
+    doc = render_docx(quote, use_template)
+
+    if hasattr(output_path, "write"):
+        seekable = trace.enabled and hasattr(output_path, "tell")
+        start = output_path.tell() if seekable else 0
+        with trace.span("save"):
+            doc.save(output_path)
+        if seekable:
+            trace.count("output_bytes", output_path.tell() - start)
+        return output_path
+
+    # file name and save
+    out_name = output_path or _default_output_name(quote, ".docx")
+
+    os.makedirs(os.path.dirname(out_name) or ".", exist_ok=True)
+    with trace.span("save"):
+        doc.save(out_name)
+    if trace.enabled:
+        trace.count("output_bytes", os.path.getsize(out_name))
+    return out_name
+
+def generate_docx_bytes(
+    excel_input,
+    logo_folder: str = "logos",
+    filename_hint: Optional[str] = None,
+    use_template: bool = True,
+) -> bytes:
+    """Like generate_docx, but return the DOCX as bytes without any disk I/O."""
+    buf = io.BytesIO()
+    generate_docx(excel_input, buf, logo_folder, filename_hint, use_template)
+    return buf.getvalue()
+
+def generate_bytes(
+    excel_input,
+    fmt: str = "docx",
+    logo_folder: str = "logos",
+    filename_hint: Optional[str] = None,
+) -> bytes:
+    """Render a workbook in any of RENDERERS' formats ("docx", "html", "pdf") and return the bytes."""
+    renderer = renderer_for(fmt)
+    if renderer.extension == ".docx":
+        return generate_docx_bytes(excel_input, logo_folder, filename_hint)
+    return quote_bytes(build_quote(excel_input, logo_folder, filename_hint), fmt)
+
+def generate_request_bytes(data, fmt: str = "docx", logo_folder: str = "logos") -> bytes:
+    """generate_bytes for a JSON quote request (dict, JSON text or bytes) instead of a workbook."""
+    renderer_for(fmt)  # an unknown format fails before any work
+    return quote_bytes(build_request_quote(data, logo_folder), fmt)
+
+def quote_bytes(quote: Quote, fmt: str = "docx") -> bytes:
+    """Render an assembled Quote in any of RENDERERS' formats."""
+    renderer = renderer_for(fmt)
+    trace = current_trace()
+    if renderer.extension == ".docx":
+        buf = io.BytesIO()
+        doc = render_docx(quote)
+        with trace.span("save"):
+            doc.save(buf)
+        data = buf.getvalue()
+    else:
+        with trace.span("render"):
+            data = renderer.render(quote)
+    trace.count("output_bytes", len(data))
+    return data
+
+def generate_file(
+    excel_input,
+    output_path: Optional[str],
+    logo_folder: str = "logos",
+    filename_hint: Optional[str] = None,
+    fmt: str = "docx",
+) -> str:
+    """generate_docx for any output format; returns the written path."""
+    renderer = renderer_for(fmt)
+    if renderer.extension == ".docx":
+        return generate_docx(excel_input, output_path, logo_folder, filename_hint)
+    quote = build_quote(excel_input, logo_folder, filename_hint)
+    out_name = output_path or _default_output_name(quote, renderer.extension)
     os.makedirs(os.path.dirname(out_name) or ".", exist_ok=True)
-    doc.save(out_name)
+    with open(out_name, "wb") as f:
+        f.write(renderer.render(quote))
     return out_name
@@ -0,0 +1,270 @@
+# app/readers.py
+import io
+import os
+from abc import ABC, abstractmethod
+from datetime import datetime
+from typing import List, Optional, Sequence, Tuple
+
+from app import ingest
+
+# Column kinds, named after the dtype pandas would give the column
+INT, FLOAT, DATETIME, OBJECT = "int", "float", "datetime", "object"
+
+# Text that pandas' parser reads as a blank cell (pandas.io.parsers STR_NA_VALUES,
+# matched exactly) or as booleans; the records reader leaves the latter to pandas.
+_NA_STRINGS = frozenset([
+    "", "#N/A", "#N/A N/A", "#NA", "-1.#IND", "-1.#QNAN", "-NaN", "-nan", "1.#IND", "1.#QNAN",
+    "<NA>", "N/A", "NA", "NULL", "NaN", "None", "n/a", "nan", "null",
+])
+_BOOL_STRINGS = frozenset(["True", "TRUE", "true", "False", "FALSE", "false"])
+_INT64 = (-2 ** 63, 2 ** 63 - 1)
+# Years a pandas Timestamp can hold at any resolution
+_DATE_YEARS = (1678, 2261)
+
+
+class Unsupported(Exception):
+    """A reader met content it cannot type exactly like pandas; the next reader is tried."""
+
+
+def _plain(value) -> bool:
+    """True for cell values whose pandas typing the records reader reproduces exactly."""
+    t = type(value)
+    if t is str:
+        if value in _BOOL_STRINGS:
+            return False
+        try:
+            float(value)
+        except ValueError:
+            return True
+        return False  # numeric text: pandas may convert the whole column
+    if t is int:
+        return _INT64[0] <= value <= _INT64[1]
+    if t is float:
+        return value == value  # NaN marks a formula error cell
+    if t is datetime:
+        return value.tzinfo is None and _DATE_YEARS[0] <= value.year <= _DATE_YEARS[1]
+    return False  # bool, time, timedelta, ...
+
+
+def _infer(values: Sequence) -> str:
+    types = {type(v) for v in values if v is not None}
+    if not types or types <= {int, float}:
+        return INT if types == {int} and None not in values else FLOAT
+    if types == {datetime}:
+        return DATETIME
+    return OBJECT
+
+
+class Table:
+    """
+    One worksheet as columns of plain Python values (None for a blank cell).
+
+    `kinds` records the dtype pandas gives each column (int, float, datetime
+    or object), which is all it takes to reproduce the text pandas-based
+    code printed for a cell: str() of the column-typed value, or of the
+    row-typed value when a whole row is read at once (DataFrame.iterrows
+    upcasts an all-numeric row to float).
+    """
+    __slots__ = ("names", "kinds", "columns", "nrows", "_index", "_row_kind")
+
+    def __init__(self, names: Sequence, kinds: Sequence[str], columns: Sequence[List]):
+        self.names = list(names)
+        self.kinds = list(kinds)
+        self.columns = list(columns)
+        self.nrows = len(self.columns[0]) if self.columns else 0
+        self._index = {n: i for i, n in enumerate(self.names)}
+        kinds = set(self.kinds)
+        if kinds and kinds <= {INT}:
+            self._row_kind = INT
+        elif kinds and kinds <= {INT, FLOAT}:
+            self._row_kind = FLOAT
+        else:
+            self._row_kind = OBJECT
+
+    @classmethod
+    def from_rows(cls, names: Sequence[str], rows: Sequence[Sequence]) -> "Table":
+        """Build from streamed rows ("" for blank cells); raises Unsupported for values pandas would re-type."""
+        columns = []
+        for j in range(len(names)):
+            col = []
+            for row in rows:
+                v = row[j]
+                if v == "" or (type(v) is str and v in _NA_STRINGS):
+                    col.append(None)
+                elif _plain(v):
+                    col.append(v)
+                else:
+                    raise Unsupported(f"{names[j]!r}: {type(v).__name__} value {v!r}")
+            columns.append(col)
+        return cls(names, [_infer(c) for c in columns], columns)
+
+    @classmethod
+    def from_frame(cls, df) -> "Table":
+        """Build from a pandas DataFrame, keeping its column dtypes as kinds."""
+        import numpy as np
+        import pandas as pd
+
+        kinds, columns = [], []
+        for name in df.columns:
+            col = df[name]
+            kind = col.dtype.kind if isinstance(col.dtype, np.dtype) else "O"
+            kinds.append({"i": INT, "u": INT, "f": FLOAT, "M": DATETIME}.get(kind, OBJECT))
+            columns.append([None if v is None or v is pd.NaT or v is pd.NA or v != v else v
+                            for v in col.tolist()])
+        return cls(list(df.columns), kinds, columns)
+
+    def __contains__(self, name) -> bool:
+        return name in self._index
+
+    def __len__(self) -> int:
+        return self.nrows
+
+    def kind(self, name) -> str:
+        return self.kinds[self._index[name]]
+
+    def value(self, name, i: int):
+        return self.columns[self._index[name]][i]
+
+    def text(self, name, i: int) -> Optional[str]:
+        """str() of a cell as its column types it; None for a blank cell."""
+        j = self._index[name]
+        v = self.columns[j][i]
+        if v is None:
+            return None
+        return str(float(v)) if self.kinds[j] == FLOAT else str(v)
+
+    def _datetime_row(self, i: int) -> bool:
+        # iterrows re-infers an object row: one holding nothing but blanks and
+        # dates (at least one, or a blank date-column cell) turns datetime64
+        dated = False
+        for kind, col in zip(self.kinds, self.columns):
+            v = col[i]
+            if v is None:
+                dated = dated or kind == DATETIME
+            elif isinstance(v, datetime):
+                dated = True
+            else:
+                return False
+        return dated
+
+    def _blank(self, j: int, i: int) -> str:
+        if self._row_kind != OBJECT:
+            return "nan"
+        return "NaT" if self.kinds[j] == DATETIME or self._datetime_row(i) else "nan"
+
+    def row_value(self, name, i: int):
+        """A cell as a whole-row read types it (None for blank)."""
+        v = self.value(name, i)
+        return float(v) if v is not None and self._row_kind == FLOAT else v
+
+    def row_text(self, name, i: int) -> str:
+        """str() of a cell as a whole-row read types it, blanks included ('nan' / 'NaT')."""
+        j = self._index[name]
+        v = self.columns[j][i]
+        if v is None:
+            return self._blank(j, i)
+        if self._row_kind == FLOAT or self.kinds[j] == FLOAT:
+            return str(float(v))
+        return str(v)
+
+    def row_texts(self, i: int) -> List[Optional[str]]:
+        """row_text() of every column of row i, None for blank cells."""
+        return [None if self.columns[j][i] is None else self.row_text(n, i) for j, n in enumerate(self.names)]
+
+
+class Reader(ABC):
+    """
+    A way of turning a workbook into (client Table, premium Table).
+    read() may raise Unsupported to hand the workbook to the next reader.
+    """
+    name = "reader"
+
+    @abstractmethod
+    def supports(self, excel_input, filename_hint: Optional[str] = None) -> bool:
+        ...
+
+    @abstractmethod
+    def read(self, excel_input, filename_hint: Optional[str] = None) -> Tuple[Table, Table]:
+        ...
+
+
+class RecordsReader(Reader):
+    """
+    .xlsx/.xlsm straight into Tables with openpyxl's streaming reader; pandas
+    is never imported. NA-like text ("NA", "N/A", ...) reads as blank, as it
+    does in pandas; sheets with values pandas would re-type (numeric text,
+    booleans, error cells, times) are left to PandasReader.
+    """
+    name = "records"
+
+    def supports(self, excel_input, filename_hint: Optional[str] = None) -> bool:
+        return ingest.supports(excel_input, filename_hint)
+
+    def read(self, excel_input, filename_hint: Optional[str] = None) -> Tuple[Table, Table]:
+        return ingest.read_projected(excel_input, lambda ws, want: Table.from_rows(*ingest.stream_projected(ws, want)))
+
+
+def _safe_engine_for(filename_hint: Optional[str]) -> Optional[str]:
+    ext = (os.path.splitext(filename_hint or "")[1] or "").lower()
+    if ext in (".xlsx", ".xlsm"):
+        return "openpyxl"
+    if ext == ".xls":
+        return "xlrd"
+    return None
+
+
+class PandasReader(Reader):
+    """pandas for everything: .xls, unknown inputs and sheets the records reader declines."""
+    name = "pandas"
+
+    def supports(self, excel_input, filename_hint: Optional[str] = None) -> bool:
+        return True
+
+    def read(self, excel_input, filename_hint: Optional[str] = None) -> Tuple[Table, Table]:
+        import pandas as pd
+
+        if ingest.supports(excel_input, filename_hint):
+            # .xlsx/.xlsm: streaming read of just the two sheets and known columns
+            client_df, premium_df = ingest.read_sheets(excel_input)
+        else:
+            engine = _safe_engine_for(filename_hint or "")
+            try:
+                if isinstance(excel_input, (bytes, bytearray)):
+                    xls = pd.ExcelFile(io.BytesIO(excel_input), engine=engine)
+                else:
+                    xls = pd.ExcelFile(excel_input, engine=engine)
+            except Exception as e:
+                raise ValueError(f"Failed to read Excel file: {e}")
+
+            ingest.check_sheets(xls.sheet_names)
+            client_df = pd.read_excel(xls, sheet_name="Client Details")
+            premium_df = pd.read_excel(xls, sheet_name="Premiums")
+        return Table.from_frame(client_df), Table.from_frame(premium_df)
+
+
+# Tried in order; the first reader that supports the input and does not
+# raise Unsupported wins
+READERS: List[Reader] = [RecordsReader(), PandasReader()]
+
+
+def register_reader(reader: Reader, first: bool = True):
+    """Add a reader ahead of (or after) the built-in ones."""
+    if first:
+        READERS.insert(0, reader)
+    else:
+        READERS.append(reader)
+
+
+def read_tables(excel_input, filename_hint: Optional[str] = None) -> Tuple[Table, Table, str]:
+    """Read the 'Client Details' and 'Premiums' sheets; returns (clients, premiums, reader name)."""
+    for reader in READERS:
+        if not reader.supports(excel_input, filename_hint):
+            continue
+        if hasattr(excel_input, "seek"):
+            excel_input.seek(0)
+        try:
+            clients, premiums = reader.read(excel_input, filename_hint)
+        except Unsupported:
+            continue
+        return clients, premiums, reader.name
+    raise ValueError("No reader can open this workbook")
@@ -0,0 +1,115 @@
+# app/resolver.py
+import re
+import threading
+from functools import lru_cache
+from typing import Dict, FrozenSet, Iterable, List, Optional, Sequence, Tuple, Union
+
+# An alias rule is one substring, or several that must all appear in the name
+Alias = Union[str, Sequence[str]]
+
+_TOKEN_SPLIT = re.compile(r'\W+')
+
+
+class _Compiled:
+    """Immutable matcher state; swapped atomically when insurers are registered."""
+    __slots__ = ("keys", "rules", "pattern", "prefixes", "substrings")
+
+    def __init__(self, keys: List[str], rules: List[Tuple[str, FrozenSet[str]]]):
+        self.keys = keys
+        self.rules = rules
+        terms = sorted({t for _, ts in rules for t in ts}, key=len, reverse=True)
+        # One pass over the name: the lookahead reports the longest term starting
+        # at every position; shorter terms starting there come from `prefixes`.
+        self.pattern = re.compile("(?=(" + "|".join(map(re.escape, terms)) + "))") if terms else None
+        self.prefixes: Dict[str, Tuple[str, ...]] = {
+            t: tuple(o for o in terms if o != t and t.startswith(o)) for t in terms
+        }
+        # Fallback: any word of the name found inside a key (first key wins)
+        self.substrings: Dict[str, int] = {}
+        for idx, key in enumerate(keys):
+            k = key.lower()
+            for i in range(len(k)):
+                for j in range(i + 1, len(k) + 1):
+                    self.substrings.setdefault(k[i:j], idx)
+
+    def resolve(self, n: str) -> Optional[str]:
+        if self.pattern is not None:
+            found = set()
+            for m in self.pattern.finditer(n):
+                t = m.group(1)
+                found.add(t)
+                found.update(self.prefixes[t])
+            if found:
+                for key, terms in self.rules:
+                    if terms <= found:
+                        return key
+        best = None
+        for token in _TOKEN_SPLIT.split(n):
+            if token:
+                idx = self.substrings.get(token)
+                if idx is not None and (best is None or idx < best):
+                    best = idx
+        return self.keys[best] if best is not None else None
+
+
+class PlanResolver:
+    """
+    Maps free-text plan / insurer names to MASTER keys.
+
+    Alias rules are checked in priority order (first satisfied rule wins);
+    names matching no alias fall back to "any word of the name appears in
+    a key". Results are memoised in a bounded LRU keyed on the normalised
+    name. New insurers can be added at runtime with register().
+    """
+
+    def __init__(self, keys: Iterable[str], aliases: Iterable[Tuple[str, Alias]] = (), cache_size: int = 4096):
+        self._lock = threading.Lock()
+        self._keys: List[str] = list(keys)
+        self._rules: List[Tuple[str, FrozenSet[str]]] = []
+        for key, alias in aliases:
+            self._rules.append((key, self._terms(alias)))
+        self._cache_size = cache_size
+        self._compile()
+
+    @staticmethod
+    def _terms(alias: Alias) -> FrozenSet[str]:
+        terms = [alias] if isinstance(alias, str) else list(alias)
+        terms = [t.lower().strip() for t in terms if t and t.strip()]
+        if not terms:
+            raise ValueError("Alias must contain at least one non-empty term")
+        return frozenset(terms)
+
+    def _compile(self):
+        compiled = _Compiled(list(self._keys), list(self._rules))
+        self._compiled = compiled
+        self._cached = lru_cache(maxsize=self._cache_size)(compiled.resolve)
+
+    def resolve(self, name_text: Optional[str]) -> Optional[str]:
+        if not name_text:
+            return None
+        return self._cached(str(name_text).lower().strip())
+
+    __call__ = resolve
+
+    def register(self, key: str, aliases: Iterable[Alias] = (), first: bool = False):
+        """
+        Add an insurer key (if new) and alias rules for it. Rules go after the
+        existing ones unless `first` is set. Clears the resolution cache.
+        """
+        rules = [(key, self._terms(a)) for a in aliases]
+        with self._lock:
+            if key not in self._keys:
+                self._keys.append(key)
+            self._rules = rules + self._rules if first else self._rules + rules
+            self._compile()
+
+    @property
+    def keys(self) -> List[str]:
+        return list(self._keys)
+
+    @property
+    def rules(self) -> List[Tuple[str, Tuple[str, ...]]]:
+        return [(key, tuple(sorted(terms))) for key, terms in self._rules]
+
+    def cache_info(self):
+        return self._cached.cache_info()
@@ -0,0 +1,143 @@
+# app/schema.py
+import json
+from datetime import date, datetime
+from typing import Any, Dict, Iterable, Iterator, List, Mapping, NamedTuple, Optional, Tuple, Union
+
+from app import ingest
+from app.readers import OBJECT, Table
+
+# JSON field -> the 'Client Details' / 'Premiums' column it fills. A record
+# may use either spelling ("sum_assured" or "Sum Assured").
+CLIENT_FIELDS = dict(zip(("client_name", "relation", "dob", "age", "city", "sum_assured"), ingest.CLIENT_COLUMNS))
+PREMIUM_FIELDS = dict(zip(("plan", "premium_1y", "premium_2y", "premium_3y"),
+                          ["Plan Name"] + ingest.PREMIUM_COLUMNS))
+REQUEST_FIELDS = ("id", "clients", "premiums")
+
+_DATE_FORMATS = ("%d-%m-%Y", "%d/%m/%Y")
+
+
+class QuoteRequest(NamedTuple):
+    id: Optional[str]
+    clients: Table    # shaped like the 'Client Details' sheet
+    premiums: Table   # shaped like the 'Premiums' sheet
+
+
+def _number_text(value: Union[int, float]) -> str:
+    return str(int(value)) if float(value).is_integer() else str(value)
+
+
+def _text(value, where: str) -> str:
+    if value is None:
+        return ""
+    if isinstance(value, bool) or not isinstance(value, (str, int, float)):
+        raise ValueError(f"{where}: expected text, got {type(value).__name__}")
+    return value.strip() if isinstance(value, str) else _number_text(value)
+
+
+def _age(value, where: str) -> str:
+    if value is None or value == "":
+        return ""
+    try:
+        age = float(value) if not isinstance(value, bool) else -1.0
+    except (TypeError, ValueError):
+        age = -1.0
+    if not 0 <= age < 150:
+        raise ValueError(f"{where}: expected an age in years, got {value!r}")
+    return _number_text(age)
+
+
+def _premium(value, where: str) -> Union[str, int, float]:
+    if isinstance(value, (int, float)) and not isinstance(value, bool):
+        if not 0 <= value < float("inf"):
+            raise ValueError(f"{where}: expected a premium in rupees, got {value!r}")
+        # Kept a number, as in a workbook cell; the processor formats both alike
+        return value
+    return _text(value, where)
+
+
+def _dob(value, where: str) -> Optional[datetime]:
+    if value is None or value == "":
+        return None
+    if isinstance(value, str):
+        try:
+            return datetime.fromisoformat(value.strip())
+        except ValueError:
+            for fmt in _DATE_FORMATS:
+                try:
+                    return datetime.strptime(value.strip(), fmt)
+                except ValueError:
+                    pass
+    elif isinstance(value, date):
+        return datetime(value.year, value.month, value.day)
+    raise ValueError(f"{where}: expected a date (YYYY-MM-DD or DD-MM-YYYY), got {value!r}")
+
+
+_CLIENT_PARSERS = {"DOB": _dob, "Age": _age}
+_PREMIUM_PARSERS = {c: _premium for c in ingest.PREMIUM_COLUMNS}
+
+
+def _table(records, fields: Dict[str, str], parsers: Dict, where: str) -> Table:
+    if not isinstance(records, list):
+        raise ValueError(f"{where}: expected a list of records")
+    columns = list(fields.values())
+    aliases = {**fields, **{c: c for c in columns}}
+    values: Dict[str, List[Any]] = {c: [] for c in columns}
+    for i, record in enumerate(records):
+        at = f"{where}[{i}]"
+        if not isinstance(record, Mapping):
+            raise ValueError(f"{at}: expected an object")
+        unknown = [k for k in record if k not in aliases]
+        if unknown:
+            raise ValueError(f"{at}: unknown field(s) {', '.join(map(repr, unknown))}; "
+                             f"expected {', '.join(fields)}")
+        row = {aliases[k]: v for k, v in record.items()}
+        for field, c in fields.items():
+            values[c].append(parsers.get(c, _text)(row.get(c), f"{at}.{field}"))
+    # Blank text stays "" (not a blank cell), so it prints blank rather than the 'nan' of an empty sheet cell
+    return Table(columns, [OBJECT] * len(columns), [values[c] for c in columns])
+
+
+def parse_request(data: Union[str, bytes, Mapping]) -> QuoteRequest:
+    """
+    A JSON quote request as the Tables the Excel front end reads:
+
+        {"id": "Q-123",                       (optional; names the output file)
+         "clients": [{"client_name", "relation", "dob", "age", "city", "sum_assured"}, ...],
+         "premiums": [{"plan", "premium_1y", "premium_2y", "premium_3y"}, ...]}
+
+    Raises ValueError naming the offending field.
+    """
+    if isinstance(data, (str, bytes, bytearray)):
+        try:
+            data = json.loads(data)
+        except ValueError as e:
+            raise ValueError(f"Invalid JSON: {e}")
+    if not isinstance(data, Mapping):
+        raise ValueError("A quote request must be a JSON object")
+    unknown = [k for k in data if k not in REQUEST_FIELDS]
+    if unknown:
+        raise ValueError(f"Unknown field(s) {', '.join(map(repr, unknown))}; expected {', '.join(REQUEST_FIELDS)}")
+    clients = _table(data.get("clients"), CLIENT_FIELDS, _CLIENT_PARSERS, "clients")
+    if not len(clients):
+        raise ValueError("clients: at least one member is required")
+    premiums = _table(data.get("premiums") or [], PREMIUM_FIELDS, _PREMIUM_PARSERS, "premiums")
+    for i, plan in enumerate(premiums.columns[0]):
+        if not plan:
+            raise ValueError(f"premiums[{i}].plan: required")
+    return QuoteRequest(request_id(data), clients, premiums)
+
+
+def request_id(data: Mapping) -> Optional[str]:
+    rid = data.get("id")
+    if rid is None or rid == "":
+        return None
+    if isinstance(rid, bool) or not isinstance(rid, (str, int)):
+        raise ValueError("id: expected text or a number")
+    return str(rid)
+
+
+def iter_ndjson(lines: Iterable[Union[str, bytes]]) -> Iterator[Tuple[int, Union[str, bytes]]]:
+    """(line number, text) of each non-blank line of an NDJSON stream."""
+    for n, line in enumerate(lines, 1):
+        if line.strip():
+            yield n, line
@@ -0,0 +1,114 @@
+# app/styling.py
+from copy import deepcopy
+from functools import lru_cache
+from typing import Optional
+
+from docx.oxml import OxmlElement, parse_xml
+from docx.oxml.ns import nsdecls, qn
+from docx.shared import Length, RGBColor
+from docx.text.paragraph import Paragraph
+from docx.text.run import Run
+
+
+@lru_cache(maxsize=None)
+def _shading(color: str):
+    return parse_xml(f'<w:shd {nsdecls("w")} w:fill="{color}"/>')
+
+
+def shade_cell(cell, color: str):
+    """Append a copy of the cached <w:shd> for `color` to the cell's tcPr."""
+    cell._tc.get_or_add_tcPr().append(deepcopy(_shading(color)))
+
+
+def _table_borders():
+    borders = OxmlElement('w:tblBorders')
+    for tag in ['top', 'left', 'bottom', 'right', 'insideH', 'insideV']:
+        e = OxmlElement(f'w:{tag}')
+        e.set(qn('w:val'), 'single')
+        e.set(qn('w:sz'), '8')
+        e.set(qn('w:color'), '000000')
+        borders.append(e)
+    return borders
+
+
+_BORDERS = _table_borders()
+
+
+def replace_table_borders(table):
+    """Swap the table's <w:tblBorders> for a copy of the shared single-line prototype."""
+    tbl = table._tbl
+    tbl_pr = tbl.find(qn('w:tblPr'))
+    if tbl_pr is None:
+        tbl_pr = OxmlElement('w:tblPr')
+        tbl.insert(0, tbl_pr)
+    old = tbl_pr.find(qn('w:tblBorders'))
+    if old is not None:
+        tbl_pr.remove(old)
+    tbl_pr.append(deepcopy(_BORDERS))
+
+
+class RunStyle:
+    """
+    Character formatting compiled once into a <w:rPr> prototype.
+
+    apply() gives an unformatted run a deep copy of the prototype (one element
+    insertion); runs that already carry an rPr go through the python-docx
+    setters so existing properties are merged the usual way. The prototype
+    itself is built with those setters, so both paths produce the same XML.
+    """
+    __slots__ = ("bold", "color", "size", "_rpr")
+
+    def __init__(self, bold: Optional[bool] = None, color: Optional[RGBColor] = None, size: Optional[Length] = None):
+        self.bold = bold
+        self.color = color
+        self.size = size
+        r = OxmlElement('w:r')
+        self._set(Run(r, None))
+        self._rpr = r.rPr
+
+    def _set(self, run: Run):
+        if self.color is not None:
+            run.font.color.rgb = self.color
+        if self.bold is not None:
+            run.font.bold = self.bold
+        if self.size is not None:
+            run.font.size = self.size
+
+    def apply(self, run: Run):
+        r = run._r
+        if r.rPr is None and self._rpr is not None:
+            r.insert(0, deepcopy(self._rpr))
+        else:
+            self._set(run)
+
+    def apply_all(self, cell_or_paragraph):
+        """Style every run of a paragraph, or of every paragraph in a cell."""
+        paragraphs = [cell_or_paragraph] if isinstance(cell_or_paragraph, Paragraph) else cell_or_paragraph.paragraphs
+        for p in paragraphs:
+            for run in p.runs:
+                self.apply(run)
+
+
+class ParagraphSpacing:
+    """Paragraph space-before/after compiled once into a <w:pPr> prototype (same rules as RunStyle)."""
+    __slots__ = ("before", "after", "_ppr")
+
+    def __init__(self, before: Optional[Length] = None, after: Optional[Length] = None):
+        self.before = before
+        self.after = after
+        p = OxmlElement('w:p')
+        self._set(Paragraph(p, None))
+        self._ppr = p.pPr
+
+    def _set(self, par: Paragraph):
+        if self.before is not None:
+            par.paragraph_format.space_before = self.before
+        if self.after is not None:
+            par.paragraph_format.space_after = self.after
+
+    def apply(self, par: Paragraph):
+        p = par._p
+        if p.pPr is None and self._ppr is not None:
+            p.insert(0, deepcopy(self._ppr))
+        else:
+            self._set(par)
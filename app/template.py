@@ -0,0 +1,60 @@
+# app/template.py
+import io
+import threading
+from collections import OrderedDict
+from typing import Callable, Dict, Hashable, Tuple
+
+from docx import Document
+
+
+class TemplateCache:
+    """
+    Bounded LRU of pre-built DOCX skeletons, kept as saved package bytes.
+
+    A skeleton holds everything in a quote that does not depend on the
+    client (title block, styled table headers, feature table, advisor
+    section and their logo parts). clone() re-opens the bytes, which costs
+    about as much as Document() itself, so per-request work is reduced to
+    filling in client and premium rows.
+    """
+
+    def __init__(self, maxsize: int = 32):
+        self.maxsize = maxsize
+        self._lock = threading.Lock()
+        self._entries: "OrderedDict[Hashable, Tuple[bytes, Dict[str, int]]]" = OrderedDict()
+
+    def clone(self, key: Hashable, build: Callable[[], Tuple[object, Dict[str, int]]]):
+        """
+        Return (document, slots) for `key`, building and caching the skeleton
+        with `build()` on a miss. `slots` maps section names to paragraph /
+        table indexes the caller fills in.
+        """
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                self._entries.move_to_end(key)
+        if entry is not None:
+            blob, slots = entry
+            return Document(io.BytesIO(blob)), dict(slots)
+
+        doc, slots = build()
+        buf = io.BytesIO()
+        doc.save(buf)
+        with self._lock:
+            self._entries[key] = (buf.getvalue(), dict(slots))
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.maxsize:
+                self._entries.popitem(last=False)
+        # The freshly built document is not shared, so hand it out directly
+        return doc, dict(slots)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+
+# One cache per process, keyed by plan combination and logo versions
+TEMPLATES = TemplateCache()
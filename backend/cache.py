@@ -0,0 +1,182 @@
+import glob
+import hashlib
+import os
+import threading
+from collections import OrderedDict
+from typing import Dict, Optional
+
+# Source files of the quote pipeline; a deploy that changes them must not
+# serve documents cached by the previous code from a persistent disk cache.
+_APP_DIR = os.path.abspath(os.path.join(os.path.dirname(__file__), "..", "app"))
+
+# Disk entries are named <key>.bin; "*.docx" entries from older versions are
+# still counted (and trimmed first, being the oldest) from the start-up scan
+_SUFFIX = ".bin"
+
+
+def code_fingerprint() -> str:
+    h = hashlib.sha256()
+    for path in sorted(glob.glob(os.path.join(_APP_DIR, "*.py"))):
+        st = os.stat(path)
+        h.update(f"{os.path.basename(path)}:{st.st_size}:{st.st_mtime_ns};".encode())
+    return h.hexdigest()[:16]
+
+
+class ResultCache:
+    """
+    Content-addressed cache of generated documents (DOCX, PDF or HTML).
+
+    Entries live in a bounded in-memory LRU (`max_items` / `max_bytes`);
+    when `disk_dir` is set, every entry is also written there and the
+    directory is trimmed to `max_disk_bytes`, oldest-used first, so results
+    survive memory eviction and restarts. The directory is scanned once at
+    start; after that its usage is tracked as entries are written and read.
+    """
+
+    def __init__(
+        self,
+        max_items: int = 128,
+        max_bytes: int = 64 * 1024 * 1024,
+        disk_dir: Optional[str] = None,
+        max_disk_bytes: int = 512 * 1024 * 1024,
+    ):
+        self.max_items = max_items
+        self.max_bytes = max_bytes
+        self.disk_dir = disk_dir
+        self.max_disk_bytes = max_disk_bytes
+        self._lock = threading.Lock()
+        self._mem: "OrderedDict[str, bytes]" = OrderedDict()
+        self._mem_bytes = 0
+        self.hits = 0
+        self.disk_hits = 0
+        self.misses = 0
+        self.evictions = 0
+        # Disk entries, least recently used first: path -> size
+        self._disk: "OrderedDict[str, int]" = OrderedDict()
+        self._disk_bytes = 0
+        if disk_dir:
+            os.makedirs(disk_dir, exist_ok=True)
+            self._scan_disk()
+
+    @staticmethod
+    def key(*parts) -> str:
+        h = hashlib.sha256()
+        for part in parts:
+            data = part if isinstance(part, (bytes, bytearray)) else str(part).encode("utf-8")
+            h.update(len(data).to_bytes(8, "big"))
+            h.update(data)
+        return h.hexdigest()
+
+    def _disk_path(self, key: str) -> str:
+        # The key covers the output format, so one neutral suffix serves every format
+        return os.path.join(self.disk_dir, key + _SUFFIX)
+
+    def get(self, key: str) -> Optional[bytes]:
+        with self._lock:
+            data = self._mem.get(key)
+            if data is not None:
+                self._mem.move_to_end(key)
+                self.hits += 1
+                return data
+        if self.disk_dir:
+            path = self._disk_path(key)
+            try:
+                with open(path, "rb") as f:
+                    data = f.read()
+                os.utime(path)
+            except OSError:
+                data = None
+            if data is not None:
+                with self._lock:
+                    self.hits += 1
+                    self.disk_hits += 1
+                    if path in self._disk:
+                        self._disk.move_to_end(path)
+                self._remember(key, data)
+                return data
+        with self._lock:
+            self.misses += 1
+        return None
+
+    def put(self, key: str, data: bytes):
+        if len(data) > self.max_bytes:
+            return
+        self._remember(key, data)
+        if self.disk_dir:
+            tmp = self._disk_path(key) + ".tmp"
+            try:
+                with open(tmp, "wb") as f:
+                    f.write(data)
+                os.replace(tmp, self._disk_path(key))
+            except OSError:
+                return
+            self._track_disk(self._disk_path(key), len(data))
+
+    def _remember(self, key: str, data: bytes):
+        with self._lock:
+            old = self._mem.pop(key, None)
+            if old is not None:
+                self._mem_bytes -= len(old)
+            self._mem[key] = data
+            self._mem_bytes += len(data)
+            while self._mem and (len(self._mem) > self.max_items or self._mem_bytes > self.max_bytes):
+                _, dropped = self._mem.popitem(last=False)
+                self._mem_bytes -= len(dropped)
+                self.evictions += 1
+
+    def _scan_disk(self):
+        entries = []
+        for pattern in ("*" + _SUFFIX, "*.docx"):
+            for path in glob.glob(os.path.join(self.disk_dir, pattern)):
+                try:
+                    st = os.stat(path)
+                except OSError:
+                    continue
+                entries.append((st.st_mtime, st.st_size, path))
+        for _, size, path in sorted(entries):
+            self._disk[path] = size
+            self._disk_bytes += size
+        self._trim_disk()
+
+    def _track_disk(self, path: str, size: int):
+        with self._lock:
+            self._disk_bytes += size - self._disk.pop(path, 0)
+            self._disk[path] = size
+        self._trim_disk()
+
+    def _trim_disk(self):
+        while True:
+            with self._lock:
+                if not self._disk or self._disk_bytes <= self.max_disk_bytes:
+                    return
+                path, size = self._disk.popitem(last=False)
+                self._disk_bytes -= size
+            try:
+                os.remove(path)
+            except OSError:
+                pass
+
+    def clear(self):
+        with self._lock:
+            self._mem.clear()
+            self._mem_bytes = 0
+
+    def stats(self) -> Dict[str, int]:
+        with self._lock:
+            return {
+                "hits": self.hits,
+                "disk_hits": self.disk_hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+                "items": len(self._mem),
+                "bytes": self._mem_bytes,
+            }
+
+
+def cache_from_env() -> ResultCache:
+    return ResultCache(
+        max_items=int(os.environ.get("RESULT_CACHE_ITEMS", "128")),
+        max_bytes=int(os.environ.get("RESULT_CACHE_MB", "64")) * 1024 * 1024,
+        disk_dir=os.environ.get("RESULT_CACHE_DIR") or None,
+        max_disk_bytes=int(os.environ.get("RESULT_CACHE_DISK_MB", "512")) * 1024 * 1024,
+    )
@@ -0,0 +1,450 @@
+import asyncio
+import math
+import os
+import sqlite3
+import threading
+import time
+import traceback
+import uuid
+from abc import ABC, abstractmethod
+from collections import deque
+from typing import Awaitable, Callable, Deque, Dict, List, NamedTuple, Optional, Sequence, Tuple
+
+# Per-file states; a job is "queued" until a file starts, "running" while any
+# file is queued or running, then "done" (check progress.failed for errors)
+QUEUED, RUNNING, OK, ERROR = "queued", "running", "ok", "error"
+
+
+class JobsFull(Exception):
+    """Raised when accepting a job would push the backlog past its limits."""
+
+    def __init__(self, retry_after: int):
+        super().__init__("Job queue is full")
+        self.retry_after = retry_after
+
+
+class JobItem(NamedTuple):
+    """One workbook of a job, as handed to a worker."""
+    job_id: str
+    index: int
+    name: str
+    content: bytes
+    fmt: str
+
+
+class JobStore(ABC):
+    """
+    Where jobs, their uploaded workbooks and finished documents are kept.
+
+    claim() hands out queued files oldest first and marks them running;
+    finish() records the document or the error and drops the input bytes.
+    get() returns a job as a plain dict (see job_summary), or None.
+    Methods block (SQLite does disk I/O), so async callers run them in a thread.
+    """
+    name = "store"
+
+    @abstractmethod
+    def add(self, fmt: str, extension: str, items: Sequence[Tuple[str, str, bytes]]) -> str:
+        """Queue (source name, output name, content) triples as one job; returns the job id."""
+
+    @abstractmethod
+    def claim(self) -> Optional[JobItem]:
+        ...
+
+    @abstractmethod
+    def finish(self, job_id: str, index: int, output: Optional[bytes], error: Optional[str], seconds: float):
+        ...
+
+    @abstractmethod
+    def get(self, job_id: str) -> Optional[Dict]:
+        ...
+
+    @abstractmethod
+    def output(self, job_id: str, index: int) -> Optional[bytes]:
+        ...
+
+    @abstractmethod
+    def backlog(self) -> Tuple[int, int]:
+        """
+        (files queued or running, bytes counted against JOB_MAX_PENDING_MB):
+        their uploads, plus finished documents if the store keeps those in memory.
+        """
+
+    @abstractmethod
+    def purge(self, before: float) -> int:
+        """Delete jobs that finished before `before` (epoch seconds); returns how many."""
+
+    def close(self):
+        pass
+
+
+def _new_id() -> str:
+    return uuid.uuid4().hex
+
+
+def _job_status(files: List[Dict]) -> str:
+    states = {f["status"] for f in files}
+    if states <= {QUEUED}:
+        return QUEUED
+    if states & {QUEUED, RUNNING}:
+        return RUNNING
+    return "done"
+
+
+class MemoryJobStore(JobStore):
+    """
+    Jobs in a dict; lost on restart. Finished documents stay in memory until
+    purged, so backlog() counts them with the queued uploads.
+    """
+    name = "memory"
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._jobs: Dict[str, Dict] = {}
+        self._inputs: Dict[Tuple[str, int], bytes] = {}
+        self._outputs: Dict[Tuple[str, int], bytes] = {}
+        self._queue: Deque[Tuple[str, int]] = deque()
+        self._backlog_bytes = 0
+        self._output_bytes = 0
+        self._running = 0
+
+    def add(self, fmt, extension, items):
+        job_id = _new_id()
+        files = [
+            {"index": i, "source": src, "output": out, "status": QUEUED, "error": None, "ms": None}
+            for i, (src, out, _) in enumerate(items)
+        ]
+        with self._lock:
+            self._jobs[job_id] = {
+                "id": job_id, "format": fmt, "extension": extension,
+                "created": time.time(), "finished": None, "files": files,
+            }
+            for i, (_, _, content) in enumerate(items):
+                self._inputs[(job_id, i)] = content
+                self._backlog_bytes += len(content)
+                self._queue.append((job_id, i))
+        return job_id
+
+    def claim(self):
+        with self._lock:
+            while self._queue:
+                key = self._queue.popleft()
+                job = self._jobs.get(key[0])
+                if job is None:
+                    self._backlog_bytes -= len(self._inputs.pop(key, b""))
+                    continue
+                job["files"][key[1]]["status"] = RUNNING
+                self._running += 1
+                f = job["files"][key[1]]
+                return JobItem(key[0], key[1], f["source"], self._inputs[key], job["format"])
+        return None
+
+    def finish(self, job_id, index, output, error, seconds):
+        with self._lock:
+            content = self._inputs.pop((job_id, index), b"")
+            self._backlog_bytes -= len(content)
+            self._running -= 1
+            job = self._jobs.get(job_id)
+            if job is None:
+                return
+            f = job["files"][index]
+            f.update(status=OK if error is None else ERROR, error=error, ms=round(seconds * 1000))
+            if output is not None:
+                self._outputs[(job_id, index)] = output
+                self._output_bytes += len(output)
+            if _job_status(job["files"]) == "done":
+                job["finished"] = time.time()
+
+    def get(self, job_id):
+        with self._lock:
+            job = self._jobs.get(job_id)
+            if job is None:
+                return None
+            return dict(job, files=[dict(f) for f in job["files"]])
+
+    def output(self, job_id, index):
+        return self._outputs.get((job_id, index))
+
+    def backlog(self):
+        with self._lock:
+            return len(self._queue) + self._running, self._backlog_bytes + self._output_bytes
+
+    def purge(self, before):
+        with self._lock:
+            old = [j for j, job in self._jobs.items() if job["finished"] and job["finished"] < before]
+            for job_id in old:
+                job = self._jobs.pop(job_id)
+                for f in job["files"]:
+                    self._output_bytes -= len(self._outputs.pop((job_id, f["index"]), b""))
+                    # Uploads still queued have no job left to claim them
+                    self._backlog_bytes -= len(self._inputs.pop((job_id, f["index"]), b""))
+            if old:
+                gone = set(old)
+                self._queue = deque(key for key in self._queue if key[0] not in gone)
+        return len(old)
+
+
+class SqliteJobStore(JobStore):
+    """
+    Jobs, uploads and documents in one SQLite file, so queued work survives
+    a restart: files left running by a stopped server are queued again.
+    """
+    name = "sqlite"
+
+    def __init__(self, path: str):
+        self.path = path
+        os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        self._lock = threading.Lock()
+        self._db = sqlite3.connect(path, check_same_thread=False, isolation_level=None)
+        self._db.execute("PRAGMA journal_mode=WAL")
+        self._db.execute("PRAGMA synchronous=NORMAL")
+        self._db.executescript("""
+            CREATE TABLE IF NOT EXISTS jobs (
+                id TEXT PRIMARY KEY, format TEXT NOT NULL, extension TEXT NOT NULL,
+                created REAL NOT NULL, finished REAL
+            );
+            CREATE TABLE IF NOT EXISTS job_files (
+                seq INTEGER PRIMARY KEY AUTOINCREMENT,
+                job_id TEXT NOT NULL REFERENCES jobs(id) ON DELETE CASCADE,
+                idx INTEGER NOT NULL, source TEXT NOT NULL, output_name TEXT NOT NULL,
+                status TEXT NOT NULL, error TEXT, ms INTEGER, size INTEGER NOT NULL,
+                content BLOB, output BLOB,
+                UNIQUE (job_id, idx)
+            );
+            CREATE INDEX IF NOT EXISTS job_files_status ON job_files (status, seq);
+        """)
+        self._db.execute("PRAGMA foreign_keys=ON")
+        self._db.execute("UPDATE job_files SET status = ? WHERE status = ?", (QUEUED, RUNNING))
+
+    def add(self, fmt, extension, items):
+        job_id = _new_id()
+        with self._lock:
+            db = self._db
+            db.execute("BEGIN")
+            try:
+                db.execute("INSERT INTO jobs (id, format, extension, created) VALUES (?, ?, ?, ?)",
+                           (job_id, fmt, extension, time.time()))
+                db.executemany(
+                    "INSERT INTO job_files (job_id, idx, source, output_name, status, size, content)"
+                    " VALUES (?, ?, ?, ?, ?, ?, ?)",
+                    [(job_id, i, src, out, QUEUED, len(content), content)
+                     for i, (src, out, content) in enumerate(items)],
+                )
+                db.execute("COMMIT")
+            except BaseException:
+                db.execute("ROLLBACK")
+                raise
+        return job_id
+
+    def claim(self):
+        with self._lock:
+            row = self._db.execute(
+                "SELECT f.seq, f.job_id, f.idx, f.source, f.content, j.format FROM job_files f"
+                " JOIN jobs j ON j.id = f.job_id WHERE f.status = ? ORDER BY f.seq LIMIT 1",
+                (QUEUED,),
+            ).fetchone()
+            if row is None:
+                return None
+            self._db.execute("UPDATE job_files SET status = ? WHERE seq = ?", (RUNNING, row[0]))
+        return JobItem(row[1], row[2], row[3], row[4], row[5])
+
+    def finish(self, job_id, index, output, error, seconds):
+        with self._lock:
+            db = self._db
+            db.execute("BEGIN")
+            try:
+                db.execute(
+                    "UPDATE job_files SET status = ?, error = ?, ms = ?, output = ?, content = NULL"
+                    " WHERE job_id = ? AND idx = ?",
+                    (OK if error is None else ERROR, error, round(seconds * 1000), output, job_id, index),
+                )
+                left = db.execute(
+                    "SELECT COUNT(*) FROM job_files WHERE job_id = ? AND status IN (?, ?)",
+                    (job_id, QUEUED, RUNNING),
+                ).fetchone()[0]
+                if not left:
+                    db.execute("UPDATE jobs SET finished = ? WHERE id = ?", (time.time(), job_id))
+                db.execute("COMMIT")
+            except BaseException:
+                db.execute("ROLLBACK")
+                raise
+
+    def get(self, job_id):
+        with self._lock:
+            job = self._db.execute(
+                "SELECT id, format, extension, created, finished FROM jobs WHERE id = ?", (job_id,)
+            ).fetchone()
+            if job is None:
+                return None
+            files = self._db.execute(
+                "SELECT idx, source, output_name, status, error, ms FROM job_files WHERE job_id = ? ORDER BY idx",
+                (job_id,),
+            ).fetchall()
+        return {
+            "id": job[0], "format": job[1], "extension": job[2], "created": job[3], "finished": job[4],
+            "files": [
+                {"index": f[0], "source": f[1], "output": f[2], "status": f[3], "error": f[4], "ms": f[5]}
+                for f in files
+            ],
+        }
+
+    def output(self, job_id, index):
+        with self._lock:
+            row = self._db.execute(
+                "SELECT output FROM job_files WHERE job_id = ? AND idx = ?", (job_id, index)
+            ).fetchone()
+        return row[0] if row else None
+
+    def backlog(self):
+        with self._lock:
+            files, size = self._db.execute(
+                "SELECT COUNT(*), COALESCE(SUM(size), 0) FROM job_files WHERE status IN (?, ?)",
+                (QUEUED, RUNNING),
+            ).fetchone()
+        return files, size
+
+    def purge(self, before):
+        with self._lock:
+            cur = self._db.execute("DELETE FROM jobs WHERE finished IS NOT NULL AND finished < ?", (before,))
+        return cur.rowcount
+
+    def close(self):
+        with self._lock:
+            self._db.close()
+
+
+def job_summary(job: Dict) -> Dict:
+    """A stored job plus its overall status and progress counts."""
+    files = job["files"]
+    counts = {s: 0 for s in (QUEUED, RUNNING, OK, ERROR)}
+    for f in files:
+        counts[f["status"]] += 1
+    return dict(
+        job,
+        status=_job_status(files),
+        progress={
+            "total": len(files),
+            "done": counts[OK] + counts[ERROR],
+            "failed": counts[ERROR],
+            "queued": counts[QUEUED],
+            "running": counts[RUNNING],
+        },
+    )
+
+
+Render = Callable[[str, bytes, str], Awaitable[bytes]]
+
+
+class JobRunner:
+    """
+    Drains a JobStore with `concurrency` asyncio workers, each rendering one
+    file at a time through `render` (the render pool).
+
+    Admission control: submit() raises JobsFull when the job would take the
+    backlog past `max_files` files or `max_bytes` of uploads, with a
+    Retry-After estimated from recent render times, so overload is answered
+    at once instead of timing out later. Finished jobs are purged after
+    `ttl` seconds.
+    """
+
+    def __init__(
+        self,
+        store: JobStore,
+        render: Render,
+        concurrency: int = 2,
+        max_files: int = 1000,
+        max_bytes: int = 256 * 1024 * 1024,
+        ttl: float = 24 * 3600,
+    ):
+        self.store = store
+        self.render = render
+        self.concurrency = max(1, concurrency)
+        self.max_files = max_files
+        self.max_bytes = max_bytes
+        self.ttl = ttl
+        self.avg_seconds = 1.0  # moving average of one render, for Retry-After
+        self._cond: Optional[asyncio.Condition] = None
+        self._tasks: List[asyncio.Task] = []
+
+    def start(self):
+        """Start the workers on the running loop (queued jobs from a previous run resume)."""
+        if self._tasks:
+            return
+        self._cond = asyncio.Condition()
+        self._tasks = [asyncio.ensure_future(self._work()) for _ in range(self.concurrency)]
+        self._tasks.append(asyncio.ensure_future(self._reap()))
+
+    async def stop(self):
+        for t in self._tasks:
+            t.cancel()
+        await asyncio.gather(*self._tasks, return_exceptions=True)
+        self._tasks = []
+        await asyncio.to_thread(self.store.close)
+
+    def retry_after(self, files: int) -> int:
+        return max(1, math.ceil(files * self.avg_seconds / self.concurrency))
+
+    async def admit(self, files: int, size: int):
+        """Raise JobsFull if `files` more files of `size` bytes would not fit; cheap, so call it before reading uploads."""
+        queued, held = await asyncio.to_thread(self.store.backlog)
+        if queued + files > self.max_files or held + size > self.max_bytes:
+            raise JobsFull(self.retry_after(queued))
+
+    async def submit(self, fmt: str, extension: str, items: Sequence[Tuple[str, str, bytes]]) -> str:
+        await self.admit(len(items), sum(len(c) for _, _, c in items))
+        # The store writes the uploads (SQLite: BLOBs and a commit) off the event loop
+        job_id = await asyncio.to_thread(self.store.add, fmt, extension, items)
+        if self._cond is not None:
+            async with self._cond:
+                self._cond.notify(len(items))
+        return job_id
+
+    async def _work(self):
+        while True:
+            async with self._cond:
+                item = await asyncio.to_thread(self.store.claim)
+                while item is None:
+                    await self._cond.wait()
+                    item = await asyncio.to_thread(self.store.claim)
+            t0 = time.perf_counter()
+            output, error = None, None
+            try:
+                output = await self.render(item.name, item.content, item.fmt)
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                error = str(e) or type(e).__name__
+            seconds = time.perf_counter() - t0
+            self.avg_seconds = 0.8 * self.avg_seconds + 0.2 * seconds
+            try:
+                await asyncio.to_thread(self.store.finish, item.job_id, item.index, output, error, seconds)
+            except Exception:
+                traceback.print_exc()
+
+    async def _reap(self):
+        while True:
+            await asyncio.sleep(min(self.ttl, 600))
+            try:
+                await asyncio.to_thread(self.store.purge, time.time() - self.ttl)
+            except Exception:
+                traceback.print_exc()
+
+
+def store_from_env() -> JobStore:
+    kind = os.environ.get("JOB_STORE", "memory")
+    if kind == "memory":
+        return MemoryJobStore()
+    if kind == "sqlite":
+        return SqliteJobStore(os.environ.get("JOB_DB", os.path.join(os.getcwd(), "jobs.sqlite3")))
+    raise ValueError(f"Unknown job store: {kind!r}")
+
+
+def runner_from_env(render: Render, default_concurrency: int) -> JobRunner:
+    return JobRunner(
+        store_from_env(),
+        render,
+        concurrency=int(os.environ.get("JOB_CONCURRENCY", "0")) or default_concurrency,
+        max_files=int(os.environ.get("JOB_MAX_PENDING", "1000")),
+        max_bytes=int(os.environ.get("JOB_MAX_PENDING_MB", "256")) * 1024 * 1024,
+        ttl=float(os.environ.get("JOB_TTL_HOURS", "24")) * 3600,
+    )
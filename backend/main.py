@@ -1,20 +1,191 @@
+import asyncio
+import json
 import os
-import tempfile
+import time
 import traceback
-from fastapi import FastAPI, UploadFile, File, HTTPException
-from fastapi.responses import FileResponse, HTMLResponse
-from fastapi.staticfiles import StaticFiles
+import zipfile
+from contextlib import asynccontextmanager
+from typing import TYPE_CHECKING, List, Optional
+
+# Everything below is timed: the import cost of this module is part of cold start
+_IMPORT_STARTED = time.perf_counter()
+
+from fastapi import FastAPI, UploadFile, File, HTTPException, Query, Request
+from fastapi.responses import HTMLResponse, JSONResponse, Response, StreamingResponse
 from starlette.background import BackgroundTask
+from fastapi.staticfiles import StaticFiles
+from starlette.requests import ClientDisconnect
+from starlette.routing import Match
+
+from app import ingest
+from app.instrument import traced
+from app.batch import OutputNames, output_paths, request_source, warm_steps
+from backend.cache import cache_from_env, code_fingerprint
+from backend.jobs import JobsFull, job_summary, runner_from_env
+from backend.metrics import PROMETHEUS_CONTENT_TYPE, QuoteMetrics
+from backend.pool import EXCEL_EXTS, LOGO_FOLDER, PoolFull, pool_from_env, render_bytes
+from backend.uploads import MB, BodyLimit, BudgetFull, UploadBatch, budget_from_env
+from backend.warmup import Warmup
+from backend.zipstream import StreamingZip
+
+if TYPE_CHECKING:
+    from app.processor import Renderer
+
+# Request body caps, enforced while the upload streams in (413 past them)
+UPLOAD_MAX_BYTES = int(float(os.environ.get("UPLOAD_MAX_MB", "50")) * MB)
+BATCH_MAX_UPLOAD_BYTES = int(float(os.environ.get("BATCH_MAX_UPLOAD_MB", "256")) * MB)
+
+# /generate/batch and /jobs limits, checked against upload sizes and zip
+# directories before any workbook is read into memory
+BATCH_MAX_FILES = int(os.environ.get("BATCH_MAX_FILES", "200"))
+BATCH_MAX_MEMBER_BYTES = int(os.environ.get("BATCH_MAX_MEMBER_BYTES", str(50 * 1024 * 1024)))
+BATCH_MAX_UNPACKED_BYTES = int(float(os.environ.get("BATCH_MAX_UNPACKED_MB", "512")) * MB)
+BATCH_MAX_ZIP_ENTRIES = int(os.environ.get("BATCH_MAX_ZIP_ENTRIES", "1000"))
+BATCH_CONCURRENCY = int(os.environ.get("BATCH_CONCURRENCY", str(os.cpu_count() or 2)))
+
+# POST /price limit (families per request)
+PRICE_MAX_FAMILIES = int(os.environ.get("PRICE_MAX_FAMILIES", "100000"))
+
+# Rendering is CPU-bound; it runs in a bounded pool, never on the event loop.
+# RENDER_POOL_KIND=process|thread, RENDER_WORKERS, RENDER_QUEUE_DEPTH
+POOL = pool_from_env()
+
+# Identical uploads are served from here (RESULT_CACHE_ITEMS, RESULT_CACHE_MB,
+# RESULT_CACHE_DIR, RESULT_CACHE_DISK_MB)
+RESULT_CACHE = cache_from_env()
+CODE_VERSION = code_fingerprint()
+
+# Prometheus metrics at /metrics. Per-stage generate_docx timings are recorded
+# unless STAGE_METRICS=0 (the pipeline then runs with tracing fully off).
+METRICS = QuoteMetrics()
+METRICS.track_pool(POOL)
+METRICS.track_cache(RESULT_CACHE)
+
+# Upload bytes all routes together may hold in memory at once; past it
+# requests queue for UPLOAD_QUEUE_SECONDS, then get 503 (UPLOAD_MEMORY_MB)
+UPLOAD_BUDGET = budget_from_env()
+METRICS.track_uploads(UPLOAD_BUDGET)
+STAGE_METRICS = os.environ.get("STAGE_METRICS", "1") != "0"
+
+# openpyxl, python-docx, the catalogue, template, logos and pool workers
+# are loaded in the background once the server is up (see /readyz)
+WARMUP = Warmup(warm_steps(LOGO_FOLDER) + [("pool", POOL.warm)])
+
+
+IMPORT_SECONDS = time.perf_counter() - _IMPORT_STARTED
+METRICS.track_warmup(WARMUP, IMPORT_SECONDS)
+
+
+async def _render_job(name: str, content: bytes, fmt: str) -> bytes:
+    try:
+        # Job files queue for a pool slot; admission control happens at POST /jobs
+        return await _render(render_bytes, name, content, fmt, wait=True)
+    except Exception as e:
+        METRICS.errors.inc(route="/jobs", type=_failure_type(e))
+        raise
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    WARMUP.start()
+    JOBS.start()
+    yield
+    await JOBS.stop()
+    POOL.shutdown()
+
+
+def _busy() -> HTTPException:
+    return HTTPException(
+        status_code=503,
+        detail="Server is busy generating other quotes. Please try again in a moment.",
+        headers={"Retry-After": "2"},
+    )
+
+
+async def _pipeline():
+    """app.processor, once the warm-up has imported it (never imported on the event loop)."""
+    await WARMUP.wait()
+    import app.processor
+    return app.processor
+
+
+async def _renderer(fmt: str) -> "Renderer":
+    processor = await _pipeline()
+    try:
+        return processor.renderer_for(fmt)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+
+def _failure_type(exc: BaseException) -> str:
+    if isinstance(exc, PoolFull):
+        return "busy"
+    if isinstance(exc, HTTPException):
+        return "busy" if exc.status_code == 503 else "invalid_upload"
+    if isinstance(exc, ValueError):
+        return "invalid_workbook"
+    return "internal"
+
+
+async def _render(fn, *args, **kwargs):
+    """POOL.run(fn, ...), folding the quote's stage timings into METRICS when enabled."""
+    if not STAGE_METRICS:
+        return await POOL.run(fn, *args, **kwargs)
+    wait = kwargs.pop("wait", False)
+    result, snapshot = await POOL.run(traced, fn, *args, wait=wait, **kwargs)
+    METRICS.record_trace(snapshot)
+    return result
+
+
+# Background jobs (POST /jobs): JOB_STORE=memory|sqlite, JOB_DB, JOB_CONCURRENCY,
+# JOB_MAX_PENDING (files), JOB_MAX_PENDING_MB, JOB_TTL_HOURS
+JOBS = runner_from_env(_render_job, default_concurrency=POOL.workers)
+METRICS.track_jobs(JOBS)
 
-from app.processor import generate_docx
 
 # Create the app (debug=True helps show clear errors while you set up)
-app = FastAPI(title="Health Quote Generator", debug=True)
+app = FastAPI(title="Health Quote Generator", debug=True, lifespan=lifespan)
+
+app.add_middleware(
+    BodyLimit,
+    limits={"/generate": UPLOAD_MAX_BYTES, "/generate/batch": BATCH_MAX_UPLOAD_BYTES, "/jobs": BATCH_MAX_UPLOAD_BYTES,
+            "/quotes": BATCH_MAX_UPLOAD_BYTES},
+    on_reject=lambda path: METRICS.errors.inc(route=path, type="invalid_upload"),
+)
 
 # Serve the frontend (index.html) from ../frontend
 FRONTEND_DIR = os.path.abspath(os.path.join(os.path.dirname(__file__), "..", "frontend"))
 app.mount("/static", StaticFiles(directory=FRONTEND_DIR), name="static")
 
+def _route_label(scope) -> str:
+    """The matched route's path template (/jobs/{job_id}, ...); unknown paths share one label."""
+    partial = None
+    for r in app.routes:
+        match = r.matches(scope)[0]
+        if match == Match.FULL:
+            return getattr(r, "path", "other")
+        if match == Match.PARTIAL and partial is None:
+            partial = getattr(r, "path", None)  # right path, other method
+    return partial or "other"
+
+
+@app.middleware("http")
+async def track_requests(request: Request, call_next):
+    """Latency / in-flight / status metrics per route."""
+    route = _route_label(request.scope)
+    METRICS.in_flight.inc(route=route)
+    t0 = time.perf_counter()
+    status = 500
+    try:
+        response = await call_next(request)
+        status = response.status_code
+        return response
+    finally:
+        # Streaming responses are timed to their first byte
+        METRICS.latency.observe(time.perf_counter() - t0, route=route)
+        METRICS.requests.inc(route=route, status=str(status))
+        METRICS.in_flight.dec(route=route)
+
 
 @app.get("/", response_class=HTMLResponse)
 async def home():
@@ -32,56 +203,591 @@ async def home():
 
 
 @app.post("/generate")
-async def generate(file: UploadFile = File(...)):
+async def generate(file: UploadFile = File(...), fmt: str = Query("docx", alias="format")):
     """
-    Accept an Excel upload (.xlsx/.xlsm/.xls), generate the DOCX, and return it.
+    Accept an Excel upload (.xlsx/.xlsm/.xls), generate the quote, and return it.
+    - ?format=docx (default), pdf, or html (in-browser preview, shown inline).
     - Reads the Excel from memory (bytes) to avoid Windows file locks.
-    - Uses a NamedTemporaryFile for the DOCX and deletes it after response is sent.
+    - Builds the document in memory and returns it directly (no temp files).
     """
     try:
+        processor = await _pipeline()
+        renderer = await _renderer(fmt)
         filename = (file.filename or "").strip().lower()
-        if not filename.endswith((".xlsx", ".xlsm", ".xls")):
+        if not filename.endswith(EXCEL_EXTS):
             raise HTTPException(
                 status_code=400,
                 detail="Please upload a valid Excel file (.xlsx/.xlsm/.xls)",
             )
 
-        content = await file.read()
-        if not content or len(content) < 100:
+        # The multipart parser has spooled the upload (to disk past 1 MB) within
+        # UPLOAD_MAX_MB; look at its signature and sheet index before reading it in
+        if not file.size or file.size < 100:
             raise HTTPException(
                 status_code=400,
                 detail="The uploaded file seems empty or not a real Excel. Please re-save as .xlsx and try again.",
             )
+        try:
+            ingest.sniff(file.file, filename)
+        except ValueError as e:
+            raise HTTPException(status_code=400, detail=str(e))
 
-        # Create a temporary DOCX path that persists until we delete it
-        tmp_doc = tempfile.NamedTemporaryFile(delete=False, suffix=".docx")
-        tmp_doc_path = tmp_doc.name
-        tmp_doc.close()
-
-        # Generate the DOCX directly to the temp file; read Excel from memory (bytes)
-        out_file = generate_docx(
-            excel_input=content,
-            output_path=tmp_doc_path,
-            logo_folder=os.path.join(os.getcwd(), "logos"),
-            filename_hint=filename,
-        )
+        try:
+            async with UPLOAD_BUDGET.hold(file.size):
+                content = await file.read()
+                return await _generate(
+                    processor, renderer, content, os.path.splitext(filename)[1],
+                    processor.generate_bytes, excel_input=content, fmt=fmt, logo_folder=LOGO_FOLDER,
+                    filename_hint=filename,
+                )
+        except BudgetFull:
+            raise _busy()
+
+    except HTTPException as e:
+        METRICS.errors.inc(route="/generate", type=_failure_type(e))
+        raise
+    except Exception as e:
+        METRICS.errors.inc(route="/generate", type=_failure_type(e))
+        traceback.print_exc()
+        raise HTTPException(status_code=500, detail=str(e))
+
+
+async def _generate(processor, renderer: "Renderer", content: bytes, source_ext: str, fn, **kwargs) -> Response:
+    """
+    One document for an upload already in memory (a workbook, or a JSON
+    request for /quotes): served from the result cache, or rendered with
+    fn(**kwargs) in the pool.
+    """
+    # Same input + same catalogue/logos/code + same day => same document
+    cache_key = RESULT_CACHE.key(
+        content,
+        source_ext,
+        renderer.extension,
+        processor.catalogue_fingerprint(LOGO_FOLDER),
+        CODE_VERSION,
+        processor.prepared_date(),
+    )
+    data = RESULT_CACHE.get(cache_key)
+    cache_status = "HIT" if data is not None else "MISS"
+
+    if data is None:
+        # Generate the document into memory; read the input from memory (bytes)
+        try:
+            data = await _render(fn, **kwargs)
+        except PoolFull:
+            raise _busy()
+
+        if not data:
+            raise RuntimeError(f"Failed to create {renderer.extension[1:].upper()} file.")
+        RESULT_CACHE.put(cache_key, data)
+
+    # Response sets Content-Length from the buffer; the HTML preview is shown inline
+    disposition = "inline" if renderer.extension == ".html" else "attachment"
+    return Response(
+        content=data,
+        media_type=renderer.media_type,
+        headers={
+            "Content-Disposition": f'{disposition}; filename="Health_Quote{renderer.extension}"',
+            "X-Cache": cache_status,
+        },
+    )
 
-        # Ensure file exists
-        if not os.path.exists(out_file):
-            raise RuntimeError("Failed to create DOCX file.")
 
-        # Delete the file AFTER it's fully sent
-        cleanup = BackgroundTask(lambda p: os.path.exists(p) and os.remove(p), out_file)
+@app.get("/healthz")
+async def healthz():
+    """Liveness: the server is up and answering (the pipeline may still be warming up)."""
+    return {"status": "ok"}
 
-        return FileResponse(
-            out_file,
-            media_type="application/vnd.openxmlformats-officedocument.wordprocessingml.document",
-            filename="Health_Quote.docx",
-            background=cleanup,
+
+@app.get("/readyz")
+async def readyz():
+    """Readiness: 200 once the background warm-up has loaded the quote pipeline, 503 before."""
+    body = WARMUP.status()
+    body["import_ms"] = round(IMPORT_SECONDS * 1000, 1)
+    return JSONResponse(body, status_code=200 if WARMUP.ready else 503)
+
+
+@app.get("/cache/stats")
+async def cache_stats():
+    """Hit/miss/eviction counters of the /generate result cache."""
+    return RESULT_CACHE.stats()
+
+
+@app.get("/metrics")
+async def metrics():
+    """Prometheus text exposition of request, render pool, cache and stage metrics."""
+    return Response(content=METRICS.expose(), media_type=PROMETHEUS_CONTENT_TYPE)
+
+
+def _expand_zip(batch: UploadBatch, spool, filename: str):
+    """Add the workbooks inside an uploaded .zip to `batch` (folders flattened, junk entries skipped); nothing is inflated."""
+    try:
+        zf = batch.open_zip(spool)
+    except zipfile.BadZipFile:
+        raise HTTPException(status_code=400, detail="The uploaded .zip could not be opened.")
+    infos = zf.infolist()
+    if len(infos) > BATCH_MAX_ZIP_ENTRIES:
+        raise HTTPException(
+            status_code=413,
+            detail=f"{filename} has too many entries ({len(infos)}); the limit is {BATCH_MAX_ZIP_ENTRIES}.",
         )
+    for info in infos:
+        name = os.path.basename(info.filename)
+        if info.is_dir() or not name or name.startswith(("~$", ".")) or "__MACOSX" in info.filename:
+            continue
+        if not name.lower().endswith(EXCEL_EXTS):
+            continue
+        if info.file_size > BATCH_MAX_MEMBER_BYTES:
+            raise HTTPException(status_code=413, detail=f"{info.filename} is too large.")
+        batch.add_member(zf, info)
+
+
+async def _stream_batch(batch: UploadBatch, fmt: str = "docx", extension: str = ".docx"):
+    """
+    Render workbooks concurrently in the render pool and yield ZIP bytes as
+    each document finishes. Per-file errors go into manifest.json. A
+    workbook is read from its spooled upload only once it has a render slot.
+    """
+    arcnames = [os.path.basename(p) for p in output_paths(batch.names, "", extension)]
+    sem = asyncio.Semaphore(BATCH_CONCURRENCY)
+
+    async def render(i: int):
+        async with sem:
+            t0 = time.perf_counter()
+            try:
+                content = await asyncio.to_thread(batch.read, i)
+                # Batch items wait for a pool slot instead of being shed one by one
+                data = await _render(render_bytes, batch.names[i], content, fmt, wait=True)
+                return i, data, None, time.perf_counter() - t0
+            except Exception as e:
+                METRICS.errors.inc(route="/generate/batch", type=_failure_type(e))
+                return i, None, str(e), time.perf_counter() - t0
+
+    archive = StreamingZip()
+    tasks = [asyncio.ensure_future(render(i)) for i in range(len(batch))]
+    try:
+        for fut in asyncio.as_completed(tasks):
+            i, data, error, seconds = await fut
+            if data is not None:
+                archive.add(arcnames[i], data)
+            archive.record(
+                source=batch.names[i],
+                output=arcnames[i] if data is not None else None,
+                status="ok" if data is not None else "error",
+                error=error,
+                ms=round(seconds * 1000),
+            )
+            chunk = archive.drain()
+            if chunk:
+                yield chunk
+        yield archive.close()
+    finally:
+        # Client went away mid-stream: don't keep rendering for nobody
+        for t in tasks:
+            t.cancel()
+        await _release_batch(batch)
+
 
-    except HTTPException:
+async def _collect_uploads(files: List[UploadFile], at_once: Optional[int] = None) -> UploadBatch:
+    """
+    The uploaded workbooks, .zip uploads expanded, still spooled: the file
+    count, member sizes and total unpacked size are checked from upload
+    sizes and zip directories before anything is read into memory. The
+    batch then holds as much of UPLOAD_BUDGET as the caller will have in
+    memory, reading `at_once` workbooks at a time (None: all of them), until
+    _release_batch(); a budget that stays full answers 503.
+    """
+    batch = UploadBatch()
+    try:
+        for f in files:
+            name = (f.filename or "").strip()
+            spool = batch.take(f)
+            if name.lower().endswith(".zip"):
+                await asyncio.to_thread(_expand_zip, batch, spool, name)
+            else:
+                batch.add(name, f.size or 0, spool)
+            if len(batch) > BATCH_MAX_FILES:
+                raise HTTPException(
+                    status_code=413,
+                    detail=f"Too many workbooks; the limit is {BATCH_MAX_FILES} per request.",
+                )
+            if batch.size > BATCH_MAX_UNPACKED_BYTES:
+                raise HTTPException(
+                    status_code=413,
+                    detail=f"The workbooks come to over {BATCH_MAX_UNPACKED_BYTES / MB:g} MB unpacked; "
+                           f"that is the limit per request.",
+                )
+        if not len(batch):
+            raise HTTPException(status_code=400, detail="No Excel workbooks found in the upload.")
+        try:
+            batch.held = await UPLOAD_BUDGET.acquire(batch.peak(at_once))
+        except BudgetFull:
+            raise _busy()
+    except BaseException:
+        batch.close()
         raise
-    except Exception as e:
-        traceback.print_exc()
-        raise HTTPException(status_code=500, detail=str(e))
+    return batch
+
+
+async def _release_batch(batch: UploadBatch):
+    """Close the batch's spooled uploads and give back its share of UPLOAD_BUDGET (once)."""
+    batch.close()
+    held, batch.held = batch.held, 0
+    if held:
+        await UPLOAD_BUDGET.release(held)
+
+
+@app.post("/generate/batch")
+async def generate_batch(files: List[UploadFile] = File(...), fmt: str = Query("docx", alias="format")):
+    """
+    Accept several Excel uploads (or one .zip of workbooks) and stream back a
+    ZIP with one document per workbook (?format=docx|pdf|html) plus
+    manifest.json describing each result.
+    """
+    renderer = await _renderer(fmt)
+    batch = await _collect_uploads(files, at_once=BATCH_CONCURRENCY)
+    if POOL.in_flight >= POOL.capacity:
+        await _release_batch(batch)
+        raise _busy()
+
+    return StreamingResponse(
+        _stream_batch(batch, fmt, renderer.extension),
+        media_type="application/zip",
+        headers={"Content-Disposition": 'attachment; filename="Health_Quotes.zip"'},
+        # Also releases the batch when the client leaves before the stream starts
+        background=BackgroundTask(_release_batch, batch),
+    )
+
+
+NDJSON_TYPES = ("application/x-ndjson", "application/ndjson", "application/jsonl")
+
+
+class _DuplexStreamingResponse(StreamingResponse):
+    """
+    StreamingResponse whose body iterator reads the request body itself.
+    Starlette's version listens for the client's disconnect on the same
+    receive channel, which would swallow request chunks; here the iterator
+    sees a disconnect as ClientDisconnect instead.
+    """
+
+    async def __call__(self, scope, receive, send):
+        await self.stream_response(send)
+
+
+async def _ndjson_lines(request: Request):
+    """(line number, bytes) of each non-blank line of the request body, as it arrives."""
+    buf = bytearray()
+    n = 0
+    async for chunk in request.stream():
+        buf += chunk
+        while True:
+            end = buf.find(b"\n")
+            if end < 0:
+                break
+            n += 1
+            line = bytes(buf[:end])
+            del buf[:end + 1]
+            if line.strip():
+                yield n, line
+    if buf.strip():
+        yield n + 1, bytes(buf)
+
+
+async def _stream_quotes(request: Request, processor, fmt: str, extension: str):
+    """
+    Render NDJSON quote requests as their lines arrive and yield ZIP bytes as
+    each document finishes; per-line errors go into manifest.json. At most
+    BATCH_CONCURRENCY lines are rendering at once, which also paces reading.
+    Each line holds its size of UPLOAD_BUDGET until rendered; a line that
+    cannot get it in time is recorded as busy (the 200 is already sent).
+    """
+    names = OutputNames("", extension)
+    sem = asyncio.Semaphore(BATCH_CONCURRENCY)
+    finished: asyncio.Queue = asyncio.Queue()
+    archive = StreamingZip()
+    tasks = []
+    emitted = 0  # render results taken off `finished`
+    held = {}  # line -> UPLOAD_BUDGET bytes, until its render is over
+
+    async def release(n: int):
+        size = held.pop(n, 0)
+        if size:
+            await UPLOAD_BUDGET.release(size)
+
+    async def render(n: int, source: str, arcname: str, data: dict):
+        t0 = time.perf_counter()
+        try:
+            out = await _render(processor.generate_request_bytes, data=data, fmt=fmt,
+                                logo_folder=LOGO_FOLDER, wait=True)
+            error = None
+        except Exception as e:
+            METRICS.errors.inc(route="/quotes", type="invalid_upload" if isinstance(e, ValueError) else _failure_type(e))
+            out, error = None, str(e)
+        finally:
+            sem.release()
+            await release(n)
+        finished.put_nowait((n, source, arcname, out, error, time.perf_counter() - t0))
+
+    def emit(n: int, source: str, arcname: str, out, error, seconds: float) -> bytes:
+        if out is not None:
+            archive.add(arcname, out)
+        archive.record(
+            line=n,
+            source=source,
+            output=arcname if out is not None else None,
+            status="ok" if out is not None else "error",
+            error=error,
+            ms=round(seconds * 1000),
+        )
+        return archive.drain()
+
+    try:
+        try:
+            async for n, line in _ndjson_lines(request):
+                try:
+                    data = json.loads(line)
+                    source = request_source(n, data)
+                except ValueError as e:
+                    METRICS.errors.inc(route="/quotes", type="invalid_upload")
+                    emit(n, f"line_{n}", "", None, f"Invalid JSON: {e}", 0.0)
+                    continue
+                try:
+                    held[n] = await UPLOAD_BUDGET.acquire(len(line))
+                except BudgetFull:
+                    METRICS.errors.inc(route="/quotes", type="busy")
+                    emit(n, source, "", None, _busy().detail, 0.0)
+                    continue
+                await sem.acquire()
+                arcname = os.path.basename(names.next(source))
+                tasks.append(asyncio.ensure_future(render(n, source, arcname, data)))
+                while not finished.empty():
+                    emitted += 1
+                    chunk = emit(*finished.get_nowait())
+                    if chunk:
+                        yield chunk
+        except ClientDisconnect:
+            limit = request.scope.get("state", {}).get("body_limit")
+            if limit is None:
+                return  # the client went away
+            archive.record(line=None, source=None, output=None, status="error", ms=0,
+                           error=f"Upload cut off at the {limit / MB:g} MB limit; later lines were not read.")
+        for _ in range(len(tasks) - emitted):
+            chunk = emit(*(await finished.get()))
+            if chunk:
+                yield chunk
+        yield archive.close()
+    finally:
+        # Client went away mid-stream: don't keep rendering for nobody
+        for t in tasks:
+            t.cancel()
+        # A task cancelled before it started never reaches its own release()
+        for n in list(held):
+            await release(n)
+
+
+@app.post("/quotes")
+async def quotes(request: Request, fmt: str = Query("docx", alias="format")):
+    """
+    Quotes from structured data instead of workbooks (schema: app/schema.py).
+    - Content-Type application/json: one quote request; the document comes
+      back like /generate (?format=docx|pdf|html).
+    - Content-Type application/x-ndjson: one request per line; each line is
+      rendered as soon as it arrives and the documents stream back in a ZIP
+      with manifest.json (named after each request's "id", else its line).
+    """
+    renderer = await _renderer(fmt)
+    processor = await _pipeline()
+    content_type = request.headers.get("content-type", "").split(";")[0].strip().lower()
+    if content_type in NDJSON_TYPES:
+        if POOL.in_flight >= POOL.capacity:
+            raise _busy()
+        return _DuplexStreamingResponse(
+            _stream_quotes(request, processor, fmt, renderer.extension),
+            media_type="application/zip",
+            headers={"Content-Disposition": 'attachment; filename="Health_Quotes.zip"'},
+        )
+    if content_type != "application/json":
+        raise HTTPException(status_code=415, detail="Send application/json (one quote) or application/x-ndjson.")
+
+    length = request.headers.get("content-length", "")
+    try:
+        async with UPLOAD_BUDGET.hold(int(length) if length.isdigit() else BATCH_MAX_UPLOAD_BYTES):
+            body = await request.body()
+            return await _generate(processor, renderer, body, ".json", processor.generate_request_bytes,
+                                   data=body, fmt=fmt, logo_folder=LOGO_FOLDER)
+    except BudgetFull:
+        METRICS.errors.inc(route="/quotes", type="busy")
+        raise _busy()
+    except ValueError as e:
+        METRICS.errors.inc(route="/quotes", type="invalid_upload")
+        raise HTTPException(status_code=400, detail=str(e))
+
+
+def _job_links(job: dict) -> dict:
+    base = f"/jobs/{job['id']}"
+    for f in job["files"]:
+        f["url"] = f"{base}/files/{f['index']}" if f["status"] == "ok" else None
+    job["url"] = base
+    job["download"] = f"{base}/download"
+    return job
+
+
+@app.post("/jobs", status_code=202)
+async def create_job(files: List[UploadFile] = File(...), fmt: str = Query("docx", alias="format")):
+    """
+    Queue one or more workbooks (or .zip files of workbooks) for rendering
+    and return the job id at once; poll GET /jobs/{id} for progress. A full
+    queue answers 503 with Retry-After.
+    """
+    renderer = await _renderer(fmt)
+    try:
+        # Shed a full queue before anything is read: first on the declared
+        # upload sizes (at least one workbook each), then on the unpacked sizes
+        await JOBS.admit(len(files), sum(f.size or 0 for f in files))
+        batch = await _collect_uploads(files)
+    except JobsFull as e:
+        raise _jobs_full(e)
+    outputs = [os.path.basename(p) for p in output_paths(batch.names, "", renderer.extension)]
+    try:
+        await JOBS.admit(len(batch), batch.size)
+        contents = await asyncio.to_thread(lambda: [batch.read(i) for i in range(len(batch))])
+        job_id = await JOBS.submit(fmt, renderer.extension, list(zip(batch.names, outputs, contents)))
+    except zipfile.BadZipFile as e:
+        raise HTTPException(status_code=400, detail=f"The uploaded .zip could not be read: {e}")
+    except JobsFull as e:
+        raise _jobs_full(e)
+    finally:
+        await _release_batch(batch)
+    return _job_links(job_summary(await asyncio.to_thread(JOBS.store.get, job_id)))
+
+
+def _jobs_full(e: JobsFull) -> HTTPException:
+    METRICS.errors.inc(route="/jobs", type="busy")
+    return HTTPException(
+        status_code=503,
+        detail="The job queue is full. Please try again later.",
+        headers={"Retry-After": str(e.retry_after)},
+    )
+
+
+async def _job_or_404(job_id: str) -> dict:
+    job = await asyncio.to_thread(JOBS.store.get, job_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail="No such job (finished jobs expire after JOB_TTL_HOURS).")
+    return job_summary(job)
+
+
+@app.get("/jobs/{job_id}")
+async def job_status(job_id: str):
+    """Overall status, progress counts and per-file status/error/timing of a job."""
+    return _job_links(await _job_or_404(job_id))
+
+
+@app.get("/jobs/{job_id}/files/{index}")
+async def job_file(job_id: str, index: int):
+    """One finished document of a job."""
+    job = await _job_or_404(job_id)
+    if not 0 <= index < len(job["files"]):
+        raise HTTPException(status_code=404, detail="No such file in this job.")
+    f = job["files"][index]
+    if f["status"] in ("queued", "running"):
+        raise HTTPException(status_code=409, detail="This file is still being rendered.")
+    data = await asyncio.to_thread(JOBS.store.output, job_id, index)
+    if f["status"] != "ok" or data is None:
+        raise HTTPException(status_code=404, detail=f"No document for {f['source']}: {f['error']}")
+    renderer = await _renderer(job["format"])
+    return Response(
+        content=data,
+        media_type=renderer.media_type,
+        headers={"Content-Disposition": f'attachment; filename="{f["output"]}"'},
+    )
+
+
+@app.get("/jobs/{job_id}/download")
+async def job_download(job_id: str):
+    """A ZIP of every finished document of a job plus manifest.json (once the job is done)."""
+    job = await _job_or_404(job_id)
+    if job["status"] != "done":
+        raise HTTPException(
+            status_code=409,
+            detail=f"Job is {job['status']} ({job['progress']['done']}/{job['progress']['total']} files done).",
+        )
+
+    def chunks():
+        archive = StreamingZip()
+        for f in job["files"]:
+            data = JOBS.store.output(job_id, f["index"]) if f["status"] == "ok" else None
+            if data is not None:
+                archive.add(f["output"], data)
+            archive.record(
+                source=f["source"],
+                output=f["output"] if data is not None else None,
+                status=f["status"],
+                error=f["error"],
+                ms=f["ms"],
+            )
+            chunk = archive.drain()
+            if chunk:
+                yield chunk
+        yield archive.close()
+
+    return StreamingResponse(
+        chunks(),
+        media_type="application/zip",
+        headers={"Content-Disposition": 'attachment; filename="Health_Quotes.zip"'},
+    )
+
+
+def _json_premiums(premiums) -> list:
+    """[family][plan][tenure] whole rupees as nested lists, null where the plan does not cover the family."""
+    import numpy as np
+    out = np.full(premiums.shape, None, dtype=object)
+    priced = ~np.isnan(premiums)
+    out[priced] = premiums[priced].astype(np.int64).tolist()
+    return out.tolist()
+
+
+def _price(families: list, plans) -> Optional[dict]:
+    """POST /price body; None when no rate tables are configured."""
+    from app.pricing import RATES, TENURES
+    book = RATES.current()
+    if book is None:
+        return None
+    premiums = book.price_families(families, plans)
+    names = list(plans) if plans is not None else list(book.plans)
+    return {
+        "plans": names,
+        "tenures": list(TENURES),
+        "premiums": _json_premiums(premiums),
+        "versions": {p: book.versions()[p] for p in names},
+    }
+
+
+@app.post("/price")
+async def price(request: Request):
+    """
+    Bulk premiums from the configured rate tables, without building a quote.
+    Body: {"families": [[{"age", "city", "sum_assured"}, ...], ...], "plans": [...] (optional)}
+    """
+    try:
+        body = await request.json()
+    except ValueError:
+        raise HTTPException(status_code=400, detail="Body must be JSON.")
+    families = body.get("families") if isinstance(body, dict) else None
+    plans = body.get("plans") if isinstance(body, dict) else None
+    if not isinstance(families, list) or not all(isinstance(f, list) for f in families):
+        raise HTTPException(status_code=400, detail="'families' must be a list of member lists.")
+    if plans is not None and not (isinstance(plans, list) and all(isinstance(p, str) for p in plans)):
+        raise HTTPException(status_code=400, detail="'plans' must be a list of plan names.")
+    if len(families) > PRICE_MAX_FAMILIES:
+        raise HTTPException(status_code=413, detail=f"At most {PRICE_MAX_FAMILIES} families per request.")
+    try:
+        # Vectorised, but large batches still take a while: keep it off the event loop
+        result = await asyncio.to_thread(_price, families, plans)
+    except (TypeError, ValueError) as e:
+        METRICS.errors.inc(route="/price", type="invalid_upload")
+        raise HTTPException(status_code=400, detail=str(e))
+    if result is None:
+        raise HTTPException(status_code=404, detail="No rate tables are configured (QUOTE_RATES).")
+    # Already plain JSON types: skip FastAPI's per-value encoder
+    return JSONResponse(result)
@@ -0,0 +1,233 @@
+import bisect
+import threading
+from typing import Callable, Dict, Iterable, List, Optional, Sequence, Tuple
+
+PROMETHEUS_CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+# Request latencies span cache hits (ms) to large quotes (seconds)
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0)
+STAGE_BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0)
+SIZE_BUCKETS = (16e3, 32e3, 64e3, 128e3, 256e3, 512e3, 1e6, 2e6, 4e6, 8e6)
+
+Labels = Tuple[str, ...]
+
+
+def _escape(value: str) -> str:
+    return str(value).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _fmt_labels(names: Sequence[str], values: Labels, extra: str = "") -> str:
+    parts = [f'{n}="{_escape(v)}"' for n, v in zip(names, values)]
+    if extra:
+        parts.append(extra)
+    return "{" + ",".join(parts) + "}" if parts else ""
+
+
+def _fmt_value(v: float) -> str:
+    if v == float("inf"):
+        return "+Inf"
+    return repr(float(v)) if isinstance(v, float) and not v.is_integer() else str(int(v))
+
+
+class _Metric:
+    kind = ""
+
+    def __init__(self, name: str, doc: str, labels: Sequence[str] = ()):
+        self.name = name
+        self.doc = doc
+        self.labels = tuple(labels)
+        self._lock = threading.Lock()
+
+    def _key(self, labels: Dict[str, str]) -> Labels:
+        return tuple(str(labels.get(n, "")) for n in self.labels)
+
+    def header(self) -> List[str]:
+        return [f"# HELP {self.name} {self.doc}", f"# TYPE {self.name} {self.kind}"]
+
+
+class Counter(_Metric):
+    kind = "counter"
+
+    def __init__(self, name: str, doc: str, labels: Sequence[str] = ()):
+        super().__init__(name, doc, labels)
+        self._values: Dict[Labels, float] = {}
+
+    def inc(self, amount: float = 1, **labels):
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0) + amount
+
+    def value(self, **labels) -> float:
+        return self._values.get(self._key(labels), 0)
+
+    def expose(self) -> List[str]:
+        with self._lock:
+            items = sorted(self._values.items())
+        return self.header() + [f"{self.name}{_fmt_labels(self.labels, k)} {_fmt_value(v)}" for k, v in items]
+
+
+class Gauge(_Metric):
+    """Settable gauge; with `collect` the value is read at scrape time instead."""
+    kind = "gauge"
+
+    def __init__(self, name: str, doc: str, labels: Sequence[str] = (),
+                 collect: Optional[Callable[[], Iterable[Tuple[Dict[str, str], float]]]] = None):
+        super().__init__(name, doc, labels)
+        self._values: Dict[Labels, float] = {}
+        self._collect = collect
+
+    def inc(self, amount: float = 1, **labels):
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0) + amount
+
+    def dec(self, amount: float = 1, **labels):
+        self.inc(-amount, **labels)
+
+    def set(self, value: float, **labels):
+        with self._lock:
+            self._values[self._key(labels)] = value
+
+    def value(self, **labels) -> float:
+        return self._values.get(self._key(labels), 0)
+
+    def expose(self) -> List[str]:
+        if self._collect is not None:
+            items = sorted((self._key(lbl), v) for lbl, v in self._collect())
+        else:
+            with self._lock:
+                items = sorted(self._values.items())
+        return self.header() + [f"{self.name}{_fmt_labels(self.labels, k)} {_fmt_value(v)}" for k, v in items]
+
+
+class Histogram(_Metric):
+    kind = "histogram"
+
+    def __init__(self, name: str, doc: str, labels: Sequence[str] = (), buckets: Sequence[float] = LATENCY_BUCKETS):
+        super().__init__(name, doc, labels)
+        self.buckets = tuple(sorted(buckets))
+        # per label set: [count per bucket..., +Inf count], sum
+        self._values: Dict[Labels, Tuple[List[int], List[float]]] = {}
+
+    def observe(self, value: float, **labels):
+        key = self._key(labels)
+        i = bisect.bisect_left(self.buckets, value)
+        with self._lock:
+            counts, total = self._values.setdefault(key, ([0] * (len(self.buckets) + 1), [0.0]))
+            counts[i] += 1
+            total[0] += value
+
+    def count(self, **labels) -> int:
+        entry = self._values.get(self._key(labels))
+        return sum(entry[0]) if entry else 0
+
+    def expose(self) -> List[str]:
+        lines = self.header()
+        with self._lock:
+            items = sorted((k, (list(c), s[0])) for k, (c, s) in self._values.items())
+        for key, (counts, total) in items:
+            running = 0
+            for bound, n in zip(self.buckets + (float("inf"),), counts):
+                running += n
+                le = 'le="' + _fmt_value(bound) + '"'
+                lines.append(f"{self.name}_bucket{_fmt_labels(self.labels, key, le)} {running}")
+            lines.append(f"{self.name}_sum{_fmt_labels(self.labels, key)} {_fmt_value(total)}")
+            lines.append(f"{self.name}_count{_fmt_labels(self.labels, key)} {running}")
+        return lines
+
+
+class Registry:
+    """A minimal Prometheus text-format registry (no client library needed)."""
+
+    def __init__(self):
+        self._metrics: List[_Metric] = []
+
+    def register(self, metric: _Metric) -> _Metric:
+        self._metrics.append(metric)
+        return metric
+
+    def counter(self, name: str, doc: str, labels: Sequence[str] = ()) -> Counter:
+        return self.register(Counter(name, doc, labels))
+
+    def gauge(self, name: str, doc: str, labels: Sequence[str] = (), collect=None) -> Gauge:
+        return self.register(Gauge(name, doc, labels, collect))
+
+    def histogram(self, name: str, doc: str, labels: Sequence[str] = (),
+                  buckets: Sequence[float] = LATENCY_BUCKETS) -> Histogram:
+        return self.register(Histogram(name, doc, labels, buckets))
+
+    def expose(self) -> str:
+        lines: List[str] = []
+        for m in self._metrics:
+            lines.extend(m.expose())
+        return "\n".join(lines) + "\n"
+
+
+class QuoteMetrics:
+    """The service's metrics: HTTP requests, render pool, cache and quote pipeline stages."""
+
+    def __init__(self, registry: Optional[Registry] = None):
+        r = self.registry = registry or Registry()
+        self.requests = r.counter(
+            "quote_http_requests_total", "HTTP requests by route and status code.", ("route", "status"))
+        self.latency = r.histogram(
+            "quote_http_request_duration_seconds", "HTTP request latency by route.", ("route",))
+        self.in_flight = r.gauge(
+            "quote_http_requests_in_flight", "HTTP requests currently being handled.", ("route",))
+        self.errors = r.counter(
+            "quote_errors_total", "Failed quote requests by route and failure type.", ("route", "type"))
+        self.stages = r.histogram(
+            "quote_stage_duration_seconds", "Time spent in each generate_docx stage.", ("stage",), STAGE_BUCKETS)
+        self.quote_counters = r.counter(
+            "quote_pipeline_items_total",
+            "Work done by generate_docx (rows, plans, images, template builds, output bytes).", ("item",))
+        self.output_size = r.histogram(
+            "quote_output_bytes", "Size of generated DOCX files.", (), SIZE_BUCKETS)
+
+    def track_pool(self, pool):
+        self.registry.gauge(
+            "quote_render_in_flight", "Renders running or queued in the render pool.",
+            collect=lambda: [({}, pool.in_flight)])
+        self.registry.gauge(
+            "quote_render_capacity", "Render pool workers plus queue depth.",
+            collect=lambda: [({}, pool.capacity)])
+
+    def track_cache(self, cache):
+        self.registry.gauge(
+            "quote_result_cache", "Result cache counters (hits, misses, evictions, items, bytes).", ("stat",),
+            collect=lambda: [({"stat": k}, v) for k, v in cache.stats().items()])
+
+    def track_warmup(self, warmup, import_seconds: float):
+        self.registry.gauge(
+            "quote_ready", "1 once the background warm-up has loaded the quote pipeline.",
+            collect=lambda: [({}, 1 if warmup.ready else 0)])
+        self.registry.gauge(
+            "quote_startup_seconds", "Cold-start cost: server module import and each warm-up step.", ("phase",),
+            collect=lambda: [({"phase": "import"}, import_seconds)]
+            + [({"phase": k}, v) for k, v in warmup.timings.items()])
+
+    def track_jobs(self, runner):
+        self.registry.gauge(
+            "quote_job_backlog", "Job files queued or running, and the bytes counted against the job limit.", ("unit",),
+            collect=lambda: list(zip(({"unit": "files"}, {"unit": "bytes"}), runner.store.backlog())))
+
+    def track_uploads(self, budget):
+        self.registry.gauge(
+            "quote_upload_memory_bytes", "Upload bytes held in memory by all routes, and the budget.", ("state",),
+            collect=lambda: [({"state": "held"}, budget.held), ({"state": "limit"}, budget.limit)])
+        self.registry.gauge(
+            "quote_upload_waiting", "Uploads queued for the memory budget.",
+            collect=lambda: [({}, budget.waiting)])
+
+    def record_trace(self, snapshot: Dict[str, Dict]):
+        """Fold an app.instrument trace snapshot into the stage/counter metrics."""
+        for stage, seconds in snapshot.get("spans", {}).items():
+            self.stages.observe(seconds, stage=stage)
+        counters = snapshot.get("counters", {})
+        for item, n in counters.items():
+            self.quote_counters.inc(n, item=item)
+        if "output_bytes" in counters:
+            self.output_size.observe(counters["output_bytes"])
+
+    def expose(self) -> str:
+        return self.registry.expose()
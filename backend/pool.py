@@ -0,0 +1,123 @@
+import asyncio
+import multiprocessing
+import os
+import threading
+from concurrent.futures import Executor, ProcessPoolExecutor, ThreadPoolExecutor
+from functools import partial
+from typing import Optional
+
+from app.batch import warm_worker
+
+LOGO_FOLDER = os.path.join(os.getcwd(), "logos")
+EXCEL_EXTS = (".xlsx", ".xlsm", ".xls")
+
+# Each worker process holds its own python-docx/openpyxl, plus pandas and numpy
+# once a workbook needs them (60-150 MB); a small fixed default keeps a small
+# instance clear of the OOM killer
+DEFAULT_WORKERS = 2
+
+
+class PoolFull(Exception):
+    """Raised when a render is refused because the pool and its queue are full."""
+
+
+class RenderPool:
+    """
+    Bounded executor for CPU-bound quote rendering.
+
+    At most `workers` renders run at once and at most `queue_depth` more may
+    wait; beyond that run() raises PoolFull immediately so the caller can
+    answer 503 instead of letting requests pile up. `kind` is "process"
+    (scales across cores) or "thread" (cheaper on memory).
+
+    Worker processes start from a forkserver (spawn where there is none),
+    never by forking the server: the pool is created from the warm-up
+    thread, and a fork taken while another thread holds a lock (logging,
+    SQLite, the catalogue and logo caches) can deadlock the child.
+    """
+
+    def __init__(self, kind: str = "process", workers: Optional[int] = None, queue_depth: int = 8):
+        if kind not in ("process", "thread"):
+            raise ValueError(f"Unknown render pool kind: {kind!r}")
+        self.kind = kind
+        self.workers = max(1, workers or min(DEFAULT_WORKERS, os.cpu_count() or 1))
+        self.queue_depth = max(0, queue_depth)
+        self.in_flight = 0
+        self._lock = threading.Lock()
+        self._executor: Optional[Executor] = None
+        self._cond: Optional[asyncio.Condition] = None
+
+    @property
+    def capacity(self) -> int:
+        return self.workers + self.queue_depth
+
+    def executor(self) -> Executor:
+        with self._lock:
+            if self._executor is None:
+                if self.kind == "process":
+                    method = "forkserver" if "forkserver" in multiprocessing.get_all_start_methods() else "spawn"
+                    self._executor = ProcessPoolExecutor(
+                        max_workers=self.workers, mp_context=multiprocessing.get_context(method),
+                        initializer=warm_worker, initargs=(LOGO_FOLDER,),
+                    )
+                else:
+                    self._executor = ThreadPoolExecutor(max_workers=self.workers, thread_name_prefix="render")
+            return self._executor
+
+    def warm(self):
+        """
+        Start the worker processes now (each runs warm_worker) rather than on
+        the first render. Thread pools share the parent's warm caches.
+        """
+        if self.kind != "process":
+            return
+        ex = self.executor()
+        for f in [ex.submit(os.getpid) for _ in range(self.workers)]:
+            f.result()
+
+    async def run(self, fn, *args, wait: bool = False, **kwargs):
+        """
+        Run fn(*args, **kwargs) in the pool. With wait=False a full pool raises
+        PoolFull at once; with wait=True the caller queues for a free slot.
+        """
+        if self._cond is None:
+            self._cond = asyncio.Condition()
+        if self.in_flight >= self.capacity:
+            if not wait:
+                raise PoolFull()
+            async with self._cond:
+                await self._cond.wait_for(lambda: self.in_flight < self.capacity)
+        self.in_flight += 1
+        try:
+            loop = asyncio.get_running_loop()
+            return await loop.run_in_executor(self.executor(), partial(fn, *args, **kwargs))
+        finally:
+            self.in_flight -= 1
+            async with self._cond:
+                self._cond.notify()
+
+    def shutdown(self):
+        if self._executor is not None:
+            # Waiting joins the worker processes; without it they outlive uvicorn
+            self._executor.shutdown(wait=True, cancel_futures=True)
+            self._executor = None
+
+
+def pool_from_env() -> RenderPool:
+    return RenderPool(
+        kind=os.environ.get("RENDER_POOL_KIND", "process"),
+        workers=int(os.environ.get("RENDER_WORKERS", "0")) or None,
+        queue_depth=int(os.environ.get("RENDER_QUEUE_DEPTH", "8")),
+    )
+
+
+def render_bytes(filename: str, content: bytes, fmt: str = "docx") -> bytes:
+    """Render one uploaded workbook in `fmt` and return the bytes (pool job)."""
+    from app import ingest
+    from app.processor import generate_bytes
+    if not filename.lower().endswith(EXCEL_EXTS):
+        raise ValueError("Not an Excel file (.xlsx/.xlsm/.xls)")
+    if not content or len(content) < 100:
+        raise ValueError("File seems empty or not a real Excel")
+    ingest.sniff(content, filename.lower())
+    return generate_bytes(content, fmt, logo_folder=LOGO_FOLDER, filename_hint=filename.lower())
@@ -0,0 +1,211 @@
+import asyncio
+import io
+import json
+import os
+import zipfile
+from contextlib import asynccontextmanager
+from typing import Callable, Dict, List, Optional, Tuple, Union
+
+MB = 1024 * 1024
+
+
+class BudgetFull(Exception):
+    """Raised when upload memory stays over budget for longer than the caller may wait."""
+
+
+class MemoryBudget:
+    """
+    Bytes of upload content held in memory across all requests in flight.
+
+    A request reserves its upload size before reading the upload into memory
+    and releases it when its response is ready. While the budget is spent,
+    requests queue for up to `wait_seconds`; after that hold() raises
+    BudgetFull so the caller can shed the request with 503. A single upload
+    larger than the whole budget is admitted only when nothing else is held.
+    """
+
+    def __init__(self, limit_bytes: int, wait_seconds: float = 10.0):
+        self.limit = max(1, limit_bytes)
+        self.wait_seconds = max(0.0, wait_seconds)
+        self.held = 0
+        self.waiting = 0
+        self._cond: Optional[asyncio.Condition] = None
+
+    def _fits(self, n: int) -> bool:
+        return self.held == 0 or self.held + n <= self.limit
+
+    async def acquire(self, n: int) -> int:
+        """Reserve n bytes (waiting, then BudgetFull); returns the amount to release()."""
+        if self._cond is None:
+            self._cond = asyncio.Condition()
+        n = min(max(0, n), self.limit)
+        async with self._cond:
+            if not self._fits(n):
+                self.waiting += 1
+                try:
+                    await asyncio.wait_for(self._cond.wait_for(lambda: self._fits(n)), self.wait_seconds)
+                except asyncio.TimeoutError:
+                    raise BudgetFull()
+                finally:
+                    self.waiting -= 1
+            self.held += n
+        return n
+
+    async def release(self, n: int):
+        async with self._cond:
+            self.held -= n
+            self._cond.notify_all()
+
+    @asynccontextmanager
+    async def hold(self, n: int):
+        n = await self.acquire(n)
+        try:
+            yield
+        finally:
+            await self.release(n)
+
+
+class BodyLimit:
+    """
+    ASGI middleware capping request bodies per path. A declared
+    Content-Length over the cap is answered 413 before any of the body is
+    read; a chunked body is counted as it streams and cut off with 413 the
+    moment it passes the cap (the route then sees a disconnect). A route
+    that already streams its response while reading (POST /quotes with
+    NDJSON) is not interrupted; it sees the disconnect with
+    scope["state"]["body_limit"] set and can report the cut-off itself.
+    """
+
+    def __init__(self, app, limits: Dict[str, int], on_reject: Optional[Callable[[str], None]] = None):
+        self.app = app
+        self.limits = limits
+        self.on_reject = on_reject
+
+    async def _reject(self, send, path: str, limit: int):
+        if self.on_reject is not None:
+            self.on_reject(path)
+        body = json.dumps({"detail": f"The upload is too large; the limit is {limit / MB:g} MB."}).encode()
+        await send({
+            "type": "http.response.start",
+            "status": 413,
+            "headers": [(b"content-type", b"application/json"), (b"content-length", str(len(body)).encode()),
+                        (b"connection", b"close")],
+        })
+        await send({"type": "http.response.body", "body": body})
+
+    async def __call__(self, scope, receive, send):
+        limit = self.limits.get(scope.get("path")) if scope["type"] == "http" else None
+        if limit is None:
+            await self.app(scope, receive, send)
+            return
+        length = dict(scope.get("headers") or []).get(b"content-length")
+        if length is not None and length.isdigit() and int(length) > limit:
+            await self._reject(send, scope["path"], limit)
+            return
+
+        received = 0
+        rejected = cut_off = started = False
+        state = scope.setdefault("state", {})
+
+        async def limited_receive():
+            nonlocal received, rejected, cut_off
+            if rejected or cut_off:
+                return {"type": "http.disconnect"}
+            message = await receive()
+            if message["type"] == "http.request":
+                received += len(message.get("body", b""))
+                if received > limit:
+                    if started:
+                        cut_off = True
+                        state["body_limit"] = limit
+                    else:
+                        rejected = True
+                        await self._reject(send, scope["path"], limit)
+                    return {"type": "http.disconnect"}
+            return message
+
+        async def guarded_send(message):
+            nonlocal started
+            # Whatever the route answers after a 413 goes nowhere
+            if not rejected:
+                started = True
+                await send(message)
+
+        try:
+            await self.app(scope, limited_receive, guarded_send)
+        except Exception:
+            if not rejected:
+                raise
+
+
+class UploadBatch:
+    """
+    The workbooks of a multi-file request (.zip uploads expanded), left in
+    the files the multipart parser spooled them to (on disk past 1 MB) until
+    read() asks for one. The batch owns those files from take() on, so a
+    streamed response can still read them after the route has returned
+    (FastAPI closes a request's uploads at that point); close() it when done.
+    """
+
+    def __init__(self):
+        self.names: List[str] = []
+        self.sizes: List[int] = []  # bytes read() will return (a zip member's declared size)
+        self._sources: List[Tuple[Union[zipfile.ZipFile, object], Optional[zipfile.ZipInfo]]] = []
+        self._owned: List = []
+        self.held = 0  # bytes of the upload memory budget reserved for this batch
+
+    def __len__(self) -> int:
+        return len(self.names)
+
+    @property
+    def size(self) -> int:
+        return sum(self.sizes)
+
+    def peak(self, at_once: Optional[int] = None) -> int:
+        """Most bytes in memory when up to `at_once` workbooks are read at a time (None: all of them)."""
+        return sum(sorted(self.sizes, reverse=True)[:at_once])
+
+    def take(self, upload):
+        """The spooled file of a Starlette UploadFile, now owned by the batch."""
+        spool, upload.file = upload.file, io.BytesIO()
+        self._owned.append(spool)
+        return spool
+
+    def add(self, name: str, size: int, spool):
+        self.names.append(name)
+        self.sizes.append(size)
+        self._sources.append((spool, None))
+
+    def open_zip(self, spool) -> zipfile.ZipFile:
+        """Only the central directory is read; members stay compressed in `spool`."""
+        zf = zipfile.ZipFile(spool)
+        self._owned.append(zf)
+        return zf
+
+    def add_member(self, zf: zipfile.ZipFile, info: zipfile.ZipInfo):
+        self.names.append(os.path.basename(info.filename))
+        self.sizes.append(info.file_size)
+        self._sources.append((zf, info))
+
+    def read(self, i: int) -> bytes:
+        """Bytes of workbook i (blocking file I/O and inflating; call it off the event loop)."""
+        source, info = self._sources[i]
+        if info is not None:
+            # A member never inflates past its declared file_size (zipfile stops there)
+            return source.read(info)
+        source.seek(0)
+        return source.read()
+
+    def close(self):
+        while self._owned:
+            try:
+                self._owned.pop().close()
+            except Exception:
+                pass
+
+
+def budget_from_env() -> MemoryBudget:
+    return MemoryBudget(
+        int(float(os.environ.get("UPLOAD_MEMORY_MB", "256")) * MB),
+        float(os.environ.get("UPLOAD_QUEUE_SECONDS", "10")),
+    )
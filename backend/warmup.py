@@ -0,0 +1,74 @@
+import asyncio
+import threading
+import time
+import traceback
+from typing import Callable, Dict, List, Optional, Tuple
+
+Step = Tuple[str, Callable[[], None]]
+
+
+class Warmup:
+    """
+    Background warm-up of the quote pipeline.
+
+    The heavy imports (openpyxl, python-docx), the catalogue, the
+    default DOCX template, the logo cache and the render pool workers are
+    loaded in a thread after the server starts, so `/`, static files and
+    /healthz answer at once. Requests that need the pipeline await wait();
+    /readyz reports the state and how long each step took.
+    """
+
+    def __init__(self, steps: List[Step]):
+        self.steps = steps
+        self.state = "pending"  # pending -> warming -> ready | failed
+        self.error: Optional[str] = None
+        self.timings: Dict[str, float] = {}
+        self._lock = threading.Lock()
+        self._done = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    @property
+    def ready(self) -> bool:
+        return self.state == "ready"
+
+    def start(self):
+        """Start the warm-up thread (once)."""
+        with self._lock:
+            if self._thread is None:
+                self.state = "warming"
+                self._thread = threading.Thread(target=self._run, name="warmup", daemon=True)
+                self._thread.start()
+
+    def _run(self):
+        try:
+            for name, step in self.steps:
+                t0 = time.perf_counter()
+                try:
+                    step()
+                except Exception as e:
+                    self.error = f"{name}: {type(e).__name__}: {e}"
+                    self.state = "failed"
+                    traceback.print_exc()
+                    return
+                self.timings[name] = time.perf_counter() - t0
+            self.state = "ready"
+        finally:
+            self._done.set()
+
+    async def wait(self):
+        """
+        Return once the warm-up has finished (successfully or not). A failed
+        step is not fatal here: the request then imports what it needs
+        itself and reports its own error.
+        """
+        if self._done.is_set():
+            return
+        self.start()
+        await asyncio.get_running_loop().run_in_executor(None, self._done.wait)
+
+    def status(self) -> Dict:
+        return {
+            "status": self.state,
+            "error": self.error,
+            "steps_ms": {k: round(v * 1000, 1) for k, v in self.timings.items()},
+        }
@@ -0,0 +1,60 @@
+import json
+import zipfile
+from typing import Dict, List
+
+
+class ZipStream:
+    """
+    Write-only, non-seekable file object for zipfile.ZipFile.
+
+    zipfile falls back to data descriptors when it cannot seek, so entries
+    can be handed to the client with drain() as soon as they are written
+    instead of building the whole archive in memory.
+    """
+
+    def __init__(self):
+        self._buf = bytearray()
+        self._pos = 0
+
+    def write(self, data) -> int:
+        self._buf += data
+        self._pos += len(data)
+        return len(data)
+
+    def tell(self) -> int:
+        return self._pos
+
+    def flush(self):
+        pass
+
+    def drain(self) -> bytes:
+        data = bytes(self._buf)
+        self._buf.clear()
+        return data
+
+
+class StreamingZip:
+    """
+    Incremental ZIP writer: add() entries, drain() the bytes written so far,
+    then close() to append manifest.json and the central directory.
+    DOCX files are already deflated, so entries are stored uncompressed.
+    """
+
+    def __init__(self):
+        self._stream = ZipStream()
+        self._zf = zipfile.ZipFile(self._stream, "w", compression=zipfile.ZIP_STORED)
+        self.manifest: List[Dict] = []
+
+    def add(self, arcname: str, data: bytes):
+        self._zf.writestr(arcname, data)
+
+    def record(self, **entry):
+        self.manifest.append(entry)
+
+    def drain(self) -> bytes:
+        return self._stream.drain()
+
+    def close(self) -> bytes:
+        self._zf.writestr("manifest.json", json.dumps(self.manifest, indent=2, ensure_ascii=False))
+        self._zf.close()
+        return self._stream.drain()
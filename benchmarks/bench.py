@@ -0,0 +1,236 @@
+"""
+Stage-by-stage latency benchmark for the quote pipeline.
+
+    python -m benchmarks.bench                      # all cases
+    python -m benchmarks.bench --cases small large -n 50
+    python -m benchmarks.bench --save-baseline      # write benchmarks/baseline.json
+    python -m benchmarks.bench --check              # exit 1 if slower than the baseline
+
+Each case runs in a fresh worker process so peak RSS is per case. The
+committed baseline records the machine it was taken on ("_machine"); on
+other hardware, re-save it before relying on --check. --check with no
+baseline file saves one instead of failing.
+"""
+import argparse
+import io
+import json
+import os
+import platform
+import resource
+import sys
+import tempfile
+import time
+from concurrent.futures import ProcessPoolExecutor
+from typing import Dict, List
+
+from benchmarks.workbooks import CASES, CASES_BY_NAME, Case, build_case, partial_logo_folder
+
+ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+LOGO_FOLDER = os.path.join(ROOT, "logos")
+BASELINE_PATH = os.path.join(os.path.dirname(__file__), "baseline.json")
+
+STAGES = ["read", "premiums", "model", "client_table", "premium_table", "feature_table", "advisor_table", "save"]
+TOTALS = ["direct_total", "template_total", "html", "pdf"]
+
+
+def _percentile(values: List[float], q: float) -> float:
+    vals = sorted(values)
+    if not vals:
+        return 0.0
+    k = (len(vals) - 1) * q
+    lo = int(k)
+    hi = min(lo + 1, len(vals) - 1)
+    return vals[lo] + (vals[hi] - vals[lo]) * (k - lo)
+
+
+def _peak_rss_mb() -> float:
+    rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # kilobytes on Linux, bytes on macOS
+    return rss / (1024 * 1024) if sys.platform == "darwin" else rss / 1024
+
+
+def _run_case(case: Case, iterations: int, warmup: int) -> Dict:
+    """Worker: time every stage of generate_docx, the default end-to-end path and the HTML/PDF renderers."""
+    from docx import Document
+    from app import processor as P
+
+    data = build_case(case)
+    logo_folder = LOGO_FOLDER
+    if case.missing_logos:
+        logo_folder = partial_logo_folder(LOGO_FOLDER, tempfile.mkdtemp(prefix="bench_logos_"))
+
+    timings: Dict[str, List[float]] = {s: [] for s in STAGES + TOTALS}
+    out_size = 0
+    for i in range(warmup + iterations):
+        t = {}
+        t0 = time.perf_counter()
+        clients, premiums = P._read_workbook(data, "bench.xlsx")
+        t1 = time.perf_counter(); t["read"] = t1 - t0
+        lines, included = P._select_plans(premiums, P.CATALOGUE.current())
+        t2 = time.perf_counter(); t["premiums"] = t2 - t1
+        quote = P.assemble_quote(clients, lines, included, logo_folder)
+        t2b = time.perf_counter(); t["model"] = t2b - t2
+        doc = Document()
+        P._set_prepared_date(P._add_title(doc, quote.header_logo), quote)
+        t3 = time.perf_counter()
+        P._fill_client_rows(P._add_client_table(doc), quote.clients)
+        t4 = time.perf_counter(); t["client_table"] = t4 - t3
+        P._fill_premium_rows(P._add_premium_table(doc), quote.premiums)
+        t5 = time.perf_counter(); t["premium_table"] = t5 - t4
+        P._add_feature_table(doc, quote)
+        t6 = time.perf_counter(); t["feature_table"] = t6 - t5
+        P._add_advisor_section(doc, quote)
+        t7 = time.perf_counter(); t["advisor_table"] = t7 - t6
+        buf = io.BytesIO()
+        doc.save(buf)
+        t8 = time.perf_counter(); t["save"] = t8 - t7
+        t["direct_total"] = t8 - t0
+
+        t9 = time.perf_counter()
+        out = P.generate_docx_bytes(data, logo_folder=logo_folder, filename_hint="bench.xlsx")
+        t["template_total"] = time.perf_counter() - t9
+        out_size = len(out)
+
+        for fmt in ("html", "pdf"):
+            t10 = time.perf_counter()
+            P.RENDERERS[fmt].render(quote)
+            t[fmt] = time.perf_counter() - t10
+
+        if i >= warmup:
+            for k, v in t.items():
+                timings[k].append(v)
+
+    return {
+        "case": case.name,
+        "members": case.members,
+        "rows": case.rows,
+        "iterations": iterations,
+        "stages": {
+            k: {"p50_ms": _percentile(v, 0.5) * 1000, "p95_ms": _percentile(v, 0.95) * 1000}
+            for k, v in timings.items()
+        },
+        "peak_rss_mb": _peak_rss_mb(),
+        "output_kb": out_size / 1024,
+    }
+
+
+def run(cases: List[Case], iterations: int, warmup: int) -> List[Dict]:
+    results = []
+    for case in cases:
+        # Fresh process per case: isolated peak RSS and no cross-case caching
+        with ProcessPoolExecutor(max_workers=1) as ex:
+            results.append(ex.submit(_run_case, case, iterations, warmup).result())
+    return results
+
+
+def _machine() -> Dict:
+    cpu = platform.processor() or platform.machine()
+    try:
+        with open("/proc/cpuinfo", "r", encoding="utf-8") as f:
+            cpu = next((line.split(":", 1)[1].strip() for line in f if line.startswith("model name")), cpu)
+    except OSError:
+        pass
+    return {
+        "cpu": cpu,
+        "cpus": os.cpu_count(),
+        "platform": platform.platform(),
+        "python": platform.python_version(),
+        "taken": time.strftime("%Y-%m-%d"),
+    }
+
+
+def save_baseline(path: str, results: List[Dict]):
+    """Merge these results into the baseline file, stamped with this machine."""
+    baseline = {}
+    if os.path.exists(path):
+        with open(path, "r", encoding="utf-8") as f:
+            baseline = json.load(f)
+    baseline.update({r["case"]: r for r in results})
+    baseline["_machine"] = _machine()
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump(baseline, f, indent=2, sort_keys=True)
+        f.write("\n")
+
+
+def report(results: List[Dict]) -> str:
+    cols = STAGES + TOTALS
+    head = f"{'case':<14}" + "".join(f"{c[:13]:>14}" for c in cols) + f"{'rss MB':>9}{'out KB':>9}"
+    lines = [head, "-" * len(head)]
+    for r in results:
+        p50 = "".join(f"{r['stages'][c]['p50_ms']:>14.1f}" for c in cols)
+        p95 = "".join(f"{r['stages'][c]['p95_ms']:>14.1f}" for c in cols)
+        lines.append(f"{r['case'] + ' p50':<14}{p50}{r['peak_rss_mb']:>9.0f}{r['output_kb']:>9.0f}")
+        lines.append(f"{'  p95':<14}{p95}")
+    return "\n".join(lines)
+
+
+def check(results: List[Dict], baseline: Dict, tolerance: float, min_delta_ms: float) -> List[str]:
+    """Regressions: p95 slower than baseline * tolerance and by at least min_delta_ms."""
+    failures = []
+    for r in results:
+        base = baseline.get(r["case"])
+        if not base:
+            continue
+        for stage, cur in r["stages"].items():
+            ref = base["stages"].get(stage)
+            if not ref:
+                continue
+            if cur["p95_ms"] > ref["p95_ms"] * tolerance and cur["p95_ms"] - ref["p95_ms"] > min_delta_ms:
+                failures.append(
+                    f"{r['case']}/{stage}: p95 {cur['p95_ms']:.1f} ms vs baseline {ref['p95_ms']:.1f} ms"
+                )
+        if r["output_kb"] > base["output_kb"] * tolerance:
+            failures.append(f"{r['case']}/output: {r['output_kb']:.0f} KB vs baseline {base['output_kb']:.0f} KB")
+    return failures
+
+
+def main():
+    p = argparse.ArgumentParser(description="Benchmark the quote pipeline")
+    p.add_argument("--cases", nargs="*", choices=sorted(CASES_BY_NAME), help="Cases to run (default: all)")
+    p.add_argument("-n", "--iterations", type=int, default=20)
+    p.add_argument("--warmup", type=int, default=3)
+    p.add_argument("--json", help="Also write raw results to this file")
+    p.add_argument("--baseline", default=BASELINE_PATH)
+    p.add_argument("--save-baseline", action="store_true", help="Store these results as the baseline")
+    p.add_argument("--check", action="store_true", help="Fail if any stage regressed against the baseline")
+    p.add_argument("--tolerance", type=float, default=1.5, help="Allowed slowdown factor for --check")
+    p.add_argument("--min-delta-ms", type=float, default=5.0, help="Ignore regressions smaller than this")
+    args = p.parse_args()
+
+    cases = [CASES_BY_NAME[c] for c in args.cases] if args.cases else CASES
+    results = run(cases, args.iterations, args.warmup)
+    print(report(results))
+
+    if args.json:
+        with open(args.json, "w", encoding="utf-8") as f:
+            json.dump(results, f, indent=2)
+
+    if args.check and not os.path.exists(args.baseline):
+        save_baseline(args.baseline, results)
+        print(f"No baseline at {args.baseline}; saved these results as the baseline (nothing to compare yet).")
+        return
+
+    if args.save_baseline:
+        save_baseline(args.baseline, results)
+        print(f"Baseline saved: {args.baseline}")
+
+    if args.check:
+        with open(args.baseline, "r", encoding="utf-8") as f:
+            baseline = json.load(f)
+        machine = baseline.get("_machine")
+        if machine:
+            print(f"Baseline taken {machine['taken']} on {machine['cpu']} x{machine['cpus']}, Python {machine['python']}.")
+        missing = [r["case"] for r in results if r["case"] not in baseline]
+        if missing:
+            print(f"Warning: no baseline for {', '.join(missing)}; run with --save-baseline to add them.")
+        failures = check(results, baseline, args.tolerance, args.min_delta_ms)
+        if failures:
+            print("❌ Performance regressions:")
+            for line in failures:
+                print("  " + line)
+            sys.exit(1)
+        print("✅ No regressions against baseline.")
+
+
+if __name__ == "__main__":
+    main()
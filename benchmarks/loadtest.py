@@ -0,0 +1,151 @@
+"""
+Concurrent load test for POST /generate.
+
+    python -m benchmarks.loadtest --spawn -c 8 -n 200           # starts uvicorn on a free port
+    python -m benchmarks.loadtest --url http://localhost:8000 -c 16 --case large
+
+Every request uploads a distinct workbook (different client name) so the
+result cache is bypassed unless --allow-cache is given.
+"""
+import argparse
+import socket
+import subprocess
+import sys
+import threading
+import time
+import urllib.error
+import urllib.request
+import uuid
+from collections import Counter
+from concurrent.futures import ThreadPoolExecutor
+from typing import List, Optional, Tuple
+
+from benchmarks.bench import ROOT, _percentile
+from benchmarks.workbooks import CASES_BY_NAME, build_case
+
+XLSX_TYPE = "application/vnd.openxmlformats-officedocument.spreadsheetml.sheet"
+
+
+def _multipart(filename: str, content: bytes) -> Tuple[bytes, str]:
+    boundary = uuid.uuid4().hex
+    body = (
+        f"--{boundary}\r\n"
+        f'Content-Disposition: form-data; name="file"; filename="{filename}"\r\n'
+        f"Content-Type: {XLSX_TYPE}\r\n\r\n"
+    ).encode() + content + f"\r\n--{boundary}--\r\n".encode()
+    return body, f"multipart/form-data; boundary={boundary}"
+
+
+def _post(url: str, body: bytes, content_type: str, timeout: float) -> Tuple[int, float]:
+    req = urllib.request.Request(url, data=body, method="POST", headers={"Content-Type": content_type})
+    t0 = time.perf_counter()
+    try:
+        with urllib.request.urlopen(req, timeout=timeout) as resp:
+            resp.read()
+            status = resp.status
+    except urllib.error.HTTPError as e:
+        e.read()
+        status = e.code
+    except Exception:
+        status = 0  # connection error / timeout
+    return status, time.perf_counter() - t0
+
+
+def _free_port() -> int:
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+
+def spawn_server(port: int, startup_timeout: float = 30.0) -> subprocess.Popen:
+    proc = subprocess.Popen(
+        [sys.executable, "-m", "uvicorn", "backend.main:app", "--port", str(port), "--log-level", "warning"],
+        cwd=ROOT,
+    )
+    deadline = time.time() + startup_timeout
+    while time.time() < deadline:
+        if proc.poll() is not None:
+            raise RuntimeError("uvicorn exited during startup")
+        try:
+            # Wait for the background warm-up so it is not part of the measurement
+            urllib.request.urlopen(f"http://127.0.0.1:{port}/readyz", timeout=1).read()
+            return proc
+        except Exception:
+            time.sleep(0.2)
+    proc.terminate()
+    raise RuntimeError("uvicorn did not start in time")
+
+
+def run(base_url: str, case_name: str, concurrency: int, requests: int,
+        allow_cache: bool = False, timeout: float = 120.0) -> dict:
+    case = CASES_BY_NAME[case_name]
+    if allow_cache:
+        payloads = [build_case(case)]
+    else:
+        # Build distinct uploads up front so generation is not part of the measurement
+        payloads = [build_case(case, seed=i, client_name=f"Load Test {i}") for i in range(requests)]
+    url = base_url.rstrip("/") + "/generate"
+    results: List[Tuple[int, float]] = []
+    lock = threading.Lock()
+
+    def one(i: int):
+        body, ctype = _multipart(f"load_{i}.xlsx", payloads[i % len(payloads)])
+        res = _post(url, body, ctype, timeout)
+        with lock:
+            results.append(res)
+
+    t0 = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=concurrency) as ex:
+        list(ex.map(one, range(requests)))
+    wall = time.perf_counter() - t0
+
+    ok = [t for s, t in results if s == 200]
+    return {
+        "case": case_name,
+        "concurrency": concurrency,
+        "requests": requests,
+        "wall_s": wall,
+        "throughput_rps": len(ok) / wall if wall else 0.0,
+        "status": dict(Counter(s for s, _ in results)),
+        "p50_ms": _percentile(ok, 0.5) * 1000,
+        "p95_ms": _percentile(ok, 0.95) * 1000,
+        "p99_ms": _percentile(ok, 0.99) * 1000,
+    }
+
+
+def main():
+    p = argparse.ArgumentParser(description="Load-test POST /generate")
+    g = p.add_mutually_exclusive_group(required=True)
+    g.add_argument("--url", help="Base URL of a running server, e.g. http://localhost:8000")
+    g.add_argument("--spawn", action="store_true", help="Start a local uvicorn for the duration of the test")
+    p.add_argument("--case", default="family", choices=sorted(CASES_BY_NAME))
+    p.add_argument("-c", "--concurrency", type=int, default=8)
+    p.add_argument("-n", "--requests", type=int, default=100)
+    p.add_argument("--allow-cache", action="store_true", help="Re-send one workbook (measures cache hits)")
+    p.add_argument("--timeout", type=float, default=120.0)
+    args = p.parse_args()
+
+    proc: Optional[subprocess.Popen] = None
+    base_url = args.url
+    if args.spawn:
+        port = _free_port()
+        proc = spawn_server(port)
+        base_url = f"http://127.0.0.1:{port}"
+    try:
+        r = run(base_url, args.case, args.concurrency, args.requests, args.allow_cache, args.timeout)
+    finally:
+        if proc is not None:
+            proc.terminate()
+            proc.wait(timeout=10)
+
+    print(f"case={r['case']} concurrency={r['concurrency']} requests={r['requests']} wall={r['wall_s']:.1f}s")
+    print(f"throughput: {r['throughput_rps']:.1f} quotes/s")
+    print(f"latency (200s): p50 {r['p50_ms']:.0f} ms  p95 {r['p95_ms']:.0f} ms  p99 {r['p99_ms']:.0f} ms")
+    print("status codes: " + ", ".join(f"{k}={v}" for k, v in sorted(r["status"].items())))
+    # 503 is deliberate load shedding; anything else is a failure
+    if any(s not in (200, 503) for s in r["status"]):
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
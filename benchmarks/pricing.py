@@ -0,0 +1,98 @@
+"""
+Throughput of the vectorised pricing engine (app/pricing.py).
+
+    python -m benchmarks.pricing                       # 1k / 10k / 100k families
+    python -m benchmarks.pricing --families 5000 -n 20
+    python -m benchmarks.pricing --check --min-fps 1000
+
+Rate tables are generated for every catalogue plan with random numbers;
+they only exercise the engine and are not real insurer rates.
+"""
+import argparse
+import json
+import os
+import random
+import sys
+import tempfile
+import time
+from typing import List
+
+from benchmarks.bench import _percentile
+from benchmarks.workbooks import CITIES, SUM_ASSURED
+
+AGE_BANDS = [0, 18, 26, 36, 41, 46, 51, 56, 61, 66, 71, 76]
+SUMS = [500000, 1000000, 2500000, 5000000, 10000000]
+
+
+def synthetic_rate_tables(folder: str, plans: List[str], seed: int = 0) -> str:
+    """Write one random rate table per plan into `folder` (for benchmarks only)."""
+    rnd = random.Random(seed)
+    os.makedirs(folder, exist_ok=True)
+    for i, plan in enumerate(plans):
+        zones = {"A": CITIES[:2], "B": CITIES[2:4], "C": "*"}
+        rates = [
+            [[round(rnd.uniform(2000, 8000) * (1 + b / 30) * (1 + s / 4) * (1.2 - z * 0.1))
+              for s in range(len(SUMS))] for z in range(len(zones))]
+            for b in range(len(AGE_BANDS))
+        ]
+        table = {
+            "schema": 1, "plan": plan, "version": "synthetic", "age_bands": AGE_BANDS, "max_age": 99,
+            "zones": zones, "sum_assured": SUMS, "rates": rates,
+            "tenure_discounts": [0, 0.075, 0.1], "floater_discounts": {"2": 0.2, "3": 0.25, "4": 0.3},
+        }
+        with open(os.path.join(folder, f"plan_{i}.json"), "w", encoding="utf-8") as f:
+            json.dump(table, f, ensure_ascii=False)
+    return folder
+
+
+def synthetic_members(families: int, seed: int = 0):
+    """Column-wise members of `families` families of 1-6 people (ages, cities, sums, sizes)."""
+    rnd = random.Random(seed)
+    ages, cities, sums, sizes = [], [], [], []
+    for _ in range(families):
+        n = rnd.randint(1, 6)
+        sizes.append(n)
+        city, amount = rnd.choice(CITIES), rnd.choice(SUM_ASSURED)
+        for _ in range(n):
+            ages.append(rnd.randint(0, 80))
+            cities.append(city)
+            sums.append(amount)
+    return ages, cities, sums, sizes
+
+
+def main():
+    p = argparse.ArgumentParser(description="Benchmark the pricing engine")
+    p.add_argument("--families", type=int, nargs="*", default=[1000, 10000, 100000])
+    p.add_argument("-n", "--iterations", type=int, default=10)
+    p.add_argument("--min-fps", type=float, default=1000.0, help="Families/s the 1k batch must reach with --check")
+    p.add_argument("--check", action="store_true", help="Exit 1 if the smallest batch is below --min-fps")
+    args = p.parse_args()
+
+    from app.catalogue import CATALOGUE
+    from app.pricing import load_rate_book
+
+    book = load_rate_book(synthetic_rate_tables(tempfile.mkdtemp(prefix="bench_rates_"), list(CATALOGUE.current().master)))
+    print(f"{len(book.plans)} plans, rates array {book.rates.shape}")
+    rates = {}
+    for n in args.families:
+        cols = synthetic_members(n)
+        times = []
+        for _ in range(args.iterations):
+            t0 = time.perf_counter()
+            out = book.price(*cols)
+            times.append(time.perf_counter() - t0)
+        p50 = _percentile(times, 0.5)
+        rates[n] = n / p50
+        print(f"{n:>7} families ({len(cols[0]):>7} members): p50 {p50 * 1000:8.1f} ms  "
+              f"{rates[n]:>10,.0f} families/s  priced {int((out == out).all(axis=2).sum())}/{out.shape[0] * out.shape[1]}")
+
+    if args.check:
+        smallest = min(rates)
+        if rates[smallest] < args.min_fps:
+            print(f"❌ {rates[smallest]:,.0f} families/s is below {args.min_fps:,.0f}")
+            sys.exit(1)
+        print(f"✅ pricing above {args.min_fps:,.0f} families/s.")
+
+
+if __name__ == "__main__":
+    main()
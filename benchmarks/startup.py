@@ -0,0 +1,123 @@
+"""
+Cold-start budget for the web service.
+
+    python -m benchmarks.startup                  # import times + one cold uvicorn start
+    python -m benchmarks.startup --check          # exit 1 if importing backend.main exceeds --budget-ms
+
+Import times are measured in fresh interpreters. The server run starts
+uvicorn and times the first answer from /healthz, /readyz turning 200
+and the first POST /generate.
+"""
+import argparse
+import subprocess
+import sys
+import threading
+import time
+import urllib.error
+import urllib.request
+from typing import Dict, List
+
+from benchmarks.bench import ROOT, _percentile
+from benchmarks.loadtest import _free_port, _multipart, _post
+from benchmarks.workbooks import CASES_BY_NAME, build_case
+
+# Module -> what importing it covers
+IMPORTS = {
+    "backend.main": "server module (what uvicorn imports before serving)",
+    "app.processor": "quote pipeline (openpyxl, python-docx; pandas only on demand)",
+}
+
+
+def import_ms(module: str, runs: int) -> List[float]:
+    code = f"import time; t = time.perf_counter(); import {module}; print(time.perf_counter() - t)"
+    out = []
+    for _ in range(runs):
+        res = subprocess.run([sys.executable, "-c", code], cwd=ROOT, capture_output=True, text=True, check=True)
+        out.append(float(res.stdout.strip().splitlines()[-1]) * 1000)
+    return out
+
+
+def _status(url: str) -> int:
+    try:
+        with urllib.request.urlopen(url, timeout=1) as resp:
+            resp.read()
+            return resp.status
+    except urllib.error.HTTPError as e:
+        return e.code
+    except Exception:
+        return 0
+
+
+def cold_server(case_name: str = "small", timeout: float = 60.0) -> Dict[str, float]:
+    """
+    Milliseconds from process start to: /healthz 200, /readyz 200 and the
+    first quote, which is posted as soon as /healthz answers (a request
+    waking a scaled-to-zero instance).
+    """
+    port = _free_port()
+    base = f"http://127.0.0.1:{port}"
+    body, ctype = _multipart("startup.xlsx", build_case(CASES_BY_NAME[case_name]))
+    result: Dict[str, float] = {}
+    t0 = time.perf_counter()
+    proc = subprocess.Popen(
+        [sys.executable, "-m", "uvicorn", "backend.main:app", "--port", str(port), "--log-level", "warning"],
+        cwd=ROOT,
+    )
+
+    def first_quote():
+        status, seconds = _post(f"{base}/generate", body, ctype, timeout)
+        result["first_quote"] = (time.perf_counter() - t0) * 1000
+        result["first_quote_status"] = status
+
+    try:
+        deadline = t0 + timeout
+        poster = None
+        while "readyz" not in result:
+            if proc.poll() is not None:
+                raise RuntimeError("uvicorn exited during startup")
+            if time.perf_counter() > deadline:
+                raise RuntimeError("server did not become ready in time")
+            if "healthz" not in result and _status(f"{base}/healthz") == 200:
+                result["healthz"] = (time.perf_counter() - t0) * 1000
+                poster = threading.Thread(target=first_quote)
+                poster.start()
+            elif "healthz" in result and _status(f"{base}/readyz") == 200:
+                result["readyz"] = (time.perf_counter() - t0) * 1000
+            time.sleep(0.02)
+        poster.join(timeout)
+        if result.get("first_quote_status") != 200:
+            raise RuntimeError(f"first /generate answered {result.get('first_quote_status')}")
+    finally:
+        proc.terminate()
+        proc.wait(timeout=10)
+    return result
+
+
+def main():
+    p = argparse.ArgumentParser(description="Measure service cold-start cost")
+    p.add_argument("-n", "--runs", type=int, default=5, help="Fresh interpreters per import measurement")
+    p.add_argument("--no-server", action="store_true", help="Only measure import times")
+    p.add_argument("--budget-ms", type=float, default=800.0, help="p50 budget for importing backend.main")
+    p.add_argument("--check", action="store_true", help="Fail if the backend.main import exceeds the budget")
+    args = p.parse_args()
+
+    p50: Dict[str, float] = {}
+    for module, what in IMPORTS.items():
+        times = import_ms(module, args.runs)
+        p50[module] = _percentile(times, 0.5)
+        print(f"import {module:<14} p50 {p50[module]:7.0f} ms  max {max(times):7.0f} ms   {what}")
+
+    if not args.no_server:
+        r = cold_server()
+        print(f"cold server: /healthz {r['healthz']:.0f} ms, /readyz {r['readyz']:.0f} ms, "
+              f"first quote {r['first_quote']:.0f} ms after start")
+
+    if args.check:
+        if p50["backend.main"] > args.budget_ms:
+            print(f"❌ backend.main import p50 {p50['backend.main']:.0f} ms exceeds {args.budget_ms:.0f} ms")
+            sys.exit(1)
+        print(f"✅ backend.main import within {args.budget_ms:.0f} ms budget.")
+
+
+if __name__ == "__main__":
+    main()
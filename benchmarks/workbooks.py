@@ -0,0 +1,121 @@
+"""
+Synthetic 'Client Details' / 'Premiums' workbooks for benchmarking.
+
+    python -m benchmarks.workbooks out/ --members 12 --rows 50
+"""
+import argparse
+import io
+import os
+import random
+from datetime import datetime, timedelta
+from typing import Dict, List, NamedTuple, Optional
+
+from openpyxl import Workbook
+
+# Spellings advisors actually type for the six mapped plans
+MAPPED_NAMES = [
+    "ICICI Lombard Elevate",
+    "Niva Bupa ReAssure 3.0",
+    "Niva Bupa Aspire Platinum",
+    "Tata AIG Medicare Select",
+    "HDFC ERGO Optima Secure",
+    "Care Supreme",
+]
+# Names map_master cannot resolve (each becomes a "<Mapping required>" column)
+UNMAPPED_NAMES = ["Zorbix Shield", "Quixby Cover", "Wombat Guard", "Kyzil Shield"]
+
+RELATIONS = ["Self", "Spouse", "Son", "Daughter", "Father", "Mother"]
+CITIES = ["Delhi", "Mumbai", "Pune", "Bengaluru", "Jaipur", "Lucknow"]
+SUM_ASSURED = ["5 Lakh", "10 Lakh", "25 Lakh", "50 Lakh", "1 Crore"]
+
+
+class Case(NamedTuple):
+    name: str
+    members: int
+    rows: int
+    unmapped: float = 0.0        # share of premium rows with unmapped names
+    missing_logos: bool = False  # run against a logo folder missing half the logos
+
+
+# Default matrix for benchmarks.bench
+CASES = [
+    Case("small", members=3, rows=6),
+    Case("family", members=6, rows=12),
+    Case("medium", members=12, rows=50, unmapped=0.1),
+    Case("large", members=50, rows=500, unmapped=0.05),
+    Case("unmapped", members=4, rows=40, unmapped=0.5),
+    Case("missing-logos", members=4, rows=12, missing_logos=True),
+]
+CASES_BY_NAME: Dict[str, Case] = {c.name: c for c in CASES}
+
+
+def build_workbook(members: int, rows: int, unmapped: float = 0.0, seed: Optional[int] = 0,
+                   client_name: Optional[str] = None) -> bytes:
+    """Return .xlsx bytes with `members` client rows and `rows` premium rows."""
+    rnd = random.Random(seed)
+    wb = Workbook()
+    ws = wb.active
+    ws.title = "Client Details"
+    ws.append(["Client Name", "Relation", "DOB", "Age", "City", "Sum Assured"])
+    city = rnd.choice(CITIES)
+    sa = rnd.choice(SUM_ASSURED)
+    today = datetime(2025, 1, 1)
+    for i in range(members):
+        age = rnd.randint(1, 75)
+        dob = today - timedelta(days=age * 365 + rnd.randint(0, 364))
+        name = client_name if (client_name and i == 0) else f"Member {i + 1}"
+        ws.append([name, RELATIONS[i % len(RELATIONS)], dob, age, city, sa])
+
+    ps = wb.create_sheet("Premiums")
+    ps.append(["Plan Name", "1 Yr Premium", "2 Yr Premium", "3 Yr Premium"])
+    for i in range(rows):
+        if rnd.random() < unmapped:
+            name = rnd.choice(UNMAPPED_NAMES)
+        else:
+            name = MAPPED_NAMES[i % len(MAPPED_NAMES)]
+        if rows > len(MAPPED_NAMES):
+            name = f"{name} {rnd.choice(['Silver', 'Gold', 'Floater', 'Individual', ''])}".strip()
+        base = rnd.randint(8, 60) * 1000
+        two = base * 2 * 0.95 if rnd.random() < 0.7 else None
+        three = base * 3 * 0.9 if rnd.random() < 0.5 else "NA"
+        ps.append([name, base if rnd.random() > 0.05 else 0, two, three])
+
+    buf = io.BytesIO()
+    wb.save(buf)
+    return buf.getvalue()
+
+
+def build_case(case: Case, seed: Optional[int] = 0, client_name: Optional[str] = None) -> bytes:
+    return build_workbook(case.members, case.rows, case.unmapped, seed=seed, client_name=client_name)
+
+
+def partial_logo_folder(src: str, dest: str) -> str:
+    """Copy every other logo from `src` into `dest` (for the missing-logos case)."""
+    os.makedirs(dest, exist_ok=True)
+    names = sorted(n for n in os.listdir(src) if n.lower().endswith((".png", ".jpg", ".jpeg", ".webp")))
+    for n in names[::2]:
+        with open(os.path.join(src, n), "rb") as f_in, open(os.path.join(dest, n), "wb") as f_out:
+            f_out.write(f_in.read())
+    return dest
+
+
+def main():
+    p = argparse.ArgumentParser(description="Write synthetic quote workbooks")
+    p.add_argument("out_dir")
+    p.add_argument("--members", type=int, default=4)
+    p.add_argument("--rows", type=int, default=6)
+    p.add_argument("--unmapped", type=float, default=0.0)
+    p.add_argument("--count", type=int, default=1, help="Number of workbooks (different seeds)")
+    args = p.parse_args()
+    os.makedirs(args.out_dir, exist_ok=True)
+    paths: List[str] = []
+    for i in range(args.count):
+        path = os.path.join(args.out_dir, f"synthetic_{args.members}m_{args.rows}r_{i}.xlsx")
+        with open(path, "wb") as f:
+            f.write(build_workbook(args.members, args.rows, args.unmapped, seed=i))
+        paths.append(path)
+    print("\n".join(paths))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,34 @@
+import shutil
+
+import pytest
+
+import app.processor as processor
+from app.catalogue import DEFAULT_PATH, CatalogueStore
+
+PLAN = "Aditya Birla – Activ One"
+
+
+@pytest.fixture
+def store(tmp_path, monkeypatch):
+    path = tmp_path / "catalogue.json"
+    shutil.copy(DEFAULT_PATH, path)
+    store = CatalogueStore(str(path))
+    monkeypatch.setattr(processor, "CATALOGUE", store)
+    return store
+
+
+def test_registered_insurer_reaches_other_processes(store):
+    before = processor.catalogue_fingerprint()
+    processor.register_insurer(PLAN, {"Room Rent": "Any room"}, aliases=[("aditya", "activ")], logo_base="aditya")
+    # A render pool worker has its own store over the same file
+    worker = CatalogueStore(store.path).current()
+    assert worker.resolver.resolve("Aditya Birla Activ One") == PLAN
+    assert worker.logo_map[PLAN] == "aditya"
+    assert worker.digest == store.current().digest
+    assert processor.catalogue_fingerprint() != before
+
+
+def test_in_process_registration_leaves_the_file_alone(store):
+    processor.register_insurer(PLAN, {"Room Rent": "Any room"}, aliases=[("aditya", "activ")], persist=False)
+    assert store.current().resolver.resolve("Aditya Birla Activ One") == PLAN
+    assert PLAN not in CatalogueStore(store.path).current().master
@@ -0,0 +1,29 @@
+import re
+import zlib
+
+import app.processor as processor
+from app.pdf import _encode, render_pdf
+
+
+def _page_text(pdf: bytes) -> bytes:
+    streams = re.findall(rb"/Filter /FlateDecode /Length \d+ >>\nstream\n(.*?)\nendstream", pdf, re.S)
+    return b"".join(zlib.decompress(s) for s in streams)
+
+
+def test_rupee_sign_is_spelled_out():
+    assert _encode("Covered up to ₹5 Lakh.") == b"Covered up to Rs.5 Lakh."
+
+
+def test_unknown_characters_show_as_question_marks():
+    assert _encode("✈️ Air Ambulance") == b"Air Ambulance"
+    assert _encode("Plan 日本") == b"Plan ??"
+
+
+def test_catalogue_rupee_amount_keeps_its_currency_marker():
+    # Niva Bupa ReAssure 3.0 lists "Air Ambulance: Covered up to ₹5 Lakh." in the catalogue
+    quote = processor.build_request_quote({
+        "clients": [{"client_name": "Asha", "age": 38, "city": "Delhi", "sum_assured": "10 Lakh"}],
+        "premiums": [{"plan": "Niva Bupa – ReAssure 3.0", "premium_1y": 15000}],
+    })
+    assert any("₹5 Lakh" in v for row in quote.features for v in row.values)
+    assert b"Rs.5" in _page_text(render_pdf(quote))
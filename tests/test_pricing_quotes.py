@@ -0,0 +1,82 @@
+import io
+import json
+
+import openpyxl
+import pytest
+
+import app.processor as processor
+from app.pricing import RateBookStore
+
+CARE = "Care Health – Supreme"
+TATA = "Tata AIG – Medicare Select"
+
+
+@pytest.fixture
+def rates(tmp_path, monkeypatch):
+    """A rate book with a single table (Care Supreme: 10,000 a year per member)."""
+    table = {
+        "schema": 1, "plan": CARE, "version": "test", "age_bands": [0], "max_age": 99,
+        "zones": {"all": "*"}, "sum_assured": [1000000], "rates": [[[10000]]],
+        "tenure_discounts": [0, 0, 0], "floater_discounts": {},
+    }
+    (tmp_path / "care.json").write_text(json.dumps(table), encoding="utf-8")
+    monkeypatch.setattr(processor, "RATES", RateBookStore(str(tmp_path)))
+
+
+def _workbook(premium_rows):
+    wb = openpyxl.Workbook()
+    ws = wb.active
+    ws.title = "Client Details"
+    ws.append(["Client Name", "Relation", "DOB", "Age", "City", "Sum Assured"])
+    ws.append(["Asha", "Self", None, 38, "Delhi", "10 Lakh"])
+    ps = wb.create_sheet("Premiums")
+    ps.append(["Plan Name", "1 Yr Premium", "2 Yr Premium", "3 Yr Premium"])
+    for row in premium_rows:
+        ps.append(row)
+    buf = io.BytesIO()
+    wb.save(buf)
+    return buf.getvalue()
+
+
+def test_blank_row_next_to_typed_row_is_priced(rates):
+    quote = processor.build_quote(_workbook([["Care Supreme", None, None, None],
+                                             ["Tata Medicare Select", 15000, 28000, 41000]]), "logos", "q.xlsx")
+    assert [p.master_key for p in quote.premiums] == [CARE, TATA]
+    assert quote.premiums[0].premiums == ("10,000", "20,000", "30,000")
+    assert quote.premiums[1].premiums == ("15,000", "28,000", "41,000")
+    assert [p.master_key for p in quote.plans] == [CARE, TATA]
+
+
+def test_only_blank_row_compares_just_that_plan(rates):
+    quote = processor.build_quote(_workbook([["Care Supreme", None, None, None]]), "logos", "q.xlsx")
+    assert [p.master_key for p in quote.premiums] == [CARE]
+    assert quote.premiums[0].premiums == ("10,000", "20,000", "30,000")
+    assert [p.master_key for p in quote.plans] == [CARE]
+
+
+def test_json_plan_without_premiums_is_priced(rates):
+    quote = processor.build_request_quote({
+        "clients": [{"client_name": "Asha", "age": 38, "city": "Delhi", "sum_assured": "10 Lakh"}],
+        "premiums": [{"plan": "Care Supreme"}, {"plan": "Tata Medicare Select", "premium_1y": 15000}],
+    })
+    assert [(p.master_key, p.premiums) for p in quote.premiums] == [
+        (CARE, ("10,000", "20,000", "30,000")),
+        (TATA, ("15,000", "", "")),
+    ]
+
+
+def test_blank_row_without_rate_table_is_still_dropped(rates):
+    quote = processor.build_quote(_workbook([["Tata Medicare Select", None, None, None],
+                                             ["Care Supreme", 9000, None, None]]), "logos", "q.xlsx")
+    assert [p.master_key for p in quote.premiums] == [CARE]
+
+
+def test_typed_premiums_display_alike_from_either_front_end(rates):
+    sheet = processor.build_quote(_workbook([["Tata Medicare Select", 15000, 28000.0, "12,500"]]), "logos", "q.xlsx")
+    request = processor.build_request_quote({
+        "clients": [{"client_name": "Asha", "relation": "Self", "age": 38, "city": "Delhi", "sum_assured": "10 Lakh"}],
+        "premiums": [{"plan": "Tata Medicare Select", "premium_1y": 15000, "premium_2y": 28000.0,
+                      "premium_3y": "12,500"}],
+    })
+    assert sheet.premiums == request.premiums
+    assert sheet.premiums[0].premiums == ("15,000", "28,000", "12,500")